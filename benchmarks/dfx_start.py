@@ -0,0 +1,74 @@
+"""Benchmark of the dfx readiness probe against a stub replica status server.
+
+The stub answers /api/v2/status with a cbor status that reports "starting"
+until --ready-after seconds have passed and "healthy" after, so the time
+_wait_until_ready takes can be compared with the fixed 2 second sleep
+icp-start-assets used to make:
+
+    python benchmarks/dfx_start.py --ready-after 0.3
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import fixtures
+from suite import REPO_PATH, _sandbox
+
+STARTING = b'\xa1ureplica_health_statushstarting'
+HEALTHY = b'\xa1ureplica_health_statusghealthy'
+
+
+def _stub_replica(ready_after):
+      """Start a status server on a free port, returns (server, reset) where reset restarts its clock."""
+      started = [time.monotonic()]
+
+      class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                  body = HEALTHY if time.monotonic() - started[0] >= ready_after else STARTING
+                  self.send_response(200)
+                  self.send_header('Content-Type', 'application/cbor')
+                  self.end_headers()
+                  self.wfile.write(body)
+
+            def log_message(self, *args):
+                  pass
+
+      server = HTTPServer(('127.0.0.1', 0), Handler)
+      threading.Thread(target=server.serve_forever, daemon=True).start()
+      return server, lambda: started.__setitem__(0, time.monotonic())
+
+
+def main():
+      parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+      parser.add_argument('--ready-after', type=float, default=0.3, help='Seconds until the stub replica reports healthy.')
+      parser.add_argument('--runs', type=int, default=5, help='Timed runs.')
+      args = parser.parse_args()
+
+      with tempfile.TemporaryDirectory(prefix='hvym_bench_') as tmp:
+            _sandbox(Path(tmp), fixtures.ic_identities(1))
+            sys.path.insert(0, str(REPO_PATH))
+            import hvym
+
+            server, reset = _stub_replica(args.ready_after)
+            url = f'http://127.0.0.1:{server.server_port}/api/v2/status'
+            times = []
+            for _ in range(args.runs):
+                  reset()
+                  start = time.perf_counter()
+                  if not hvym._wait_until_ready(url, timeout=30):
+                        raise RuntimeError('stub replica never reported healthy')
+                  times.append(time.perf_counter() - start)
+            server.shutdown()
+
+      print(f"ready after {args.ready_after * 1000:.0f}ms, probe returned after {statistics.median(times) * 1000:.0f}ms (fixed sleep: 2000ms)")
+
+
+if __name__ == '__main__':
+      main()
@@ -0,0 +1,224 @@
+"""Synthetic inputs for the hvym benchmarks.
+
+Payloads mirror what the blender add-on sends to parse-blender-hvym-collection,
+sized by the number of collection properties, and GLBs carry an HVYM_nft_data
+extension plus a BIN chunk of arbitrary size. Images, identity lists and identity
+pems cover the asset and dfx helpers.
+"""
+import base64
+import json
+import random
+import struct
+import zlib
+
+TRAIT_TYPES = ['property', 'property', 'property', 'text', 'call', 'mesh', 'mesh_set', 'morph_set', 'anim', 'mat_prop', 'mat_set']
+
+LABELS = {
+      'value_prop_label': 'Value Properties',
+      'text_prop_label': 'Text Properties',
+      'call_prop_label': 'Call Properties',
+      'mesh_prop_label': 'Mesh Properties',
+      'mat_prop_label': 'Material Properties',
+      'anim_prop_label': 'Animation Properties',
+      'mesh_set_label': 'Mesh Sets',
+      'morph_set_label': 'Morph Sets',
+      'mat_set_label': 'Material Sets',
+}
+
+
+def _model_ref(name):
+      return {'name': name, 'type': 'MESH', 'visible': True}
+
+
+def _mat_ref(name):
+      return {'name': name, 'type': 'PBR', 'color': '#ffffff', 'roughness': 0.5, 'metalness': 0.1, 'emissive': '#000000', 'emissiveIntensity': 1.0}
+
+
+def collection_property(i, rng):
+      """One numbered entry of the collection payload."""
+      trait_type = TRAIT_TYPES[i % len(TRAIT_TYPES)]
+      action_type = rng.choice(['Static', 'Immutable', 'Incremental', 'Decremental', 'Bicremental', 'Setter'])
+      prop = {
+            'type': f'{trait_type}_{i}',
+            'trait_type': trait_type,
+            'show': True,
+            'prop_action_type': action_type,
+            'prop_slider_type': 'SLIDER',
+            'prop_value_type': rng.choice(['Int', 'Float']),
+            'prop_immutable': action_type == 'Immutable',
+            'prop_toggle_type': 'TOGGLE',
+            'prop_selector_type': 'SELECTOR',
+            'prop_multi_widget_type': 'MULTI',
+            'prop_anim_slider_type': 'SLIDER',
+            'prop_text_widget_type': 'TEXT',
+            'behavior_set': [{'name': f'behavior_{i}', 'trait_type': 'property', 'values': 'NONE', 'use_method': False, 'method': '', 'behavior_type': 'NONE', 'use_behavior': False}] if i % 5 == 0 else None,
+            'int_default': 5, 'int_min': 0, 'int_max': 10, 'int_amount': 1,
+            'float_default': 0.5, 'float_min': 0.0, 'float_max': 1.0, 'float_amount': 0.1,
+            'text_value': f'text {i}',
+            'call_param': f'call_{i}',
+            'model_ref': _model_ref(f'mesh_{i}'),
+            'visible': True,
+            'mesh_set': [_model_ref(f'mesh_{i}_{j}') for j in range(3)],
+            'morph_set': [{'name': f'morph_{i}_{j}'} for j in range(3)],
+            'anim_loop': rng.choice(['NONE', 'LoopRepeat', 'Clamp']),
+            'anim_start': 0, 'anim_end': 120, 'anim_blending': 'NORMAL', 'anim_weight': 1.0, 'anim_play': False,
+            'mat_ref': _mat_ref(f'material_{i}'),
+            'mat_type': 'PBR', 'mat_reflective': True, 'mat_iridescent': False, 'mat_sheen': True, 'mat_emissive': True,
+            'mat_set': [_mat_ref(f'material_{i}_{j}') for j in range(3)],
+            'mesh_set_name': f'mesh_set_{i}',
+            'material_id': 0,
+      }
+      prop.update(LABELS)
+      return prop
+
+
+def collection_payloads(n_props, n_nodes=None, seed=0):
+      """Collection, menu, nodes and actions payloads for a collection with n_props properties."""
+      rng = random.Random(seed)
+      n_nodes = n_props if n_nodes is None else n_nodes
+      collection = {str(i): collection_property(i, rng) for i in range(n_props)}
+      collection['collection_name'] = 'bench'
+      menu = {'0': {'menu_name': 'bench', 'menu_primary_color': '#000000', 'menu_secondary_color': '#ffffff', 'menu_text_color': '#ffffff', 'menu_alignment': 'CENTER', 'collection_id': '0'}}
+      nodes = {f'node_{i}': {'name': f'node_{i}', 'type': 'MESH'} for i in range(n_nodes)}
+      actions = {}
+      for i in range(max(1, n_props // 50)):
+            mesh_action = i % 2 == 0
+            actions[str(i)] = {
+                  'type': f'action_{i}',
+                  'trait_type': 'mesh_action' if mesh_action else 'anim_action',
+                  'action_set': [f'anim_{i}_{j}' for j in range(3)],
+                  'mesh_interaction_type': 'click',
+                  'anim_interaction_type': 'click',
+                  'sequence_type': 'loop',
+                  'additive': False,
+                  'model_ref': _model_ref(f'mesh_{i}'),
+            }
+      return collection, menu, nodes, actions
+
+
+def hvym_nft_data(n_collections=1, n_props=100, seed=0):
+      """HVYM_nft_data extension as the blender add-on embeds it in a model."""
+      rng = random.Random(seed)
+      data = {
+            'project': {'name': 'bench', 'version': '0.01'},
+            'contract': {
+                  'mintable': True, 'nftType': 'HVYC', 'nftChain': 'ICP', 'nftPrice': 1.0, 'premNftPrice': 2.0,
+                  'maxSupply': rng.randint(1, 5000), 'minterType': 'payable', 'minterName': 'bench',
+                  'minterDesc': 'benchmark model', 'minterImage': '', 'minterVersion': 0.1,
+                  'enableContextMenus': True, 'menuIndicatorsShown': False,
+            },
+      }
+      for c in range(n_collections):
+            val_props = {}
+            call_props = {}
+            for i in range(n_props):
+                  action = rng.choice(['Static', 'Immutable', 'Incremental', 'Decremental', 'Bicremental', 'Setter'])
+                  val_props[f'prop_{i}'] = {
+                        'widget_type': 'SLIDER', 'show': True, 'prop_slider_type': 'SLIDER', 'prop_action_type': action,
+                        'default': 5, 'min': 0, 'max': 10, 'immutable': action == 'Immutable', 'amount': 1,
+                  }
+                  if i % 10 == 0:
+                        call_props[f'call_{i}'] = {'name': f'call_{i}', 'call_param': 'NONE'}
+            data[f'collection_{c}'] = {
+                  'collectionName': f'collection_{c}', 'collectionType': 'multi',
+                  'valProps': val_props, 'textValProps': {}, 'callProps': call_props,
+                  'meshProps': {}, 'meshSets': {}, 'morphSets': {}, 'animProps': {}, 'matProps': {},
+                  'materialSets': {}, 'menuData': {}, 'propLabelData': {},
+                  'nodes': {f'node_{i}': {'name': f'node_{i}', 'type': 'MESH'} for i in range(n_props)},
+                  'actionProps': {},
+            }
+      return data
+
+
+def _pad(data, fill):
+      return data + fill * (-len(data) % 4)
+
+
+def write_glb(path, hvym_data=None, bin_size=0, gltf=None):
+      """Write a GLB with an optional HVYM_nft_data extension and a BIN chunk of bin_size bytes."""
+      gltf = dict(gltf or {'asset': {'version': '2.0'}})
+      if hvym_data is not None:
+            gltf['extensions'] = {'HVYM_nft_data': hvym_data}
+            gltf['extensionsUsed'] = ['HVYM_nft_data']
+      if bin_size:
+            gltf['buffers'] = [{'byteLength': bin_size}]
+
+      json_chunk = _pad(json.dumps(gltf).encode('utf-8'), b' ')
+      length = 12 + 8 + len(json_chunk) + (8 + bin_size + (-bin_size % 4) if bin_size else 0)
+
+      with open(path, 'wb') as f:
+            f.write(struct.pack('<4sII', b'glTF', 2, length))
+            f.write(struct.pack('<II', len(json_chunk), 0x4E4F534A))
+            f.write(json_chunk)
+            if bin_size:
+                  padded = bin_size + (-bin_size % 4)
+                  f.write(struct.pack('<II', padded, 0x004E4942))
+                  block = bytes(range(256)) * 4096
+                  remaining = padded
+                  while remaining > 0:
+                        f.write(block[:remaining])
+                        remaining -= len(block)
+      return path
+
+
+def _png_chunk(kind, data):
+      return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def write_png(path, width=512, height=512, seed=0):
+      """Write an RGB PNG of noise, which compresses about as badly as a real texture."""
+      rng = random.Random(seed)
+      rows = b''.join(b'\x00' + rng.randbytes(width * 3) for _ in range(height))
+      with open(path, 'wb') as f:
+            f.write(b'\x89PNG\r\n\x1a\n')
+            f.write(_png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+            f.write(_png_chunk(b'IDAT', zlib.compress(rows, 6)))
+            f.write(_png_chunk(b'IEND', b''))
+      return path
+
+
+def write_svg(path, n_elements=1000, seed=0):
+      """Write an SVG with n_elements shapes and the xmlns attribute _svg_to_data_url strips."""
+      rng = random.Random(seed)
+      shapes = ''.join(
+            f'<circle cx="{rng.randint(0, 1000)}" cy="{rng.randint(0, 1000)}" r="{rng.randint(1, 50)}" fill="#{rng.randrange(0xffffff):06x}"/>'
+            for _ in range(n_elements)
+      )
+      with open(path, 'w') as f:
+            f.write(f'<?xml version="1.0" encoding="UTF-8"?><svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 1000 1000">{shapes}</svg>')
+      return path
+
+
+def ic_identities(n, seed=0):
+      """IC_ID_DATA records as _ic_update_data stores them, the first one active."""
+      rng = random.Random(seed)
+      records = []
+      for i in range(n):
+            principal = '-'.join(''.join(rng.choice('abcdefghijklmnopqrstuvwxyz234567') for _ in range(5)) for _ in range(10)) + '-' + 'qae'
+            records.append({'data_type': 'IC_ID_DATA', 'id': 'default' if i == 0 else f'bench_{i}', 'encrypted': i % 3 == 0 and i != 0, 'principal': principal, 'active': i == 0})
+      return records
+
+
+def _pem(label, der):
+      body = base64.b64encode(der).decode('ascii')
+      lines = [body[i:i + 64] for i in range(0, len(body), 64)]
+      return f'-----BEGIN {label}-----\n' + '\n'.join(lines) + f'\n-----END {label}-----\n'
+
+
+def write_identity_pems(identity_dir, names, seed=0):
+      """Write an identity.pem per name the way dfx lays them out, alternating Ed25519 PKCS#8 and secp256k1 SEC1 keys.
+
+      The secp256k1 public points are random bytes rather than real points,
+      principal derivation only hashes them.
+      """
+      rng = random.Random(seed)
+      for i, name in enumerate(names):
+            path = identity_dir / name
+            path.mkdir(parents=True, exist_ok=True)
+            if i % 2 == 0:
+                  pem = _pem('PRIVATE KEY', bytes.fromhex('302e020100300506032b657004220420') + rng.randbytes(32))
+            else:
+                  der = bytes.fromhex('0201010420') + rng.randbytes(32) + bytes.fromhex('a00706052b8104000aa144034200') + b'\x04' + rng.randbytes(64)
+                  pem = _pem('EC PRIVATE KEY', bytes([0x30, len(der)]) + der)
+            (path / 'identity.pem').write_text(pem)
+      return names
@@ -0,0 +1,70 @@
+"""Micro-benchmark of hvym's json layer, orjson vs the stdlib.
+
+Times loading a blender collection document, parsing it with
+_parse_blender_hvym_collection (whose `.json` output is stdlib formatted on
+both backends), and dumping the result compact and pretty:
+
+    python benchmarks/json_backend.py --props 5000
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import hvym
+import fixtures
+
+
+def _best_of(fn, runs):
+      times = []
+      for _ in range(runs):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+      return min(times)
+
+
+def _run(document, runs):
+      doc = hvym._json_loads(document)
+      payloads = (doc['collection'], doc['menu'], doc['nodes'], doc['actions'])
+      output = hvym._parse_blender_hvym_collection('bench', 'multi', '0', *payloads)
+      parsed = hvym._json_loads(output)
+      return {
+            'load': _best_of(lambda: hvym._json_loads(document), runs),
+            'parse': _best_of(lambda: hvym._parse_blender_hvym_collection('bench', 'multi', '0', *payloads), runs),
+            'dumps': _best_of(lambda: hvym._json_dumps(parsed), runs),
+            'pretty': _best_of(lambda: hvym._json_dumps(parsed, pretty=True), runs),
+      }
+
+
+def main():
+      parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+      parser.add_argument('--props', type=int, default=5000, help='Number of collection properties.')
+      parser.add_argument('--runs', type=int, default=5, help='Runs per measurement, the best is reported.')
+      args = parser.parse_args()
+
+      collection, menu, nodes, actions = fixtures.collection_payloads(args.props)
+      document = json.dumps({'collection': collection, 'menu': menu, 'nodes': nodes, 'actions': actions}).encode('utf-8')
+
+      orjson = hvym._orjson
+      results = {}
+      if orjson is not None:
+            results['orjson'] = _run(document, args.runs)
+      hvym._orjson = None
+      try:
+            results['json'] = _run(document, args.runs)
+      finally:
+            hvym._orjson = orjson
+
+      print(f'{args.props} properties, {len(document) / 1e6:.1f} MB document')
+      print(f"{'step':<10}" + ''.join(f'{backend:>12}' for backend in results))
+      for step in ('load', 'parse', 'dumps', 'pretty'):
+            print(f'{step:<10}' + ''.join(f'{results[backend][step] * 1000:>10.1f}ms' for backend in results))
+
+
+if __name__ == '__main__':
+      main()
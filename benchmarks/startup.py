@@ -0,0 +1,80 @@
+"""Cold-start benchmark for the hvym cli.
+
+Runs a handful of commands in fresh interpreters and reports wall time, so the
+cost of module import (before click parses argv) can be compared between the
+working tree and an older revision:
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --baseline HEAD~1
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_PATH = Path(__file__).resolve().parent.parent
+
+# Heavy commands are timed with --help: that still imports hvym.py and resolves
+# the command, but doesn't open popups or talk to dfx.
+COMMANDS = {
+      'check': ['check'],
+      'version': ['version'],
+      'parse-blender-hvym-collection': ['parse-blender-hvym-collection', 'bench', 'multi', '0', '{}', '{}', '{}', '{}'],
+      'icp-update-model-minter': ['icp-update-model-minter', '--help'],
+}
+
+
+def _time_command(script, args, runs):
+      times = []
+      env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+      for _ in range(runs):
+            start = time.perf_counter()
+            output = subprocess.run([sys.executable, str(script), *args], cwd=REPO_PATH, env=env, capture_output=True)
+            times.append(time.perf_counter() - start)
+            if output.returncode != 0:
+                  raise RuntimeError(f"{' '.join(args)} failed:\n{output.stderr.decode('utf-8')}")
+      return {'min': min(times), 'median': statistics.median(times)}
+
+
+def _run_suite(script, runs):
+      return {name: _time_command(script, args, runs) for name, args in COMMANDS.items()}
+
+
+def _baseline_script(rev):
+      """Check out hvym.py at rev next to the real one, so relative data paths resolve."""
+      source = subprocess.check_output(['git', 'show', f'{rev}:hvym.py'], cwd=REPO_PATH)
+      script = REPO_PATH / f'.hvym_baseline_{os.getpid()}.py'
+      script.write_bytes(source)
+      return script
+
+
+def main():
+      parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+      parser.add_argument('--runs', type=int, default=5, help='Runs per command.')
+      parser.add_argument('--baseline', help='Git revision to compare against.')
+      parser.add_argument('--json', dest='json_out', help='Write results to this file.')
+      args = parser.parse_args()
+
+      results = {'current': _run_suite(REPO_PATH / 'hvym.py', args.runs)}
+      if args.baseline:
+            script = _baseline_script(args.baseline)
+            try:
+                  results['baseline'] = _run_suite(script, args.runs)
+            finally:
+                  script.unlink()
+
+      print(f"{'command':<32}" + ''.join(f'{col:>14}' for col in results))
+      for name in COMMANDS:
+            print(f'{name:<32}' + ''.join(f"{results[col][name]['median'] * 1000:>12.1f}ms" for col in results))
+
+      if args.json_out:
+            with open(args.json_out, 'w') as f:
+                  json.dump(results, f, indent=4)
+
+
+if __name__ == '__main__':
+      main()
@@ -0,0 +1,206 @@
+"""Benchmarks of hvym's hot paths on synthetic fixtures.
+
+Everything runs against a throwaway HOME: the TinyDB files, the dfx identity
+store and the dfx binary itself live there, and dfx, npm and docker are stub
+scripts so nothing touches the network or a real replica. Results are written
+as JSON so runs on different commits can be compared:
+
+    python benchmarks/suite.py --json before.json
+    python benchmarks/suite.py --json after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_PATH = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import fixtures
+
+ACTIVE_PRINCIPAL = 'bench-principal-qae'
+
+DFX_STUB = """#!/bin/sh
+case "$1 $2" in
+      "identity list") cat "$HOME/.bench_ids" ;;
+      "identity whoami") echo default ;;
+      "identity get-principal") echo {principal} ;;
+esac
+exit 0
+"""
+
+NOOP_STUB = "#!/bin/sh\nexit 0\n"
+
+
+def _write_stub(path, text):
+      path.parent.mkdir(parents=True, exist_ok=True)
+      path.write_text(text)
+      path.chmod(0o755)
+
+
+def _sandbox(root, identities):
+      """Lay out a fake HOME with stubbed tools and an empty hvym data dir, before hvym is imported."""
+      home = root / 'home'
+      data_dir = home / '.local' / 'share' / 'heavymeta-cli'
+      data_dir.mkdir(parents=True)
+      (data_dir / 'db.json').write_text('{}')
+      (data_dir / 'enc_db.json').write_text('{}')
+
+      identity_dir = home / '.config' / 'dfx' / 'identity'
+      identity_dir.mkdir(parents=True)
+      (home / '.config' / 'dfx' / 'identity.json').write_text('{"default": "default"}')
+      (home / '.bench_ids').write_text('\n'.join(record['id'] for record in identities) + '\n')
+
+      _write_stub(home / '.local' / 'share' / 'dfx' / 'bin' / 'dfx', DFX_STUB.format(principal=ACTIVE_PRINCIPAL))
+      for tool in ('npm', 'docker'):
+            _write_stub(root / 'bin' / tool, NOOP_STUB)
+
+      os.environ['HOME'] = str(home)
+      os.environ.pop('XDG_DATA_HOME', None)
+      os.environ.pop('XDG_CONFIG_HOME', None)
+      os.environ['PATH'] = str(root / 'bin') + os.pathsep + os.environ['PATH']
+      os.environ['HVYM_NO_DAEMON'] = '1'
+
+
+def _measure(fn, runs):
+      fn()
+      times = []
+      for _ in range(runs):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+      return {'min': min(times), 'median': statistics.median(times), 'runs': runs}
+
+
+def _git_revision():
+      try:
+            return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_PATH, text=True).strip()
+      except (OSError, subprocess.CalledProcessError):
+            return None
+
+
+def _benchmarks(hvym, root, args):
+      """Build the fixtures and return {name: callable}."""
+      identities = fixtures.ic_identities(args.identities)
+      identities[0]['principal'] = ACTIVE_PRINCIPAL
+      hvym.IC_IDS.insert_multiple(identities)
+      hvym.IC_IDS.insert({'data_type': 'IC_ID_ACTIVE', 'active_id': 'default', 'principal': ACTIVE_PRINCIPAL, 'encrypted': False, 'list': [record['id'] for record in identities]})
+      hvym._ic_save_identity_fingerprint()
+      lookup_id = identities[-1]['id']
+      pem_ids = fixtures.write_identity_pems(Path(os.environ['HOME']) / '.config' / 'dfx' / 'identity', [record['id'] for record in identities[:args.pems]])
+
+      def ic_identity_principals_cold():
+            hvym._IC_PRINCIPAL_CACHE.clear()
+            return [hvym._ic_identity_principal(name) for name in pem_ids]
+
+      collection, menu, nodes, actions = fixtures.collection_payloads(args.props)
+      hvym_data = fixtures.hvym_nft_data(n_collections=args.collections, n_props=args.props)
+      model = fixtures.write_glb(root / 'model.glb', hvym_data, bin_size=args.bin_mb * 1024 * 1024)
+      parsed = hvym._parse_hvym_data(hvym_data, 'model.glb')
+      png = fixtures.write_png(root / 'image.png', args.png_size, args.png_size)
+      svg = fixtures.write_svg(root / 'image.svg', args.svg_elements)
+      out_dir = root / 'out'
+      out_dir.mkdir()
+
+      def load_hvym_data_cold():
+            hvym._MODEL_METADATA_CACHE.clear()
+            hvym._load_hvym_data(str(model))
+
+      def build_hvym_schemas():
+            hvym._HVYM_SCHEMAS = None
+            hvym._hvym_schemas()
+
+      def render_templates():
+            for template in (hvym.TEMPLATE_MODEL_VIEWER_INDEX, hvym.TEMPLATE_MODEL_VIEWER_JS,
+                             hvym.TEMPLATE_MODEL_MINTER_INDEX, hvym.TEMPLATE_MODEL_MINTER_JS,
+                             hvym.TEMPLATE_CUSTOM_CLIENT_INDEX, hvym.TEMPLATE_CUSTOM_CLIENT_JS,
+                             hvym.TEMPLATE_MODEL_MINTER_MAIN, hvym.TEMPLATE_MODEL_MINTER_TYPES):
+                  hvym._render_template(template, parsed, out_dir / template)
+
+      return {
+            'parse_blender_hvym_collection': lambda: hvym._parse_blender_hvym_collection('bench', 'multi', '0', collection, menu, nodes, actions),
+            'validate_blender_collection': lambda: (hvym._hvym_input_errors('collection', collection), hvym._hvym_input_errors('menu', menu), hvym._hvym_input_errors('actions', actions)),
+            'parse_hvym_data': lambda: hvym._parse_hvym_data(hvym_data, 'model.glb'),
+            'validate_hvym_data': lambda: hvym._hvym_input_errors('hvym_nft_data', hvym_data),
+            'build_hvym_schemas': build_hvym_schemas,
+            'render_templates': render_templates,
+            'load_hvym_data_cold': load_hvym_data_cold,
+            'load_hvym_data_cached': lambda: hvym._load_hvym_data(str(model)),
+            'png_to_data_url': lambda: hvym._png_to_data_url(png),
+            'svg_to_data_url': lambda: hvym._svg_to_data_url(svg),
+            'ic_find_id': lambda: hvym._find_IC_IDS_TABLE(lookup_id),
+            'ic_get_stored_principal': lambda: hvym._ic_get_stored_principal(lookup_id),
+            'ic_account_is_encrypted': lambda: hvym._ic_account_is_encrypted(lookup_id),
+            'ic_identity_principals_cold': ic_identity_principals_cold,
+            'ic_identity_principals_cached': lambda: [hvym._ic_identity_principal(name) for name in pem_ids],
+            'ic_id_info': hvym._ic_id_info,
+            'ic_active_id': hvym._ic_active_id,
+      }
+
+
+def _print_results(results, baseline):
+      header = f"{'benchmark':<32}{'median':>12}"
+      if baseline:
+            header += f"{'baseline':>12}{'change':>10}"
+      print(header)
+      for name, result in results['benchmarks'].items():
+            line = f"{name:<32}{result['median'] * 1000:>10.2f}ms"
+            before = baseline.get('benchmarks', {}).get(name) if baseline else None
+            if before:
+                  line += f"{before['median'] * 1000:>10.2f}ms{(result['median'] / before['median'] - 1) * 100:>+9.1f}%"
+            print(line)
+
+
+def main():
+      parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+      parser.add_argument('--runs', type=int, default=10, help='Timed runs per benchmark, after one warm up.')
+      parser.add_argument('--props', type=int, default=1000, help='Properties per collection.')
+      parser.add_argument('--collections', type=int, default=4, help='Collections in the model HVYM data.')
+      parser.add_argument('--bin-mb', type=int, default=64, help='Size of the model BIN chunk in MB.')
+      parser.add_argument('--identities', type=int, default=500, help='ICP identities in the TinyDB store.')
+      parser.add_argument('--pems', type=int, default=20, help='ICP identities with an identity.pem to derive principals from.')
+      parser.add_argument('--png-size', type=int, default=1024, help='Width and height of the PNG fixture.')
+      parser.add_argument('--svg-elements', type=int, default=5000, help='Shapes in the SVG fixture.')
+      parser.add_argument('-k', dest='only', help='Only run benchmarks whose name contains this.')
+      parser.add_argument('--json', dest='json_out', help='Write results to this file.')
+      parser.add_argument('--compare', help='Results file of an earlier run to compare against.')
+      args = parser.parse_args()
+
+      baseline = None
+      if args.compare:
+            with open(args.compare) as f:
+                  baseline = json.load(f)
+
+      with tempfile.TemporaryDirectory(prefix='hvym_bench_') as tmp:
+            root = Path(tmp)
+            _sandbox(root, fixtures.ic_identities(args.identities))
+            sys.path.insert(0, str(REPO_PATH))
+            import hvym
+
+            benchmarks = _benchmarks(hvym, root, args)
+            results = {
+                  'revision': _git_revision(),
+                  'python': platform.python_version(),
+                  'json_backend': 'orjson' if hvym._orjson is not None else 'json',
+                  'params': {key: value for key, value in vars(args).items() if key not in ('json_out', 'compare', 'only')},
+                  'benchmarks': {},
+            }
+            for name, fn in benchmarks.items():
+                  if args.only and args.only not in name:
+                        continue
+                  results['benchmarks'][name] = _measure(fn, args.runs)
+
+      _print_results(results, baseline)
+      if args.json_out:
+            with open(args.json_out, 'w') as f:
+                  json.dump(results, f, indent=4)
+
+
+if __name__ == '__main__':
+      main()
@@ -0,0 +1,78 @@
+"""Benchmark of the icp-update-model-minter render path across cli invocations.
+
+Each run is a fresh interpreter rendering main.mo, Types.mo, index.html and
+index.js the way icp_update_model_minter does. With a cold cache every
+template is compiled from source; warm runs load the bytecode that the
+first run left in the user data dir. When hvym compile-templates output is
+present and current both are served by the precompiled modules instead:
+
+    python benchmarks/templates.py --runs 5
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BENCH_PATH = Path(__file__).resolve().parent
+REPO_PATH = BENCH_PATH.parent
+sys.path.insert(0, str(BENCH_PATH))
+
+import fixtures
+from suite import _sandbox
+
+RENDER = """
+import sys, time
+sys.path[:0] = [{repo!r}, {bench!r}]
+import hvym, fixtures
+data = hvym._parse_hvym_data(fixtures.hvym_nft_data(n_collections={collections}, n_props={props}), 'model.glb')
+start = time.perf_counter()
+for template, name in ((hvym.TEMPLATE_MODEL_MINTER_MAIN, 'main.mo'), (hvym.TEMPLATE_MODEL_MINTER_TYPES, 'Types.mo'),
+                       (hvym.TEMPLATE_MODEL_MINTER_INDEX, 'index.html'), (hvym.TEMPLATE_MODEL_MINTER_JS, 'index.js')):
+      hvym._render_template(template, data, {out!r} + '/' + name)
+print(time.perf_counter() - start)
+"""
+
+
+def _render(args, out_dir):
+      code = RENDER.format(repo=str(REPO_PATH), bench=str(BENCH_PATH), collections=args.collections, props=args.props, out=str(out_dir))
+      output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+      return float(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+      parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+      parser.add_argument('--runs', type=int, default=5, help='Interpreter runs per measurement.')
+      parser.add_argument('--props', type=int, default=20, help='Properties per collection.')
+      parser.add_argument('--collections', type=int, default=2, help='Collections in the model HVYM data.')
+      parser.add_argument('--json', dest='json_out', help='Write results to this file.')
+      args = parser.parse_args()
+
+      with tempfile.TemporaryDirectory(prefix='hvym_bench_') as tmp:
+            root = Path(tmp)
+            _sandbox(root, fixtures.ic_identities(1))
+            out_dir = root / 'out'
+            out_dir.mkdir()
+            cache_path = Path(os.environ['HOME']) / '.local' / 'share' / 'heavymeta-cli' / 'template_cache'
+
+            cold = []
+            for _ in range(args.runs):
+                  shutil.rmtree(cache_path, ignore_errors=True)
+                  cold.append(_render(args, out_dir))
+            warm = [_render(args, out_dir) for _ in range(args.runs)]
+
+      results = {name: {'min': min(times), 'median': statistics.median(times)} for name, times in (('cold', cold), ('warm', warm))}
+      for name, result in results.items():
+            print(f"{name:<8}{result['median'] * 1000:>10.2f}ms")
+      print(f"speedup {results['cold']['median'] / results['warm']['median']:>9.1f}x")
+      if args.json_out:
+            with open(args.json_out, 'w') as f:
+                  json.dump(results, f, indent=4)
+
+
+if __name__ == '__main__':
+      main()
@@ -1,46 +1,192 @@
-from PyQt5.QtWidgets import QApplication, QMainWindow, QSplashScreen, QLabel, QGridLayout, QWidget, QCheckBox, QFormLayout, QSystemTrayIcon, QComboBox, QTextEdit, QLineEdit, QDialogButtonBox, QSpacerItem, QSizePolicy, QMenu, QAction, QStyle, qApp, QVBoxLayout, QPushButton, QDialog, QDesktopWidget, QFileDialog, QMessageBox
-from PyQt5.QtCore import Qt, QSize, QTimer
-from PyQt5.QtGui import QIcon, QPixmap
-from qtwidgets import PasswordEdit
-from qthvym import *
 import os
 import sys
+import json
+import socket
+from platformdirs import *
+
+# Commands that open Qt or gif popups, which have to appear on the caller's display.
+SERVE_POPUP_COMMANDS = (
+      'custom-choice-prompt', 'custom-copy-line-prompt', 'custom-copy-text-prompt', 'custom-loading-msg',
+      'custom-prompt', 'didc-bind-js-popup', 'didc-bind-ts-popup', 'icp-active-principal', 'icp-deploy-assets',
+      'icp-new-account', 'icp-new-test-account', 'icp-project', 'icp-remove-account', 'icp-set-account',
+      'icp-start-assets', 'icp-update-custom-client', 'icp-update-model-minter', 'img-to-url', 'pinggy-set-token',
+      'pintheon-set-network', 'pintheon-set-port', 'pintheon-setup', 'pintheon-tunnel-open', 'splash',
+      'stellar-load-keys', 'stellar-load-shared-pub', 'stellar-new-account', 'stellar-remove-account',
+      'stellar-select-keys', 'stellar-select-shared-pub', 'stellar-set-account', 'stellar-update-db-pw',
+      'update-npm-modules',
+)
+# Commands that need the caller's terminal or display, or manage the daemon, always run locally.
+SERVE_LOCAL_COMMANDS = ('serve', 'batch', 'icp-init', 'icp-install', 'didc-install', 'up') + SERVE_POPUP_COMMANDS
+JSONRPC_METHOD_NOT_FOUND = -32601
+
+def _serve_socket_path():
+      """Path of the unix socket the `hvym serve` daemon listens on."""
+      default = os.path.join(PlatformDirs('heavymeta-cli', 'HeavyMeta').user_data_dir, 'hvym.sock')
+      return os.environ.get('HVYM_SOCKET', default)
+
+def _forward_to_daemon(argv):
+      """Run argv on a running `hvym serve` daemon, returns the exit code or None when no daemon took the call."""
+      path = _serve_socket_path()
+      if len(argv) == 0 or argv[0] in SERVE_LOCAL_COMMANDS or '-' in argv[1:]:
+            return None
+      if not hasattr(socket, 'AF_UNIX') or not os.path.exists(path):
+            return None
+
+      request = {'jsonrpc': '2.0', 'id': os.getpid(), 'method': argv[0], 'params': {'args': argv[1:], 'cwd': os.getcwd()}}
+      sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+      try:
+            sock.connect(path)
+      except OSError:
+            sock.close()
+            return None
+
+      try:
+            sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            with sock.makefile('rb') as f:
+                  response = json.loads(f.readline())
+      except (OSError, ValueError) as e:
+            sys.stderr.write(f"hvym serve connection failed: {e}\n")
+            return 1
+      finally:
+            sock.close()
+
+      if 'error' in response:
+            if response['error']['code'] == JSONRPC_METHOD_NOT_FOUND:
+                  return None
+            sys.stderr.write(response['error']['message'] + '\n')
+            return 1
+
+      result = response['result']
+      sys.stdout.write(result['stdout'])
+      sys.stderr.write(result['stderr'])
+      return result['exit_code']
+
+# A frozen build starts process pool workers by running this script again,
+# freeze_support runs the worker and exits before any cli code is reached.
+if __name__ == '__main__' and getattr(sys, 'frozen', False):
+      import multiprocessing
+      multiprocessing.freeze_support()
+
+# Hand the call to a running daemon before the rest of the module is imported,
+# so forwarded calls only pay for the interpreter and this stdlib client.
+if __name__ == '__main__' and not os.environ.get('HVYM_NO_DAEMON'):
+      _exit_code = _forward_to_daemon(sys.argv[1:])
+      if _exit_code is not None:
+            sys.exit(_exit_code)
+
 import click
 import subprocess
 import shutil
-import json
 import subprocess
 import threading
+import shlex
 from subprocess import run, Popen, PIPE, STDOUT
-from platformdirs import *
-from pygltflib import GLTF2
-from dataclasses import dataclass, asdict, field
-from dataclasses_json import dataclass_json
-from jinja2 import Environment, FileSystemLoader
-from gifanimus import GifAnimation
+from dataclasses import dataclass, fields, field
 from pathlib import Path
 import numbers
 import hashlib
+import zlib
+import struct
 import re
 import time
+import math
 import ast
-import pexpect
-from pexpect import *
 from io import BytesIO
 from io import StringIO
 from urllib.request import urlopen
+from http.client import HTTPException
 from zipfile import ZipFile
 from tinydb import TinyDB, Query
-import tinydb_encrypted_jsonstorage as tae
 import xml.etree.ElementTree as ET
-from base64 import b64encode
-import pyperclip
+from base64 import b64encode, b64decode, b32encode
 import copy
 import json
-from hvym_stellar import *
-from stellar_sdk import Keypair, Network, Server, SorobanServer, soroban_rpc, scval
+import importlib
 import platform
-import requests
+import contextlib
+
+# Heavy dependencies (PyQt5/qthvym, pygltflib, jinja2, gifanimus, pexpect,
+# stellar_sdk, hvym_stellar, requests) are imported inside the functions that
+# use them, so trivial commands don't pay for them at startup.
+
+# orjson is used for json parsing and for the json hvym keeps to itself
+# (manifests, caches, the index, the batch protocol) when installed, set
+# HVYM_JSON_BACKEND=json to force the stdlib. Its output is formatted
+# differently: compact separators, raw utf-8, 2 space indents and its own
+# float repr (1e-7 where the stdlib writes 1e-07). The json the commands print
+# for blender and users goes through _json_text instead, which always writes
+# the text hvym always has: ', ' and ': ' separators, \u escapes and 4 space
+# indents. Both reject NaN and infinite floats.
+try:
+      import orjson as _orjson
+except ImportError:
+      _orjson = None
+
+if os.environ.get('HVYM_JSON_BACKEND') == 'json':
+      _orjson = None
+
+JSON_INDENT = 4
+
+def _json_check_finite(obj):
+      """Raise ValueError for NaN and infinite floats in obj, orjson writes them as null."""
+      stack = [obj]
+      while stack:
+            item = stack.pop()
+            if isinstance(item, float):
+                  if not math.isfinite(item):
+                        raise ValueError(f"Out of range float values are not JSON compliant: {item!r}")
+            elif isinstance(item, dict):
+                  stack.extend(item.values())
+            elif isinstance(item, (list, tuple)):
+                  stack.extend(item)
+
+def _json_dumps(obj, pretty=False):
+      """Serialize obj to a json string."""
+      if _orjson is not None:
+            option = _orjson.OPT_NON_STR_KEYS | (_orjson.OPT_INDENT_2 if pretty else 0)
+            data = _orjson.dumps(obj, option=option)
+            if b'null' in data:
+                  _json_check_finite(obj)
+            return data.decode('utf-8')
+      return _json_text(obj, pretty)
+
+def _json_text(obj, pretty=False):
+      """Serialize obj to json formatted the way hvym has always printed it, whatever the backend."""
+      return json.dumps(obj, indent=JSON_INDENT if pretty else None, allow_nan=False)
+
+def _json_loads(data):
+      """Deserialize json from a str or bytes."""
+      if _orjson is not None:
+            return _orjson.loads(data)
+      return json.loads(data)
+
+def _json_load(f):
+      """Deserialize json from a file object opened in binary mode."""
+      return _json_loads(f.read())
+
+def _json_iterencode(obj, pretty=False, depth=3, _level=0):
+      """Serialize obj to json in chunks, the same text _json_text gives.
+
+      Containers nested less than depth deep are written piece by piece, so
+      no chunk holds more than one deeper subtree.
+      """
+      unit, item_separator = (' ' * JSON_INDENT, ',') if pretty else ('', ', ')
+      if _level >= depth or not isinstance(obj, (dict, list)) or not obj:
+            text = _json_text(obj, pretty)
+            yield text.replace('\n', '\n' + unit * _level) if pretty and _level else text
+            return
+
+      indent = '\n' + unit * (_level + 1) if pretty else ''
+      is_dict = isinstance(obj, dict)
+      yield '{' if is_dict else '['
+      for i, item in enumerate(obj.items() if is_dict else obj):
+            if is_dict:
+                  key, item = item
+                  yield (item_separator if i else '') + indent + _json_text(str(key)) + ': '
+            else:
+                  yield (item_separator if i else '') + indent
+            yield from _json_iterencode(item, pretty, depth, _level + 1)
+      yield ('\n' + unit * _level if pretty else '') + ('}' if is_dict else ']')
 
 # Global variables for tunnel management
 _tunnel_status = "stopped"  # "running", "stopped", "error"
@@ -186,6 +332,17 @@ DFX = str(PLATFORM_PATHS['dfx'])
 DIDC = str(PLATFORM_PATHS['didc'])
 PINGGY_DIR = str(PLATFORM_PATHS['pinggy_dir'])
 PINGGY = str(PLATFORM_PATHS['pinggy'])
+DFX_CONFIG_PATH = os.path.join(HOME, '.config', 'dfx')
+DFX_IDENTITY_PATH = os.path.join(DFX_CONFIG_PATH, 'identity')
+DFX_IDENTITY_JSON = os.path.join(DFX_CONFIG_PATH, 'identity.json')
+IC_ANONYMOUS_PRINCIPAL = '2vxsx-fae'
+ED25519_DER_PREFIX = bytes.fromhex('302a300506032b6570032100')
+SECP256K1_DER_PREFIX = bytes.fromhex('3056301006072a8648ce3d020106052b8104000a034200')
+OID_ED25519 = bytes.fromhex('2b6570')
+OID_EC_PUBLIC_KEY = bytes.fromhex('2a8648ce3d0201')
+OID_SECP256K1 = bytes.fromhex('2b8104000a')
+SECP256K1_P = 2**256 - 2**32 - 977
+SECP256K1_G = (0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798, 0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8)
 
 TEMPLATE_MODEL_VIEWER_INDEX = 'model_viewer_html_template.txt'
 TEMPLATE_MODEL_VIEWER_JS = 'model_viewer_js_template.txt'
@@ -195,6 +352,8 @@ TEMPLATE_CUSTOM_CLIENT_INDEX = 'custom_client_frontend_index_template.txt'
 TEMPLATE_CUSTOM_CLIENT_JS = 'custom_client_frontend_js_template.txt'
 TEMPLATE_MODEL_MINTER_MAIN = 'model_minter_backend_main_template.txt'
 TEMPLATE_MODEL_MINTER_TYPES = 'model_minter_backend_types_template.txt'
+TEMPLATE_MODULES_PATH = os.path.join(FILE_PATH, 'templates_compiled')
+TEMPLATE_MODULES_MANIFEST = 'manifest.json'
 
 # Pinggy URLs are now handled by _get_pinggy_download_url() function
 
@@ -206,6 +365,7 @@ MODEL_DEBUG_TEMPLATE = 'hvym_model_debug_template-main'
 MINTER_TEMPLATE = 'hvym_minter_template-master'
 CUSTOM_CLIENT_TEMPLATE = 'hvym_custom_client_template-main'
 ASSETS_CLIENT_TEMPLATE = 'hvym_assets_template-master'
+ICP_PROJECT_TEMPLATES = (MODEL_DEBUG_TEMPLATE, MINTER_TEMPLATE, CUSTOM_CLIENT_TEMPLATE, ASSETS_CLIENT_TEMPLATE)
 LOADING_IMG = os.path.join(FILE_PATH, 'images', 'loading.gif')
 BUILDING_IMG = os.path.join(FILE_PATH, 'images', 'building.gif')
 BG_IMG = os.path.join(FILE_PATH, 'images', 'hvym.png')
@@ -226,6 +386,11 @@ STORAGE_PATH = os.path.join(dirs.user_data_dir, 'db.json')
 # STORAGE_PATH = os.path.join(FILE_PATH, 'data', 'db.json')#TEST
 ENC_STORAGE_PATH = os.path.join(dirs.user_data_dir, 'enc_db.json')
 # ENC_STORAGE_PATH = os.path.join(FILE_PATH, 'data', 'enc_db.json')#TEST
+MODEL_INDEX_PATH = os.path.join(dirs.user_data_dir, 'models.db')
+TEXTURE_CACHE_PATH = os.path.join(dirs.user_data_dir, 'texture_cache')
+TEMPLATE_CACHE_PATH = os.path.join(dirs.user_data_dir, 'template_cache')
+DFX_START_LOG = os.path.join(dirs.user_data_dir, 'dfx_start.log')
+HVYM_NETWORK_PORT = 1357
 if not os.path.isfile(STORAGE_PATH):
       src = os.path.join(DATA_PATH, 'db.json')
       dst = os.path.join(dirs.user_data_dir, 'db.json')
@@ -246,6 +411,10 @@ STELLAR_IDS = STORAGE.table('stellar_identities')
 STELLAR_ACCOUNTS = STORAGE.table('stellar_accounts')
 
 DAPP = None
+_TEMPLATE_ENV = None
+_MODEL_METADATA_CACHE = {}
+_HVYM_SCHEMAS = None
+_IC_PRINCIPAL_CACHE = {}
 PINTHEON_VERSION = 'v0.00'
 
 NETWORKS = ['testnet', 'mainnet']
@@ -294,26 +463,51 @@ def _get_arch_specific_dapp_name():
     return f'pintheon-{networks[0]}-{plat}'
 
 def _open_encrypted_storage(pw):
+      import tinydb_encrypted_jsonstorage as tae
       db = TinyDB(encryption_key=pw, path=ENC_STORAGE_PATH, storage=tae.EncryptedJSONStorage)
       accounts = db.table('stellar_accounts')
       return { 'db':db, 'accounts': accounts}
 
 
+def _data_class(cls):
+      """Make cls a dataclass with __slots__ and a generated to_dict.
+
+      to_dict builds the dict straight from the fields, without the deep copy
+      dataclasses.asdict makes, so nested values are shared with the instance.
+      """
+      cls = dataclass(cls)
+      names = [f.name for f in fields(cls)]
+      inherited = {name for base in cls.__mro__[1:] for name in getattr(base, '__slots__', ())}
+
+      cls_dict = dict(cls.__dict__)
+      cls_dict['__slots__'] = tuple(name for name in names if name not in inherited)
+      for name in names:
+            cls_dict.pop(name, None)
+      cls_dict.pop('__dict__', None)
+      cls_dict.pop('__weakref__', None)
+
+      namespace = {}
+      exec('def to_dict(self):\n    return {' + ', '.join(f'{name!r}: self.{name}' for name in names) + '}\n', namespace)
+      cls_dict['to_dict'] = namespace['to_dict']
+
+      slotted = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+      slotted.__qualname__ = cls.__qualname__
+      return slotted
+
+
 #Material Data classes
-@dataclass_json
-@dataclass
+@_data_class
 class base_data_class:
       @property
       def dictionary(self):
-            return asdict(self)
+            return self.to_dict()
 
       @property
       def json(self):
-            return json.dumps(self.dictionary)
+            return _json_text(self.to_dict())
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class collection_data_class(base_data_class):
       '''
       Base data class for hvym collection properties
@@ -365,8 +559,7 @@ class collection_data_class(base_data_class):
       actionProps: dict
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class contract_data_class(base_data_class):
       '''
       Base data class for contract data
@@ -414,8 +607,7 @@ class contract_data_class(base_data_class):
       menuIndicatorsShown: bool
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class menu_data_class(base_data_class):
       '''
       Base data class for hvym menu properties
@@ -437,8 +629,7 @@ class menu_data_class(base_data_class):
       alignment: str
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class action_data_class(base_data_class):
       '''
       Base data class for hvym action properties
@@ -459,8 +650,7 @@ class action_data_class(base_data_class):
       sequence: str
       additive: bool
 
-@dataclass_json
-@dataclass
+@_data_class
 class action_mesh_data_class(action_data_class):
       '''
       Base data class for hvym action properties
@@ -470,8 +660,7 @@ class action_mesh_data_class(action_data_class):
       model_ref: dict
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class property_label_data_class(base_data_class):
       '''
       Base data class for widget data
@@ -505,8 +694,7 @@ class property_label_data_class(base_data_class):
       mat_set_label: str
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class widget_data_class(base_data_class):
       '''
       Base data class for widget data
@@ -519,8 +707,7 @@ class widget_data_class(base_data_class):
       show: bool
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class slider_data_class(widget_data_class):
       '''
       Base data class for slider data
@@ -533,8 +720,7 @@ class slider_data_class(widget_data_class):
       prop_action_type: str
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class single_int_data_class(base_data_class):
       '''
       Creates data object for singular int data value property
@@ -552,8 +738,7 @@ class single_int_data_class(base_data_class):
       min: int
       max: int
 
-@dataclass_json
-@dataclass
+@_data_class
 class behavior_data_class(base_data_class):
       '''
       Creates data object for a text item
@@ -581,8 +766,7 @@ class behavior_data_class(base_data_class):
       behavior_type: str
       use_behavior: bool
 
-@dataclass_json
-@dataclass
+@_data_class
 class text_data_class(base_data_class):
       '''
       Creates data object for a text item
@@ -606,8 +790,7 @@ class text_data_class(base_data_class):
       widget_type: str
       behaviors: list
 
-@dataclass_json
-@dataclass
+@_data_class
 class call_data_class(base_data_class):
       '''
       Creates data object for a method call reference
@@ -620,8 +803,7 @@ class call_data_class(base_data_class):
       call_param: str
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class int_data_class(slider_data_class):
       '''
       Creates data object for int data value property
@@ -640,8 +822,7 @@ class int_data_class(slider_data_class):
       immutable: bool
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class int_data_behavior_class(int_data_class):
       '''
       Creates data object for int data value property with behaviors
@@ -651,8 +832,7 @@ class int_data_behavior_class(int_data_class):
       behaviors: list
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class cremental_int_data_class(int_data_class):
       '''
       Creates data object for incremental and decremental data value property
@@ -662,8 +842,7 @@ class cremental_int_data_class(int_data_class):
       amount: int
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class cremental_int_data_behavior_class(cremental_int_data_class):
       '''
       Creates data object for incremental and decremental data value property with behaviors
@@ -673,8 +852,7 @@ class cremental_int_data_behavior_class(cremental_int_data_class):
       behaviors: list
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class single_float_data_class(base_data_class):
       '''
       Creates data object for singular float data value property
@@ -693,8 +871,7 @@ class single_float_data_class(base_data_class):
       max: float
       
 
-@dataclass_json
-@dataclass
+@_data_class
 class float_data_class(slider_data_class):
       '''
       Creates data object for float data value property
@@ -713,8 +890,7 @@ class float_data_class(slider_data_class):
       immutable: bool
       
 
-@dataclass_json
-@dataclass
+@_data_class
 class cremental_float_data_class(float_data_class):
       '''
       Creates data object for incremental and decremental data value property
@@ -724,8 +900,7 @@ class cremental_float_data_class(float_data_class):
       amount: float
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class cremental_float_data_behavior_class(cremental_float_data_class):
       '''
       Creates data object for incremental and decremental data value property with behaviors
@@ -735,8 +910,7 @@ class cremental_float_data_behavior_class(cremental_float_data_class):
       behaviors: list
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class single_mesh_data_class(base_data_class):
       '''
       Creates data object for singular mesh reference
@@ -749,8 +923,7 @@ class single_mesh_data_class(base_data_class):
       visible: bool
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class single_node_data_class(base_data_class):
       '''
       Creates data object for singular mesh reference
@@ -763,8 +936,7 @@ class single_node_data_class(base_data_class):
       type: str
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class mesh_data_class(widget_data_class):
       '''
       Creates data object for a mesh reference
@@ -777,8 +949,7 @@ class mesh_data_class(widget_data_class):
       visible: bool
       
 
-@dataclass_json
-@dataclass
+@_data_class
 class mesh_set_data_class(widget_data_class):
       '''
       Creates data object for a mesh set
@@ -791,8 +962,7 @@ class mesh_set_data_class(widget_data_class):
       selected_index: int
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class morph_set_data_class(widget_data_class):
       '''
       Creates data object for a morph set
@@ -808,8 +978,7 @@ class morph_set_data_class(widget_data_class):
       model_ref: dict
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class mat_set_data_class(widget_data_class):
       '''
       Creates data object for material set
@@ -828,8 +997,7 @@ class mat_set_data_class(widget_data_class):
       selected_index: int
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class anim_prop_data_class(widget_data_class):
       '''
       Creates data object for basic material reference
@@ -860,8 +1028,7 @@ class anim_prop_data_class(widget_data_class):
       model_ref: dict
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class mat_prop_data_class(widget_data_class):
       '''
       Creates data object for basic material reference
@@ -892,8 +1059,7 @@ class mat_prop_data_class(widget_data_class):
       save_data: dict
       
       
-@dataclass_json
-@dataclass
+@_data_class
 class basic_material_class(base_data_class):
       '''
       Creates data object for basic material reference
@@ -909,8 +1075,7 @@ class basic_material_class(base_data_class):
       emissive_intensity: float = None
     
 
-@dataclass_json
-@dataclass
+@_data_class
 class lambert_material_class(base_data_class):
        '''
       Creates data object for lambert material reference
@@ -926,8 +1091,7 @@ class lambert_material_class(base_data_class):
        emissive_intensity: float = None
     
 
-@dataclass_json
-@dataclass
+@_data_class
 class phong_material_class(base_data_class):
       '''
       Creates data object for phong material reference
@@ -949,8 +1113,7 @@ class phong_material_class(base_data_class):
       emissive_intensity: float = None
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class standard_material_class(base_data_class):
        '''
       Creates data object for standard material reference
@@ -972,8 +1135,7 @@ class standard_material_class(base_data_class):
        emissive_intensity: float = None
 
 
-@dataclass_json
-@dataclass
+@_data_class
 class pbr_material_class(base_data_class):
       '''
       Creates data object for pbr material reference
@@ -1003,8 +1165,7 @@ class pbr_material_class(base_data_class):
       emissive: str = None
       emissive_intensity: float = None
 
-@dataclass_json
-@dataclass
+@_data_class
 class interactable_data_class(base_data_class):
       '''
       Base data class for hvym interactables properties
@@ -1061,8 +1222,7 @@ class interactable_data_class(base_data_class):
       behavior: dict
       
 
-@dataclass_json
-@dataclass      
+@_data_class
 class model_debug_data(base_data_class):
       '''
       Creates data object to be used in jinja text renderer for model debug templates.
@@ -1116,35 +1276,186 @@ def _download_unzip(url, out_path):
 
 # Architecture detection now handled by _get_platform_info() function
 
-def _run_command(cmd):
-      process = Popen(cmd, stdout=PIPE, stderr=PIPE, shell=True)
-      output, error = process.communicate()
+COMMAND_TIMEOUT = 120
+DFX_START_TIMEOUT = 60
+BUILD_COMMAND_TIMEOUT = 3600
+COMMAND_LINE_LIMIT = 16 * 1024 * 1024
 
-      if process.returncode != 0:  
-        print("Command failed with error:", error.decode('utf-8'))
-      else:
-        print(output.decode('utf-8'))
-    
+@_data_class
+class command_result_class(base_data_class):
+      '''
+      Outcome of a command run by _run_command or _run_commands.
+      :param argv: The command and its arguments.
+      :type argv:  (list)
+      :param returncode: Exit code, None when the command didn't start or timed out.
+      :type returncode:  (int)
+      :param stdout: Captured standard output, with stderr interleaved when merged.
+      :type stdout:  (str)
+      :param stderr: Captured standard error.
+      :type stderr:  (str)
+      :param timed_out: Whether the command was killed for running past its timeout.
+      :type timed_out:  (bool)
+      :param error: Why the command couldn't be started or its output read.
+      :type error:  (str)
+      '''
+      argv: list
+      returncode: int = None
+      stdout: str = ''
+      stderr: str = ''
+      timed_out: bool = False
+      error: str = None
+
+      @property
+      def ok(self):
+            return self.returncode == 0
+
+      @property
+      def message(self):
+            """Why the command failed, for error output."""
+            if self.error:
+                  return f"{self.argv[0]}: {self.error}"
+            if self.timed_out:
+                  return f"{' '.join(self.argv)} timed out"
+            return (self.stderr or self.stdout).strip() or f"{' '.join(self.argv)} exited with {self.returncode}"
+
+def _stdin_is_terminal():
+      try:
+            return sys.stdin is not None and sys.stdin.isatty()
+      except (AttributeError, ValueError):
+            return False
 
-def _subprocess_output(command, path, procImg=LOADING_IMG, pw=None):
+def _kill_command(process, group):
+      """Kill a command started by _run_command_async, with its whole process group when it has one."""
+      if group:
+            import signal
+            try:
+                  os.killpg(process.pid, signal.SIGKILL)
+                  return
+            except OSError:
+                  pass
+      try:
+            process.kill()
+      except ProcessLookupError:
+            pass
+
+async def _run_command_async(argv, cwd=None, timeout=COMMAND_TIMEOUT, on_stdout=None, on_stderr=None, input=None, merge_stderr=False, env=None):
+      """Run argv without a shell, passing each output line to on_stdout/on_stderr as it arrives.
+
+      input, if given, is written to stdin, otherwise stdin is inherited so
+      the command can still prompt on the terminal. The command is killed once
+      it runs past timeout seconds, None waits for it indefinitely. Commands
+      that can't prompt run in their own session, so everything they started
+      is killed along with them.
+      """
+      import asyncio
+      argv = [str(arg) for arg in argv]
+      group = os.name == 'posix' and (input is not None or not _stdin_is_terminal())
+      try:
+            process = await asyncio.create_subprocess_exec(
+                  shutil.which(argv[0]) or argv[0], *argv[1:], cwd=cwd, env=env, limit=COMMAND_LINE_LIMIT,
+                  stdin=asyncio.subprocess.PIPE if input is not None else None,
+                  stdout=asyncio.subprocess.PIPE,
+                  stderr=asyncio.subprocess.STDOUT if merge_stderr else asyncio.subprocess.PIPE,
+                  start_new_session=group)
+      except OSError as e:
+            return command_result_class(argv, error=str(e))
+
+      async def feed():
+            if input is not None:
+                  try:
+                        process.stdin.write(input.encode('utf-8'))
+                        await process.stdin.drain()
+                        process.stdin.close()
+                  except (BrokenPipeError, ConnectionResetError):
+                        pass
+
+      async def pump(stream, lines, callback):
+            while True:
+                  line = await stream.readline()
+                  if not line:
+                        break
+                  text = line.decode('utf-8', errors='replace')
+                  lines.append(text)
+                  if callback is not None:
+                        callback(text.rstrip('\r\n'))
+
+      stdout = []
+      stderr = []
+      tasks = [feed(), pump(process.stdout, stdout, on_stdout), process.wait()]
+      if not merge_stderr:
+            tasks.append(pump(process.stderr, stderr, on_stderr))
+      try:
+            await asyncio.wait_for(asyncio.gather(*tasks), timeout)
+      except asyncio.TimeoutError:
+            _kill_command(process, group)
+            await process.wait()
+            return command_result_class(argv, None, ''.join(stdout), ''.join(stderr), True)
+      except asyncio.CancelledError:
+            _kill_command(process, group)
+            raise
+      except ValueError:
+            # readline gives up on a line longer than COMMAND_LINE_LIMIT.
+            _kill_command(process, group)
+            await process.wait()
+            return command_result_class(argv, None, ''.join(stdout), ''.join(stderr), error=f"output line longer than {COMMAND_LINE_LIMIT} bytes")
+
+      return command_result_class(argv, process.returncode, ''.join(stdout), ''.join(stderr))
+
+def _run_commands(commands, **kwargs):
+      """Run independent argv lists concurrently, returns their results in order.
+
+      kwargs are passed on to _run_command_async for every command.
+      """
+      import asyncio
+
+      async def run_all():
+            return await asyncio.gather(*(_run_command_async(argv, **kwargs) for argv in commands))
+
+      return list(asyncio.run(run_all()))
+
+def _run_command(argv, **kwargs):
+      """Run one argv list to completion, see _run_command_async."""
+      return _run_commands([argv], **kwargs)[0]
+
+def _run_passphrase_command(argv, pw, cwd=None, timeout=COMMAND_TIMEOUT):
+      """Run a dfx command that asks for an identity passphrase.
+
+      dfx reads the passphrase from its terminal rather than stdin, so this
+      goes through a pexpect pty instead of the asyncio runner.
+      """
+      from pexpect import spawn, TIMEOUT, ExceptionPexpect
+      argv = [str(arg) for arg in argv]
+      try:
+            child = spawn(argv[0], argv[1:], cwd=cwd, timeout=timeout)
+      except ExceptionPexpect as e:
+            return command_result_class(argv, error=str(e))
+      try:
+            child.expect('(?i)passphrase')
+            child.sendline(pw)
+            output = child.read().decode('utf-8')
+      except TIMEOUT:
+            child.close(force=True)
+            return command_result_class(argv, None, '', '', True)
+      except ExceptionPexpect as e:
+            child.close(force=True)
+            return command_result_class(argv, child.exitstatus, error=str(e))
+      child.close()
+      return command_result_class(argv, child.exitstatus, output)
+
+def _subprocess_output(command, path, procImg=LOADING_IMG, pw=None, timeout=BUILD_COMMAND_TIMEOUT):
+      from gifanimus import GifAnimation
       loading = GifAnimation(procImg, 1000, True, '', True)
       loading.Play()
       if not pw:
-            try:
-                  output = subprocess.check_output(command, cwd=path, shell=True, stderr=subprocess.STDOUT)
-                  print(_extract_urls(output.decode('utf-8')))
-                  return output.decode('utf-8')
-            except Exception as e:
-                  print(f"Command failed with error @:{path} with cmd: {command}", str(e))
+            result = _run_command(command, cwd=path, timeout=timeout, merge_stderr=True)
+            if result.ok:
+                  print(_extract_urls(result.stdout))
       else:
-            try:
-                  child = spawn(command)
-                  child.expect('(?i)passphrase')
-                  child.sendline(pw)
-                  output = child.read().decode("utf-8")
-            except Exception as e:
-                  print(f"Command failed with error @:{path} with cmd: {command}", str(e))
+            result = _run_passphrase_command(command, pw, cwd=path, timeout=timeout)
       loading.Stop()
+      if result.ok:
+            return result.stdout
+      print(f"Command failed with error @:{path} with cmd: {' '.join(command)}", result.message)
         
 
 def _subprocess(chain, folders, command, procImg=LOADING_IMG, pw=None):
@@ -1154,9 +1465,113 @@ def _subprocess(chain, folders, command, procImg=LOADING_IMG, pw=None):
 
       return _subprocess_output(command, asset_path, procImg, pw)
 
+DEPLOY_MANIFEST = '.hvym_deploy_manifest.json'
+# dfx writes these into the project on every deploy, they never call for another one.
+DEPLOY_GENERATED_FILES = (DEPLOY_MANIFEST, '.env')
+DEPLOY_GENERATED_DIRS = ('node_modules', '.dfx', 'declarations')
+
+def _file_sha256(path):
+      sha = hashlib.sha256()
+      with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                  sha.update(block)
+      return sha.hexdigest()
+
+def _project_file_hashes(project_path, previous=None):
+      """Hash the top level files and everything under src of a template project.
+
+      Rendered templates live under src so they're covered too, files dfx
+      generates while deploying are not. Entries are [size, mtime, sha256],
+      the hash of a previous entry is reused while size and mtime still match.
+      """
+      previous = previous or {}
+      paths = [name for name in os.listdir(project_path) if name not in DEPLOY_GENERATED_FILES and os.path.isfile(os.path.join(project_path, name))]
+      for dirpath, dirnames, filenames in os.walk(os.path.join(project_path, 'src')):
+            dirnames[:] = [name for name in dirnames if name not in DEPLOY_GENERATED_DIRS]
+            paths += [os.path.relpath(os.path.join(dirpath, name), project_path) for name in filenames]
+
+      files = {}
+      for rel in sorted(paths):
+            path = os.path.join(project_path, rel)
+            stat = os.stat(path)
+            rel = rel.replace(os.sep, '/')
+            old = previous.get(rel)
+            if old and old[0] == stat.st_size and old[1] == stat.st_mtime_ns:
+                  files[rel] = old
+            else:
+                  files[rel] = [stat.st_size, stat.st_mtime_ns, _file_sha256(path)]
+
+      return files
+
+def _load_deploy_manifest(project_path):
+      try:
+            with open(os.path.join(project_path, DEPLOY_MANIFEST), 'rb') as f:
+                  return _json_load(f)
+      except (OSError, ValueError):
+            return {}
+
+def _save_deploy_manifest(project_path, network, files):
+      manifest = _load_deploy_manifest(project_path)
+      manifest[network] = {'deployed': time.time(), 'files': files}
+      with open(os.path.join(project_path, DEPLOY_MANIFEST), 'w') as f:
+            f.write(_json_dumps(manifest))
+
+def _forget_deploy(project_path, network):
+      """Drop the manifest entry of network, so the next deploy to it deploys everything."""
+      manifest = _load_deploy_manifest(project_path)
+      if manifest.pop(network, None) is not None:
+            with open(os.path.join(project_path, DEPLOY_MANIFEST), 'w') as f:
+                  f.write(_json_dumps(manifest))
+
+def _changed_canisters(project_path, old_files, new_files):
+      """Get the canisters that need deploying after a change.
+
+      Returns [] when no file changed, or the sorted names of the canisters
+      owning the changed files plus the canisters depending on them. Returns
+      None when a change can't be attributed to specific canisters, or every
+      canister is affected, meaning the whole project should deploy.
+      """
+      changed = {rel for rel in old_files.keys() | new_files.keys() if (old_files.get(rel) or [None] * 3)[2] != (new_files.get(rel) or [None] * 3)[2]}
+      if not changed:
+            return []
+
+      try:
+            with open(os.path.join(project_path, 'dfx.json'), 'rb') as f:
+                  canisters = _json_load(f).get('canisters', {})
+      except (OSError, ValueError, AttributeError):
+            return None
+
+      roots = {}
+      for name, canister in canisters.items():
+            dirs = [os.path.dirname(canister['main'])] if 'main' in canister else []
+            dirs += canister.get('source', [])
+            entrypoint = (canister.get('frontend') or {}).get('entrypoint')
+            if entrypoint:
+                  dirs.append(os.path.dirname(entrypoint))
+            roots[name] = [os.path.normpath(d).replace(os.sep, '/') + '/' for d in dirs if d]
+
+      names = set()
+      for rel in changed:
+            owners = [name for name, dirs in roots.items() if any(rel.startswith(d) for d in dirs)]
+            if not owners:
+                  return None
+            names.update(owners)
+
+      pending = list(names)
+      while pending:
+            dependency = pending.pop()
+            for name, canister in canisters.items():
+                  if dependency in canister.get('dependencies', []) and name not in names:
+                        names.add(name)
+                        pending.append(name)
+
+      if names == set(canisters):
+            return None
+      return sorted(names)
+
 def _call(cmd):
-      output = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-      return output.stdout.encode('utf-8')
+      result = _run_command(cmd)
+      return (result.stdout if result.ok else result.message).encode('utf-8')
 
 def _create_hex(value):
       sha256_hash = hashlib.sha256()
@@ -1165,7 +1580,7 @@ def _create_hex(value):
 
 def _set_hvym_network():
       """Set the ICP  Heavymeta network."""
-      _ic_set_network('hvym', 1357)
+      _ic_set_network('hvym', HVYM_NETWORK_PORT)
     
 
 def _extract_urls(output):
@@ -1250,27 +1665,113 @@ def _find_section_key_val_TABLE(section, key, val):
      data = section.search(find[f'{key}'] == val)
      return data
 
-def _ic_start_daemon(folder):
-      command = f'{DFX} start --clean --background'
+def _cbor_text(value):
+      """Encode value as a cbor text string."""
+      data = value.encode('utf-8')
+      if len(data) < 24:
+            return bytes([0x60 + len(data)]) + data
+      if len(data) < 0x100:
+            return bytes([0x78, len(data)]) + data
+      return bytes([0x79]) + len(data).to_bytes(2, 'big') + data
+
+def _cbor_text_field(body, key):
+      """Text value that follows the text key in a cbor map, None if there isn't one."""
+      start = body.find(_cbor_text(key))
+      if start < 0:
+            return None
+      pos = start + len(_cbor_text(key))
+      if pos >= len(body) or body[pos] >> 5 != 3:
+            return None
+      size, pos = body[pos] & 0x1f, pos + 1
+      if size > 26:
+            return None
+      if size >= 24:
+            width = 1 << (size - 24)
+            size, pos = int.from_bytes(body[pos:pos + width], 'big'), pos + width
+      if pos + size > len(body):
+            return None
+      return body[pos:pos + size].decode('utf-8', 'replace')
+
+def _http_ready(url, timeout=1.0):
+      """Whether url answers with a replica status that reports itself healthy."""
+      try:
+            with urlopen(url, timeout=timeout) as response:
+                  body = response.read()
+      except (OSError, ValueError, HTTPException):
+            return False
+      return _cbor_text_field(body, 'replica_health_status') == 'healthy'
+
+def _wait_until_ready(url, timeout=DFX_START_TIMEOUT, process=None, initial_delay=0.05, max_delay=1.0):
+      """Poll url with exponential backoff until it's _http_ready.
+
+      Returns False once timeout seconds pass, or straight away if process
+      exits with an error.
+      """
+      deadline = time.monotonic() + timeout
+      delay = initial_delay
+      while True:
+            if _http_ready(url):
+                  return True
+            if process is not None and process.poll() not in (None, 0):
+                  return False
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                  return False
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, max_delay)
+
+def _ic_local_port():
+      """Port the local replica binds to, from networks.json, falling back to the hvym network port."""
+      networks_config = os.path.join(user_config_dir(), 'dfx', 'networks.json')
+      try:
+            with open(networks_config, 'rb') as f:
+                  local = _json_load(f).get('local', {})
+            bind = local.get('bind') or local.get('replica', {}).get('bind')
+            return int(bind.rsplit(':', 1)[1])
+      except (OSError, ValueError, AttributeError, IndexError):
+            return HVYM_NETWORK_PORT
+
+def _ic_start_daemon(folder, timeout=DFX_START_TIMEOUT):
+      """Start dfx for folder in the background and wait until its replica reports healthy.
+
+      Output goes to DFX_START_LOG rather than a pipe, which the background
+      replica would otherwise hold open. Returns a command_result_class with
+      the log as stdout, ok once the replica is up.
+      """
+      command = [DFX, 'start', '--clean', '--background']
       session = _get_session('icp')
       asset_path = os.path.join(session, folder)
-      try:
-            output = subprocess.Popen(command, cwd=asset_path, shell=True, stderr=subprocess.STDOUT)
-            print(_extract_urls(output.decode('utf-8')))
-            return output.decode('utf-8')
-      except Exception as e:
-            print("Command failed with error:", str(e))
+      url = f'http://127.0.0.1:{_ic_local_port()}/api/v2/status'
+
+      # --clean wipes every local canister, none of the projects is deployed locally any more.
+      for template in ICP_PROJECT_TEMPLATES:
+            _forget_deploy(os.path.join(session, template), 'local')
+
+      os.makedirs(os.path.dirname(DFX_START_LOG), exist_ok=True)
+      with open(DFX_START_LOG, 'wb') as log:
+            try:
+                  process = subprocess.Popen(command, cwd=asset_path, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+            except OSError as e:
+                  return command_result_class(command, error=str(e))
+            ready = _wait_until_ready(url, timeout, process)
+
+      with open(DFX_START_LOG, 'r', encoding='utf-8', errors='replace') as f:
+            output = f.read()
+      if ready:
+            return command_result_class(command, 0, output)
+      if process.poll() in (None, 0):
+            return command_result_class(command, None, output, '', True)
+      return command_result_class(command, process.returncode, output)
 
 
 def _ic_stop_daemon(folder):
-      command = f'{DFX} stop'
+      command = [DFX, 'stop']
       session = _get_session('icp')
       asset_path = os.path.join(session, folder)
-      try:
-            output = subprocess.Popen(command, cwd=asset_path, shell=True, stderr=subprocess.STDOUT)
-            return output.decode('utf-8')
-      except Exception as e:
-            print("Command failed with error:", str(e))
+      result = _run_command(command, cwd=asset_path, merge_stderr=True)
+      if not result.ok:
+            print("Command failed with error:", result.message)
+      return result.stdout
 
 
 def _ic_set_network(name, port):
@@ -1285,20 +1786,151 @@ def _ic_set_network(name, port):
 
 def _ic_get_ids():
       """Get the ICP identities installed on this computer."""
-      command = f'{DFX} identity list'
-      output = subprocess.run(command, shell=True, capture_output=True, text=True)
-      return output.stdout
+      return _run_command([DFX, 'identity', 'list']).stdout
 
 
 def _ic_get_active_id():
       """Get the active ICP Identity on this computer."""
-      command = f'{DFX} identity whoami'
-      output = subprocess.run(command, shell=True, capture_output=True, text=True)
-      return output.stdout
+      return _run_command([DFX, 'identity', 'whoami']).stdout
+
+
+def _der_items(data):
+      """Split DER encoded data into its top level (tag, value) pairs."""
+      items = []
+      offset = 0
+      while offset < len(data):
+            tag = data[offset]
+            length = data[offset + 1]
+            offset += 2
+            if length & 0x80:
+                  size = length & 0x7f
+                  length = int.from_bytes(data[offset:offset + size], 'big')
+                  offset += size
+            if offset + length > len(data):
+                  raise ValueError("Truncated DER data")
+            items.append((tag, data[offset:offset + length]))
+            offset += length
+      return items
+
+def _secp256k1_public_point(private_key):
+      """Uncompressed public point of a secp256k1 private key, for pems that don't carry it."""
+      p = SECP256K1_P
+
+      def add(a, b):
+            if a is None:
+                  return b
+            if b is None:
+                  return a
+            if a[0] == b[0] and (a[1] + b[1]) % p == 0:
+                  return None
+            if a == b:
+                  slope = 3 * a[0] * a[0] * pow(2 * a[1], -1, p) % p
+            else:
+                  slope = (b[1] - a[1]) * pow(b[0] - a[0], -1, p) % p
+            x = (slope * slope - a[0] - b[0]) % p
+            return x, (slope * (a[0] - x) - a[1]) % p
+
+      point, addend = None, SECP256K1_G
+      while private_key:
+            if private_key & 1:
+                  point = add(point, addend)
+            addend = add(addend, addend)
+            private_key >>= 1
+      return b'\x04' + point[0].to_bytes(32, 'big') + point[1].to_bytes(32, 'big')
+
+def _sec1_public_key_der(ec_private_key):
+      """SubjectPublicKeyInfo DER of a SEC1 ECPrivateKey, which dfx writes for secp256k1 identities."""
+      fields = _der_items(_der_items(ec_private_key)[0][1])
+      params = dict(fields[2:])
+      if 0xa0 in params and _der_items(params[0xa0])[0][1] != OID_SECP256K1:
+            raise ValueError("Only secp256k1 EC keys are supported")
+      if 0xa1 in params:
+            point = _der_items(params[0xa1])[0][1][1:]
+      else:
+            point = _secp256k1_public_point(int.from_bytes(fields[1][1], 'big'))
+      if point[0] in (2, 3):
+            x = int.from_bytes(point[1:], 'big')
+            y = pow(x * x * x + 7, (SECP256K1_P + 1) // 4, SECP256K1_P)
+            if y & 1 != point[0] & 1:
+                  y = SECP256K1_P - y
+            point = b'\x04' + point[1:] + y.to_bytes(32, 'big')
+      return SECP256K1_DER_PREFIX + point
+
+def _ic_public_key_der(pem):
+      """SubjectPublicKeyInfo DER of the Ed25519 or secp256k1 key in a dfx identity.pem."""
+      for label, body in re.findall(r'-----BEGIN ([A-Z ]+)-----(.*?)-----END \1-----', pem, re.S):
+            der = b64decode(''.join(body.split()))
+            if label == 'EC PRIVATE KEY':
+                  return _sec1_public_key_der(der)
+            if label != 'PRIVATE KEY':
+                  continue
+
+            # PKCS#8, Ed25519 keys may carry their public key as [1] after the private key.
+            fields = _der_items(_der_items(der)[0][1])
+            algorithm = _der_items(fields[1][1])
+            if algorithm[0][1] == OID_EC_PUBLIC_KEY:
+                  return _sec1_public_key_der(fields[2][1])
+            if algorithm[0][1] != OID_ED25519:
+                  raise ValueError("Unsupported identity key algorithm")
+            for tag, value in fields[3:]:
+                  if tag == 0x81:
+                        return ED25519_DER_PREFIX + value[1:]
+                  if tag == 0xa1:
+                        return ED25519_DER_PREFIX + _der_items(value)[0][1][1:]
+            from nacl.signing import SigningKey
+            seed = _der_items(fields[2][1])[0][1]
+            return ED25519_DER_PREFIX + bytes(SigningKey(seed).verify_key)
+
+      raise ValueError("No private key in pem")
+
+def _ic_principal_text(raw):
+      """Textual form of principal bytes: crc32 + bytes, base32 in groups of five."""
+      text = b32encode(zlib.crc32(raw).to_bytes(4, 'big') + raw).decode('ascii').lower().rstrip('=')
+      return '-'.join(text[i:i + 5] for i in range(0, len(text), 5))
+
+def _ic_principal_from_der(der):
+      """Self-authenticating principal of a DER encoded public key."""
+      return _ic_principal_text(hashlib.sha224(der).digest() + b'\x02')
+
+def _ic_identity_principal(name):
+      """Principal of a dfx identity computed from its identity.pem, without running dfx.
+
+      Returns None when dfx has to be asked instead: password protected and
+      keyring identities have no plaintext pem. Results are cached for the
+      life of the process, until the pem changes.
+      """
+      if name == 'anonymous':
+            return IC_ANONYMOUS_PRINCIPAL
+      pem_path = os.path.join(DFX_IDENTITY_PATH, name, 'identity.pem')
+      try:
+            stat = os.stat(pem_path)
+      except OSError:
+            return None
+
+      key = (stat.st_mtime_ns, stat.st_size)
+      cached = _IC_PRINCIPAL_CACHE.get(pem_path)
+      if cached is not None and cached[0] == key:
+            return cached[1]
+
+      try:
+            with open(pem_path, 'r') as f:
+                  principal = _ic_principal_from_der(_ic_public_key_der(f.read()))
+      except (OSError, ValueError, IndexError, ImportError):
+            return None
+      _IC_PRINCIPAL_CACHE[pem_path] = (key, principal)
+      return principal
+
+def _ic_current_identity():
+      """Name of the identity dfx uses by default, read from its identity.json."""
+      try:
+            with open(DFX_IDENTITY_JSON, 'rb') as f:
+                  return _json_load(f).get('default', 'default')
+      except (OSError, ValueError, AttributeError):
+            return 'default'
 
 
 def _ic_get_principal_by_id(id, pw=None):
-      principal = _ic_get_stored_principal(id)
+      principal = _ic_identity_principal(id.strip()) or _ic_get_stored_principal(id)
       if not principal:
             if not _ic_account_is_encrypted(id.strip()):
                   principal = _ic_get_principal(pw).strip()
@@ -1318,15 +1950,12 @@ def _ic_get_stored_principal(id):
      
 
 def _ic_get_principal(pw=None):
-      command = f'{DFX} identity get-principal'
+      command = [DFX, 'identity', 'get-principal']
       output = None
       if not pw:
            output = _ic_get_test_principal()
       else:
-           child = spawn(command)
-           child.expect('(?i)passphrase')
-           child.sendline(pw)
-           output = child.read().decode("utf-8")
+           output = _run_passphrase_command(command, pw).stdout
            output = output.split('\r\n')
            output = output[len(output)-2]
 
@@ -1334,9 +1963,10 @@ def _ic_get_principal(pw=None):
 
 
 def _ic_get_test_principal():
-      command = f'{DFX} identity get-principal'
-      output = subprocess.run(command, shell=True, capture_output=True, text=True)
-      return output.stdout
+      principal = _ic_identity_principal(_ic_current_identity())
+      if principal is not None:
+            return principal
+      return _run_command([DFX, 'identity', 'get-principal']).stdout
 
 
 def _ic_account_is_encrypted(id):
@@ -1355,27 +1985,29 @@ def _ic_id_info():
 
 
 def _ic_set_id(cryptonym):
-      command = f'{DFX} identity use {cryptonym}'
-      output = subprocess.run(command, shell=True, capture_output=True, text=True)
+      result = _run_command([DFX, 'identity', 'use', cryptonym], merge_stderr=True)
+      if not result.ok:
+            raise RuntimeError(result.message)
       _ic_update_data()
-      return output.stdout
+      return result.stdout
 
 
 def _ic_new_test_id(cryptonym):
-      return subprocess.check_output(f'{DFX} identity new {cryptonym} --storage-mode plaintext', shell=True, stderr=subprocess.STDOUT).decode("utf-8")
+      result = _run_command([DFX, 'identity', 'new', cryptonym, '--storage-mode', 'plaintext'], merge_stderr=True)
+      if not result.ok:
+            raise RuntimeError(result.message)
+      return result.stdout
 
 
 def _ic_new_encrypted_id(cryptonym, pw):
-      child = spawn(f"{DFX} identity new {cryptonym} --storage-mode password-protected")
-      child.expect('(?i)passphrase')
-      child.sendline(pw)
-      return child.read().decode("utf-8")
+      return _run_passphrase_command([DFX, 'identity', 'new', cryptonym, '--storage-mode', 'password-protected'], pw).stdout
 
 def _ic_remove_id(cryptonym):
-      command = f'{DFX} identity remove {cryptonym}'
-      output = subprocess.run(command, shell=True, capture_output=True, text=True)
+      result = _run_command([DFX, 'identity', 'remove', cryptonym], merge_stderr=True)
+      if not result.ok:
+            raise RuntimeError(result.message)
       _ic_update_data()
-      return output.stdout
+      return result.stdout
 
 def _update_IC_IDS_TABLE(table, key):
      _update_section_TABLE(IC_IDS, table, key)
@@ -1392,13 +2024,15 @@ def _ic_update_data(pw=None, init=False):
       if not pw:
            encrypted = False
 
-      ids = _ic_get_ids()
-      active = _ic_get_active_id().strip()
+      ids, active = (result.stdout for result in _run_commands([[DFX, 'identity', 'list'], [DFX, 'identity', 'whoami']]))
+      active = active.strip()
 
-      if init and active.strip() != 'default' and active.strip() != 'anonymous':
-           return
-      
-      principal = _ic_get_principal_by_id(active, pw)
+      if init and active != 'default' and active != 'anonymous':
+           # Refreshing a snapshot must not prompt, so password protected ids keep their stored principal and state.
+           principal = _ic_identity_principal(active) or _ic_get_stored_principal(active)
+           encrypted = _ic_account_is_encrypted(active)
+      else:
+           principal = _ic_get_principal_by_id(active, pw)
 
       ids=ids.split('\n')
       tables=[]
@@ -1407,7 +2041,10 @@ def _ic_update_data(pw=None, init=False):
       
       for _id in ids:
             enc = encrypted
-            prn = principal
+            prn = _ic_identity_principal(_id.strip()) if _id.strip() else None
+            if prn is None:
+                  # Password protected and keyring ids only get a principal once they have been active.
+                  prn = principal if _id.strip() == active else _ic_get_stored_principal(_id.strip())
             if _id.strip() == 'default' or _id.strip() == 'anonymous':
                  enc = False
                  if _id.strip() == 'anonymous':
@@ -1436,7 +2073,7 @@ def _ic_update_data(pw=None, init=False):
             _update_IC_IDS_TABLE(table, 'active')
             if table['id'] == active:
                   _update_IC_IDS_TABLE(table, 'encrypted')
-                  _update_IC_IDS_TABLE(table, 'principal')
+            _update_IC_IDS_TABLE(table, 'principal')
 
       #reorder list so active id is at the top
       for _id in id_arr:
@@ -1450,6 +2087,52 @@ def _ic_update_data(pw=None, init=False):
       else:
             IC_IDS.update(table, find.data_type == 'IC_ID_ACTIVE')
 
+      _ic_save_identity_fingerprint()
+
+
+def _ic_identity_fingerprint():
+      """Modification times of the dfx identity store, changes whenever an id is added, removed or selected."""
+      paths = [DFX_IDENTITY_JSON, DFX_IDENTITY_PATH]
+      if os.path.isdir(DFX_IDENTITY_PATH):
+            paths += sorted(os.path.join(DFX_IDENTITY_PATH, name) for name in os.listdir(DFX_IDENTITY_PATH))
+
+      fingerprint = []
+      for path in paths:
+            try:
+                  fingerprint.append([path, os.stat(path).st_mtime_ns])
+            except OSError:
+                  fingerprint.append([path, None])
+
+      return fingerprint
+
+
+def _ic_save_identity_fingerprint(fingerprint=None):
+      find = Query()
+      table = {'data_type': 'IC_ID_SNAPSHOT', 'fingerprint': fingerprint or _ic_identity_fingerprint()}
+      if len(IC_IDS.search(find.data_type == 'IC_ID_SNAPSHOT'))==0:
+            IC_IDS.insert(table)
+      else:
+            IC_IDS.update(table, find.data_type == 'IC_ID_SNAPSHOT')
+
+
+def _ic_identity_snapshot():
+      """Get the cached active id info, only calling dfx when the identity store has changed since the last update."""
+      find = Query()
+      cached = IC_IDS.get(find.data_type == 'IC_ID_SNAPSHOT')
+      if cached is None or cached['fingerprint'] != _ic_identity_fingerprint():
+            _ic_update_data(None, True)
+
+      return _ic_id_info()
+
+
+def _ic_active_id():
+      """Get the active ICP identity from the cached snapshot, falling back to dfx."""
+      snapshot = _ic_identity_snapshot()
+      if snapshot is not None:
+            return snapshot['active_id']
+
+      return _ic_get_active_id().strip()
+
 
 def _ic_create_model_repo(path):
       folder = 'dapp'
@@ -1575,43 +2258,33 @@ def _ic_minter_model_path():
       return os.path.join(_ic_minter_path(), 'src', 'proprium_minter_frontend', 'assets')
 
 def _npm_install(path, loading=None):
-      try:
-            _subprocess_output('npm install', path) 
-                
-      except Exception as e:  
-            print("Command failed with error:", str(e))
+      _subprocess_output(['npm', 'install'], path)
 
       if loading != None:
             loading.Stop()
 
-def _npm_new_link(path):
-      try:
-            output = subprocess.check_output('npm link', cwd=path, shell=True, stderr=subprocess.STDOUT)
-            print(output.decode('utf-8'))
+def _npm_command(command, path=None):
+      result = _run_command(command, cwd=path, timeout=BUILD_COMMAND_TIMEOUT, merge_stderr=True)
+      if result.ok:
+            print(result.stdout)
+      else:
+            print("Command failed with error:", result.message)
+      return result
 
-      except Exception as e:  
-            print("Command failed with error:", str(e))
+def _npm_new_link(path):
+      _npm_command(['npm', 'link'], path)
 
 def _npm_link_module(module, path):
-      try:
-            output = subprocess.check_output(f'npm link {module}', cwd=path, shell=True, stderr=subprocess.STDOUT)
-            print(output.decode('utf-8'))
-
-      except Exception as e:  
-            print("Command failed with error:", str(e))
+      _npm_command(['npm', 'link', module], path)
 
 def _npm_unlink(module):
-      try:
-            command = f'npm unlink {module} --global'
-            output = subprocess.run(command, shell=True, capture_output=True, text=True)
-
-      except Exception as e:  
-            print("Command failed with error:", str(e))
+      result = _run_command(['npm', 'unlink', module, '--global'])
+      if not result.ok:
+            print("Command failed with error:", result.message)
 
 def _npm_list_links():
-      command = 'npm ls --link --global'
-      output = subprocess.run(command, shell=True, capture_output=True, text=True)
-      return re.split(r'\s+|\n', output.stdout)
+      result = _run_command(['npm', 'ls', '--link', '--global'])
+      return re.split(r'\s+|\n', result.stdout)
 
 def _module_is_linked(module):
       result = False
@@ -1692,7 +2365,7 @@ def _parse_hvym_data(hvym_data, model):
       all_call_props = {}
       contract_props = None
       data = {}
-      active = _ic_get_active_id().strip()
+      active = _ic_active_id()
       principal = _ic_get_stored_principal(active)
       creator_hash = _create_hex(principal.encode('utf-8')).upper()
 
@@ -1718,26 +2391,925 @@ def _parse_hvym_data(hvym_data, model):
 
       return data
 
+GLB_MAGIC = b'glTF'
+GLB_HEADER = struct.Struct('<4sII')
+GLB_CHUNK_HEADER = struct.Struct('<II')
+GLB_CHUNK_JSON = 0x4E4F534A
+GLB_CHUNK_BIN = 0x004E4942
+
+def _read_glb_json_chunk(model_path):
+      """Read the raw JSON chunk of a .glb, the BIN chunk is never read.
+
+      Returns None when the file isn't a binary glTF.
+      """
+      with open(model_path, 'rb') as f:
+            header = f.read(GLB_HEADER.size)
+            if header[:4] != GLB_MAGIC:
+                  return None
+            chunk_header = f.read(GLB_CHUNK_HEADER.size)
+            if len(header) < GLB_HEADER.size or len(chunk_header) < GLB_CHUNK_HEADER.size:
+                  raise ValueError(f"Truncated GLB header in: {model_path}")
+            _, _, length = GLB_HEADER.unpack(header)
+            chunk_length, chunk_type = GLB_CHUNK_HEADER.unpack(chunk_header)
+            if chunk_type != GLB_CHUNK_JSON or chunk_length > length - GLB_HEADER.size - GLB_CHUNK_HEADER.size:
+                  raise ValueError(f"Malformed GLB JSON chunk in: {model_path}")
+            chunk = f.read(chunk_length)
+            if len(chunk) != chunk_length:
+                  raise ValueError(f"Truncated GLB JSON chunk in: {model_path}")
+
+      return chunk
+
+def _read_glb_json(model_path):
+      """Parse only the JSON chunk of a .glb, returns None when the file isn't a binary glTF."""
+      chunk = _read_glb_json_chunk(model_path)
+      if chunk is None:
+            return None
+      return _json_loads(chunk)
+
+def _copy_file_range(src_fd, dst_fd, offset, count):
+      """Copy count bytes from offset in src_fd to the position of dst_fd inside the kernel when possible."""
+      for copy in (getattr(os, 'copy_file_range', None), getattr(os, 'sendfile', None)):
+            if copy is None:
+                  continue
+            try:
+                  while count > 0:
+                        if copy is os.sendfile:
+                              sent = copy(dst_fd, src_fd, offset, count)
+                        else:
+                              sent = copy(src_fd, dst_fd, count, offset)
+                        if sent == 0:
+                              break
+                        offset += sent
+                        count -= sent
+                  if count == 0:
+                        return
+            except OSError:
+                  continue
+
+      os.lseek(src_fd, offset, os.SEEK_SET)
+      while count > 0:
+            block = os.read(src_fd, min(count, 1024 * 1024))
+            if not block:
+                  raise ValueError(f"Unexpected end of file while copying {count} bytes")
+            os.write(dst_fd, block)
+            count -= len(block)
+
+def _write_glb_json(model_path, gltf_json, out_path=None):
+      """Replace the JSON chunk of a .glb, leaving the chunks after it untouched.
+
+      The new file is written to a temp file next to out_path (model_path by
+      default), with the BIN chunk copied by copy_file_range or sendfile, and is
+      renamed over it once complete.
+      """
+      out_path = out_path or model_path
+      chunk = _read_glb_json_chunk(model_path)
+      if chunk is None:
+            raise ValueError(f"Not a GLB file: {model_path}")
+      rest_offset = GLB_HEADER.size + GLB_CHUNK_HEADER.size + len(chunk)
+
+      json_bytes = _json_dumps(gltf_json).encode('utf-8')
+      json_bytes += b' ' * (-len(json_bytes) % 4)
+
+      tmp_path = os.path.join(os.path.dirname(os.path.abspath(out_path)), f'.{os.path.basename(out_path)}.{os.getpid()}.tmp')
+      src_fd = os.open(model_path, os.O_RDONLY)
+      try:
+            stat = os.fstat(src_fd)
+            rest = stat.st_size - rest_offset
+            dst_fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, stat.st_mode & 0o777)
+            try:
+                  length = GLB_HEADER.size + GLB_CHUNK_HEADER.size + len(json_bytes) + rest
+                  os.write(dst_fd, GLB_HEADER.pack(GLB_MAGIC, 2, length) + GLB_CHUNK_HEADER.pack(len(json_bytes), GLB_CHUNK_JSON) + json_bytes)
+                  _copy_file_range(src_fd, dst_fd, rest_offset, rest)
+                  os.fsync(dst_fd)
+            finally:
+                  os.close(dst_fd)
+            os.replace(tmp_path, out_path)
+      except BaseException:
+            if os.path.exists(tmp_path):
+                  os.remove(tmp_path)
+            raise
+      finally:
+            os.close(src_fd)
+
+GLB_FLOAT = 5126
+GLB_BYTE = 5120
+GLB_ARRAY_BUFFER = 34962
+GLB_FLOAT3 = struct.Struct('<3f')
+GLB_BYTE3_PADDED = struct.Struct('<3bx')
+GLB_PRUNABLE_EXTENSIONS = ('HVYM_', 'KHR_materials_', 'KHR_texture_', 'KHR_mesh_quantization', 'KHR_lights_punctual', 'KHR_draco_mesh_compression', 'EXT_texture_')
+
+def _read_glb(model_path):
+      """Read a .glb into its json and a memoryview of its BIN chunk."""
+      chunk = _read_glb_json_chunk(model_path)
+      if chunk is None:
+            raise ValueError(f"Not a GLB file: {model_path}")
+
+      bin_chunk = memoryview(b'')
+      with open(model_path, 'rb') as f:
+            f.seek(GLB_HEADER.size + GLB_CHUNK_HEADER.size + len(chunk))
+            chunk_header = f.read(GLB_CHUNK_HEADER.size)
+            if len(chunk_header) == GLB_CHUNK_HEADER.size:
+                  length, chunk_type = GLB_CHUNK_HEADER.unpack(chunk_header)
+                  if chunk_type == GLB_CHUNK_BIN:
+                        bin_chunk = memoryview(f.read(length))
+
+      return _json_loads(chunk), bin_chunk
+
+def _write_glb(out_path, gltf_json, bin_chunk):
+      """Write a .glb to a temp file next to out_path and rename it into place."""
+      json_bytes = _json_dumps(gltf_json).encode('utf-8')
+      json_bytes += b' ' * (-len(json_bytes) % 4)
+      bin_padding = b'\0' * (-len(bin_chunk) % 4)
+      length = GLB_HEADER.size + GLB_CHUNK_HEADER.size + len(json_bytes)
+      if len(bin_chunk):
+            length += GLB_CHUNK_HEADER.size + len(bin_chunk) + len(bin_padding)
+
+      tmp_path = os.path.join(os.path.dirname(os.path.abspath(out_path)), f'.{os.path.basename(out_path)}.{os.getpid()}.tmp')
+      try:
+            with open(tmp_path, 'xb') as f:
+                  f.write(GLB_HEADER.pack(GLB_MAGIC, 2, length))
+                  f.write(GLB_CHUNK_HEADER.pack(len(json_bytes), GLB_CHUNK_JSON))
+                  f.write(json_bytes)
+                  if len(bin_chunk):
+                        f.write(GLB_CHUNK_HEADER.pack(len(bin_chunk) + len(bin_padding), GLB_CHUNK_BIN))
+                        f.write(bin_chunk)
+                        f.write(bin_padding)
+            os.replace(tmp_path, out_path)
+      except BaseException:
+            if os.path.exists(tmp_path):
+                  os.remove(tmp_path)
+            raise
+
+def _glb_refs(obj, key):
+      """Yield every integer stored under key anywhere inside obj."""
+      if isinstance(obj, dict):
+            for k, v in obj.items():
+                  if k == key and isinstance(v, int):
+                        yield v
+                  else:
+                        yield from _glb_refs(v, key)
+      elif isinstance(obj, list):
+            for v in obj:
+                  yield from _glb_refs(v, key)
+
+def _glb_remap(obj, key, mapping):
+      """Rewrite every integer stored under key anywhere inside obj through mapping."""
+      if isinstance(obj, dict):
+            for k, v in obj.items():
+                  if k == key and isinstance(v, int):
+                        obj[k] = mapping[v]
+                  else:
+                        _glb_remap(v, key, mapping)
+      elif isinstance(obj, list):
+            for v in obj:
+                  _glb_remap(v, key, mapping)
+
+def _glb_hvym_names(obj):
+      """Yield every name in the HVYM data, the meshes, morphs and materials it swaps at runtime among them."""
+      if isinstance(obj, dict):
+            for k, v in obj.items():
+                  if k == 'name' and isinstance(v, str):
+                        yield v
+                  else:
+                        yield from _glb_hvym_names(v)
+      elif isinstance(obj, list):
+            for v in obj:
+                  yield from _glb_hvym_names(v)
+
+def _glb_remap_accessors(gltf, mapping):
+      for mesh in gltf.get('meshes', []):
+            for primitive in mesh.get('primitives', []):
+                  attributes = primitive.get('attributes', {})
+                  for name, index in attributes.items():
+                        attributes[name] = mapping[index]
+                  if 'indices' in primitive:
+                        primitive['indices'] = mapping[primitive['indices']]
+                  for target in primitive.get('targets', []):
+                        for name, index in target.items():
+                              target[name] = mapping[index]
+      for skin in gltf.get('skins', []):
+            if 'inverseBindMatrices' in skin:
+                  skin['inverseBindMatrices'] = mapping[skin['inverseBindMatrices']]
+      for animation in gltf.get('animations', []):
+            for sampler in animation.get('samplers', []):
+                  sampler['input'] = mapping[sampler['input']]
+                  sampler['output'] = mapping[sampler['output']]
+
+def _glb_remap_buffer_views(gltf, mapping):
+      for key, value in gltf.items():
+            if key != 'bufferViews':
+                  _glb_remap(value, 'bufferView', mapping)
+
+def _glb_drop_buffer_views(gltf, views, candidates):
+      """Drop the candidate bufferViews nothing references any more, returns how many were dropped."""
+      used = set()
+      for key, value in gltf.items():
+            if key != 'bufferViews':
+                  used.update(_glb_refs(value, 'bufferView'))
+      dropped = set(candidates) - used
+      if dropped:
+            kept = [i for i in range(len(views)) if i not in dropped]
+            gltf['bufferViews'] = [gltf['bufferViews'][i] for i in kept]
+            views[:] = [views[i] for i in kept]
+            _glb_remap_buffer_views(gltf, {old: new for new, old in enumerate(kept)})
+      return len(dropped)
+
+def _glb_quantize_normals(gltf, views, keep_names):
+      """Store float normals as normalized bytes, skipping meshes named in the HVYM data and morphed or compressed primitives."""
+      accessors = gltf.get('accessors', [])
+      eligible = {}
+      for mesh in gltf.get('meshes', []):
+            for primitive in mesh.get('primitives', []):
+                  normal = primitive.get('attributes', {}).get('NORMAL')
+                  if normal is not None:
+                        ok = mesh.get('name') not in keep_names and not primitive.get('targets') and not primitive.get('extensions')
+                        eligible[normal] = eligible.get(normal, True) and ok
+
+      quantized = 0
+      replaced = set()
+      for index, ok in eligible.items():
+            accessor = accessors[index]
+            if not ok or accessor.get('componentType') != GLB_FLOAT or accessor.get('type') != 'VEC3' or 'sparse' in accessor or 'bufferView' not in accessor:
+                  continue
+            data = views[accessor['bufferView']]
+            stride = gltf['bufferViews'][accessor['bufferView']].get('byteStride') or GLB_FLOAT3.size
+            offset = accessor.get('byteOffset', 0)
+            out = bytearray(GLB_BYTE3_PADDED.size * accessor['count'])
+            for i in range(accessor['count']):
+                  x, y, z = GLB_FLOAT3.unpack_from(data, offset + i * stride)
+                  GLB_BYTE3_PADDED.pack_into(out, i * GLB_BYTE3_PADDED.size, round(max(-1.0, min(1.0, x)) * 127), round(max(-1.0, min(1.0, y)) * 127), round(max(-1.0, min(1.0, z)) * 127))
+
+            replaced.add(accessor['bufferView'])
+            gltf['bufferViews'].append({'buffer': 0, 'byteLength': len(out), 'byteStride': GLB_BYTE3_PADDED.size, 'target': GLB_ARRAY_BUFFER})
+            views.append(memoryview(out))
+            accessor.update({'bufferView': len(views) - 1, 'byteOffset': 0, 'componentType': GLB_BYTE, 'normalized': True})
+            accessor.pop('min', None)
+            accessor.pop('max', None)
+            quantized += 1
+
+      if quantized:
+            # Dropped here rather than left to _glb_prune, which doesn't run on files using unknown extensions.
+            _glb_drop_buffer_views(gltf, views, replaced)
+            for key in ('extensionsUsed', 'extensionsRequired'):
+                  if 'KHR_mesh_quantization' not in gltf.setdefault(key, []):
+                        gltf[key].append('KHR_mesh_quantization')
+
+      return quantized
+
+def _glb_prune(gltf, views, keep_names):
+      """Drop accessors, bufferViews, materials, textures, images and samplers nothing references, returns counts removed."""
+      accessors = gltf.get('accessors', [])
+      materials = gltf.get('materials', [])
+      textures = gltf.get('textures', [])
+      images = gltf.get('images', [])
+      # Ordered so each kind is pruned after everything that references it.
+      used = {kind: set() for kind in ('materials', 'textures', 'images', 'samplers', 'accessors', 'bufferViews')}
+
+      for mesh in gltf.get('meshes', []):
+            for primitive in mesh.get('primitives', []):
+                  used['accessors'].update(primitive.get('attributes', {}).values())
+                  if 'indices' in primitive:
+                        used['accessors'].add(primitive['indices'])
+                  for target in primitive.get('targets', []):
+                        used['accessors'].update(target.values())
+                  used['materials'].update(_glb_refs(primitive, 'material'))
+      for skin in gltf.get('skins', []):
+            if 'inverseBindMatrices' in skin:
+                  used['accessors'].add(skin['inverseBindMatrices'])
+      for animation in gltf.get('animations', []):
+            for sampler in animation.get('samplers', []):
+                  used['accessors'].update((sampler['input'], sampler['output']))
+
+      used['materials'].update(i for i, material in enumerate(materials) if material.get('name') in keep_names)
+      for i in used['materials']:
+            used['textures'].update(_glb_refs(materials[i], 'index'))
+      for i in used['textures']:
+            used['images'].update(_glb_refs(textures[i], 'source'))
+            if 'sampler' in textures[i]:
+                  used['samplers'].add(textures[i]['sampler'])
+      for i in used['accessors']:
+            used['bufferViews'].update(_glb_refs(accessors[i], 'bufferView'))
+      for i in used['images']:
+            used['bufferViews'].update(_glb_refs(images[i], 'bufferView'))
+      for key, value in gltf.items():
+            if key not in ('accessors', 'images', 'bufferViews'):
+                  used['bufferViews'].update(_glb_refs(value, 'bufferView'))
+
+      removed = {}
+      for kind, indices in used.items():
+            items = gltf.get(kind, [])
+            kept = sorted(indices)
+            removed[kind] = len(items) - len(kept)
+            if not removed[kind]:
+                  continue
+            mapping = {old: new for new, old in enumerate(kept)}
+            if kept:
+                  gltf[kind] = [items[i] for i in kept]
+            else:
+                  gltf.pop(kind)
+            if kind == 'accessors':
+                  _glb_remap_accessors(gltf, mapping)
+            elif kind == 'bufferViews':
+                  views[:] = [views[i] for i in kept]
+                  _glb_remap_buffer_views(gltf, mapping)
+            elif kind == 'materials':
+                  _glb_remap(gltf.get('meshes', []), 'material', mapping)
+            elif kind == 'textures':
+                  _glb_remap(gltf.get('materials', []), 'index', mapping)
+            elif kind == 'images':
+                  _glb_remap(gltf.get('textures', []), 'source', mapping)
+            elif kind == 'samplers':
+                  _glb_remap(gltf.get('textures', []), 'sampler', mapping)
+
+      return removed
+
+def _glb_dedupe_buffer_views(gltf, views):
+      """Merge bufferViews holding identical bytes, returns how many were merged."""
+      buffer_views = gltf.get('bufferViews', [])
+      seen = {}
+      kept = []
+      mapping = {}
+      for i, (view, data) in enumerate(zip(buffer_views, views)):
+            key = (hashlib.sha256(data).digest(), view.get('byteStride'), view.get('target'))
+            if key not in seen:
+                  seen[key] = len(kept)
+                  kept.append(i)
+            mapping[i] = seen[key]
+
+      if len(kept) < len(buffer_views):
+            gltf['bufferViews'] = [buffer_views[i] for i in kept]
+            views[:] = [views[i] for i in kept]
+            _glb_remap_buffer_views(gltf, mapping)
+
+      return len(buffer_views) - len(kept)
+
+def _glb_repack(gltf, views):
+      """Lay the bufferViews out back to back in a new BIN chunk, 4 byte aligned."""
+      out = bytearray()
+      for view, data in zip(gltf.get('bufferViews', []), views):
+            out += b'\0' * (-len(out) % 4)
+            view.update({'buffer': 0, 'byteOffset': len(out), 'byteLength': len(data)})
+            out += data
+
+      if out:
+            buffers = gltf.setdefault('buffers', [{}])
+            buffers[0]['byteLength'] = len(out)
+      else:
+            gltf.pop('buffers', None)
+
+      return out
+
+TEXTURE_FORMATS = ('webp', 'jpeg', 'png')
+
+def _image_mime(data):
+      if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+            return 'image/webp'
+      if data[:3] == b'\xff\xd8\xff':
+            return 'image/jpeg'
+      return 'image/png'
+
+def _compress_texture(data, max_size=None, texture_format='webp', quality=85):
+      """Downscale an image to max_size and re-encode it, returns (bytes, cached).
+
+      Opaque images become webp or jpeg, images with alpha stay webp or become
+      256 color pngs. The original bytes are returned when re-encoding doesn't
+      make them smaller. Results are cached on disk by the image's sha256 and
+      the settings used.
+      """
+      key = f'{hashlib.sha256(data).hexdigest()}_{max_size or 0}_{texture_format}_{quality}'
+      cache_path = os.path.join(TEXTURE_CACHE_PATH, key)
+      if os.path.isfile(cache_path):
+            with open(cache_path, 'rb') as f:
+                  return f.read(), True
+
+      from PIL import Image
+      image = Image.open(BytesIO(data))
+      has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+      image = image.convert('RGBA' if has_alpha else 'RGB')
+      resized = bool(max_size) and max(image.size) > max_size
+      if resized:
+            image.thumbnail((max_size, max_size), Image.LANCZOS)
+
+      out = BytesIO()
+      if texture_format == 'webp':
+            image.save(out, 'WEBP', quality=quality, method=4)
+      elif texture_format == 'jpeg' and not has_alpha:
+            image.save(out, 'JPEG', quality=quality, optimize=True)
+      else:
+            image.quantize(256, method=Image.Quantize.FASTOCTREE if has_alpha else Image.Quantize.MEDIANCUT).save(out, 'PNG', optimize=True)
+      result = out.getvalue()
+      if not resized and len(result) >= len(data):
+            result = data
+
+      os.makedirs(TEXTURE_CACHE_PATH, exist_ok=True)
+      tmp_path = f'{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+      with open(tmp_path, 'wb') as f:
+            f.write(result)
+      os.replace(tmp_path, cache_path)
+      return result, False
+
+def _glb_compress_textures(gltf, views, max_size=None, texture_format='webp', quality=85, jobs=None):
+      """Recompress the images embedded in bufferViews on a thread pool, returns a report per bufferView."""
+      images = gltf.get('images', [])
+      by_view = {}
+      for i, image in enumerate(images):
+            if 'bufferView' in image:
+                  by_view.setdefault(image['bufferView'], []).append(i)
+
+      from concurrent.futures import ThreadPoolExecutor
+      from PIL import Image
+      with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = {view: pool.submit(_compress_texture, bytes(views[view]), max_size, texture_format, quality) for view in by_view}
+
+      report = []
+      webp_images = set()
+      for view, future in futures.items():
+            entry = {'images': by_view[view], 'before': len(views[view])}
+            try:
+                  data, entry['cached'] = future.result()
+            except (OSError, ValueError, Image.DecompressionBombError) as e:
+                  entry['error'] = str(e)
+                  report.append(entry)
+                  continue
+            entry['after'] = len(data)
+            report.append(entry)
+            views[view] = memoryview(data)
+            mime = _image_mime(data)
+            for i in by_view[view]:
+                  images[i]['mimeType'] = mime
+                  if mime == 'image/webp':
+                        webp_images.add(i)
+
+      if webp_images:
+            for texture in gltf.get('textures', []):
+                  if texture.get('source') in webp_images:
+                        texture.setdefault('extensions', {})['EXT_texture_webp'] = {'source': texture.pop('source')}
+            for key in ('extensionsUsed', 'extensionsRequired'):
+                  if 'EXT_texture_webp' not in gltf.setdefault(key, []):
+                        gltf[key].append('EXT_texture_webp')
+
+      return report
+
+def _optimize_glb(model_path, out_path=None, quantize=False, max_texture_size=None, texture_format=None, quality=85, jobs=None):
+      """Shrink a self contained .glb before it is deployed, returns a report of what changed.
+
+      Unreferenced accessors, bufferViews, materials, textures, images and
+      samplers are dropped, bufferViews with identical bytes are merged and the
+      BIN chunk is repacked without the gaps. Materials named in the HVYM data
+      are kept even when no mesh uses them, since material sets swap them in at
+      runtime. With quantize, normals are stored as normalized bytes
+      (KHR_mesh_quantization) on meshes the HVYM data doesn't name. With
+      max_texture_size or texture_format, embedded images are recompressed.
+      """
+      out_path = out_path or model_path
+      before = os.path.getsize(model_path)
+      gltf, bin_chunk = _read_glb(model_path)
+      buffers = gltf.get('buffers', [])
+      if len(buffers) > 1 or any('uri' in buffer for buffer in buffers):
+            raise ValueError(f"Only GLB files with a single embedded buffer can be optimized: {model_path}")
+
+      keep_names = set(_glb_hvym_names((gltf.get('extensions') or {}).get('HVYM_nft_data')))
+      views = [bin_chunk[view.get('byteOffset', 0):view.get('byteOffset', 0) + view['byteLength']] for view in gltf.get('bufferViews', [])]
+
+      report = {'path': out_path, 'before': before, 'quantized': 0, 'removed': {}, 'deduplicated': 0, 'textures': []}
+      if max_texture_size or texture_format:
+            report['textures'] = _glb_compress_textures(gltf, views, max_texture_size, texture_format or 'webp', quality, jobs)
+      if quantize:
+            report['quantized'] = _glb_quantize_normals(gltf, views, keep_names)
+      if all(extension.startswith(GLB_PRUNABLE_EXTENSIONS) for extension in gltf.get('extensionsUsed', [])):
+            report['removed'] = _glb_prune(gltf, views, keep_names)
+      report['deduplicated'] = _glb_dedupe_buffer_views(gltf, views)
+
+      _write_glb(out_path, gltf, _glb_repack(gltf, views))
+      report['after'] = os.path.getsize(out_path)
+      report['saved'] = before - report['after']
+      return report
+
+def _optimize_glb_summary(report):
+      removed = ', '.join(f'{count} {kind}' for kind, count in report['removed'].items() if count) or 'nothing'
+      percent = report['saved'] / report['before'] * 100 if report['before'] else 0
+      summary = (f"{report['path']}: {report['before']} -> {report['after']} bytes, saved {report['saved']} ({percent:.1f}%). "
+                 f"Removed {removed}, merged {report['deduplicated']} bufferViews, quantized {report['quantized']} normals.")
+      textures = [texture for texture in report['textures'] if 'error' not in texture]
+      if report['textures']:
+            saved = sum(texture['before'] - texture['after'] for texture in textures)
+            changed = sum(1 for texture in textures if texture['after'] != texture['before'])
+            cached = sum(1 for texture in textures if texture['cached'])
+            summary += f" Recompressed {changed} of {len(report['textures'])} textures ({cached} cached), saving {saved} bytes."
+      return summary
+
+def _read_model_extensions(model_path):
+      """Get the top level extensions of a .glb or .gltf model."""
+      gltf_json = _read_glb_json(model_path)
+      if gltf_json is not None:
+            return gltf_json.get('extensions') or {}
+
+      from pygltflib import GLTF2
+      return GLTF2().load(model_path).extensions or {}
+
+def _model_metadata_entry(model_path):
+      """Get the cache entry of a model: size, mtime, sha256 of its json and HVYM_nft_data.
+
+      Entries are reused while size and mtime match. When they don't, the json
+      is re-read and only parsed again if its sha256 changed.
+      """
+      path = os.path.abspath(model_path)
+      stat = os.stat(path)
+      entry = _MODEL_METADATA_CACHE.get(path)
+      if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+            return entry
+
+      chunk = _read_glb_json_chunk(path)
+      if chunk is None:
+            with open(path, 'rb') as f:
+                  digest = hashlib.sha256(f.read()).hexdigest()
+      else:
+            digest = hashlib.sha256(chunk).hexdigest()
+
+      if entry and entry['hash'] == digest:
+            hvym_data = entry['hvym_data']
+      elif chunk is not None:
+            hvym_data = (_json_loads(chunk).get('extensions') or {}).get('HVYM_nft_data')
+      else:
+            hvym_data = _read_model_extensions(path).get('HVYM_nft_data')
+
+      entry = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': digest, 'hvym_data': hvym_data}
+      _MODEL_METADATA_CACHE[path] = entry
+      return entry
+
+def _model_metadata(model_path):
+      """Get the HVYM_nft_data of a model, None if it has none."""
+      return _model_metadata_entry(model_path)['hvym_data']
+
 def _load_hvym_data(model_path):
-      gltf = None
       result = None
       if os.path.isfile(model_path):
-            gltf = GLTF2().load(model_path)
-            if 'HVYM_nft_data' in gltf.extensions.keys():
-              result = gltf.extensions['HVYM_nft_data']
-            else:
+            result = _model_metadata(model_path)
+            if result is None:
               click.echo("No Heavymeta Data in model.")
 
       return result
 
+MODEL_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, hash TEXT, has_data INTEGER, project TEXT, contract TEXT);
+CREATE TABLE IF NOT EXISTS collections (path TEXT REFERENCES models(path) ON DELETE CASCADE, name TEXT, collection_name TEXT, collection_type TEXT);
+CREATE TABLE IF NOT EXISTS props (path TEXT REFERENCES models(path) ON DELETE CASCADE, collection TEXT, kind TEXT, name TEXT, action_type TEXT, data TEXT);
+CREATE INDEX IF NOT EXISTS collections_path ON collections(path);
+CREATE INDEX IF NOT EXISTS props_path ON props(path);
+CREATE INDEX IF NOT EXISTS props_action ON props(kind, action_type);
+"""
+MODEL_INDEX_PROP_KINDS = ('valProps', 'callProps')
+MODEL_INDEX_FILTER = re.compile(r'^\s*(\w+)\s*(>=|<=|!=|=|>|<)\s*(.*?)\s*$')
+
+def _find_models(directory):
+      """Yield the paths of all .glb and .gltf files under directory."""
+      for dirpath, _, filenames in os.walk(directory):
+            for filename in sorted(filenames):
+                  if filename.lower().endswith(('.glb', '.gltf')):
+                        yield os.path.join(dirpath, filename)
+
+def _model_index_connect(index_path):
+      import sqlite3
+      os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+      conn = sqlite3.connect(index_path)
+      conn.execute('PRAGMA foreign_keys = ON')
+      conn.execute('PRAGMA journal_mode = WAL')
+      conn.executescript(MODEL_INDEX_SCHEMA)
+      return conn
+
+def _model_index_rows(path, entry):
+      """Split a model's metadata cache entry into its models, collections and props rows."""
+      hvym_data = entry['hvym_data'] or {}
+      project = hvym_data.get('project') or {}
+      contract = hvym_data.get('contract')
+      model = (path, entry['size'], entry['mtime'], entry['hash'], entry['hvym_data'] is not None,
+               project.get('name'), None if contract is None else _json_dumps(contract))
+      collections = []
+      props = []
+      for key, value in hvym_data.items():
+            if key in ('project', 'contract') or not isinstance(value, dict):
+                  continue
+            collections.append((path, key, value.get('collectionName'), value.get('collectionType')))
+            for kind in MODEL_INDEX_PROP_KINDS:
+                  for name, prop in (value.get(kind) or {}).items():
+                        props.append((path, key, kind, name, prop.get('prop_action_type'), _json_dumps(prop)))
+
+      return model, collections, props
+
+def _index_models(directory, index_path=MODEL_INDEX_PATH):
+      """Index the HVYM data of every model under directory.
+
+      Files whose size and mtime match the index are skipped, and files whose
+      json hash matches only get their stat updated. Models that were indexed
+      under directory but no longer exist are removed. Returns counts of each.
+      """
+      root = os.path.join(os.path.abspath(directory), '')
+      conn = _model_index_connect(index_path)
+      known = {row[0]: row[1:] for row in conn.execute('SELECT path, size, mtime, hash FROM models WHERE substr(path, 1, ?) = ?', (len(root), root))}
+      counts = {'indexed': 0, 'unchanged': 0, 'removed': 0, 'failed': 0}
+      seen = set()
+
+      with conn:
+            for path in _find_models(root):
+                  seen.add(path)
+                  row = known.get(path)
+                  try:
+                        stat = os.stat(path)
+                        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+                              counts['unchanged'] += 1
+                              continue
+
+                        entry = _model_metadata_entry(path)
+                        model, collections, props = _model_index_rows(path, entry)
+                  except (OSError, ValueError, AttributeError, struct.error) as e:
+                        click.echo(f"Could not index {path}: {e}", err=True)
+                        counts['failed'] += 1
+                        continue
+
+                  if row and row[2] == entry['hash']:
+                        conn.execute('UPDATE models SET size = ?, mtime = ? WHERE path = ?', (entry['size'], entry['mtime'], path))
+                        counts['unchanged'] += 1
+                        continue
+
+                  conn.execute('DELETE FROM models WHERE path = ?', (path,))
+                  conn.execute('INSERT INTO models VALUES (?, ?, ?, ?, ?, ?, ?)', model)
+                  conn.executemany('INSERT INTO collections VALUES (?, ?, ?, ?)', collections)
+                  conn.executemany('INSERT INTO props VALUES (?, ?, ?, ?, ?, ?)', props)
+                  counts['indexed'] += 1
+
+            removed = [(path,) for path in known if path not in seen]
+            conn.executemany('DELETE FROM models WHERE path = ?', removed)
+            counts['removed'] = len(removed)
+
+      conn.close()
+      return counts
+
+def _parse_contract_filter(expression):
+      """Split a filter like 'maxSupply>1000' into key, operator and a json decoded value."""
+      match = MODEL_INDEX_FILTER.match(expression)
+      if match is None:
+            raise click.BadParameter(f"Expected KEY<op>VALUE with one of = != > >= < <=, got: {expression}")
+      key, op, value = match.groups()
+      try:
+            value = _json_loads(value)
+      except ValueError:
+            pass
+
+      return key, op, value
+
+def _query_models(index_path=MODEL_INDEX_PATH, val_action=None, prop=None, collection=None, project=None, contract=()):
+      """Get path, project and contract of the indexed models matching all of the given filters."""
+      where = ['m.has_data']
+      params = []
+      if val_action:
+            where.append("EXISTS (SELECT 1 FROM props p WHERE p.path = m.path AND p.kind = 'valProps' AND p.action_type = ?)")
+            params.append(val_action)
+      if prop:
+            where.append('EXISTS (SELECT 1 FROM props p WHERE p.path = m.path AND p.name = ?)')
+            params.append(prop)
+      if collection:
+            where.append('EXISTS (SELECT 1 FROM collections c WHERE c.path = m.path AND (c.name = ? OR c.collection_name = ?))')
+            params += [collection, collection]
+      if project:
+            where.append('m.project = ?')
+            params.append(project)
+      for expression in contract:
+            key, op, value = _parse_contract_filter(expression)
+            where.append(f'json_extract(m.contract, ?) {op} ?')
+            params += ['$.' + key, value]
+
+      conn = _model_index_connect(index_path)
+      try:
+            rows = conn.execute(f"SELECT m.path, m.project, m.contract FROM models m WHERE {' AND '.join(where)} ORDER BY m.path", params).fetchall()
+      finally:
+            conn.close()
+
+      return [{'path': path, 'project': project, 'contract': None if data is None else _json_loads(data)} for path, project, data in rows]
+
+def _validate_model(path):
+      """Validate the HVYM data of one model, reading only its json. Runs in the validate-models worker processes."""
+      try:
+            gltf_json = _read_glb_json(path)
+            if gltf_json is None:
+                  with open(path, 'rb') as f:
+                        gltf_json = _json_load(f)
+            hvym_data = (gltf_json.get('extensions') or {}).get('HVYM_nft_data')
+            errors = ['no HVYM_nft_data'] if hvym_data is None else _hvym_schema_errors('hvym_nft_data', hvym_data)
+      except (OSError, ValueError, AttributeError) as e:
+            errors = [str(e)]
+
+      return {'path': path, 'ok': not errors, 'errors': errors}
+
+def _validate_models(paths, jobs=None):
+      """Validate models across a pool of jobs processes, defaulting to one per cpu."""
+      jobs = jobs or os.cpu_count() or 1
+      if jobs == 1 or len(paths) < 2:
+            return [_validate_model(path) for path in paths]
+
+      from concurrent.futures import ProcessPoolExecutor
+      with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+            return list(pool.map(_validate_model, paths, chunksize=max(1, len(paths) // (jobs * 4))))
+
+def _template_sources():
+      """{name: sha256} of the templates shipped in templates/."""
+      path = FILE_PATH / 'templates'
+      return {name: _file_sha256(path / name) for name in sorted(os.listdir(path)) if os.path.isfile(path / name)}
+
+def _template_stamps():
+      """{name: [mtime_ns, size]} of the templates shipped in templates/, cheap enough to check on every run."""
+      with os.scandir(FILE_PATH / 'templates') as entries:
+            return {entry.name: [entry.stat().st_mtime_ns, entry.stat().st_size] for entry in sorted(entries, key=lambda entry: entry.name) if entry.is_file()}
+
+def _template_modules_current(path=TEMPLATE_MODULES_PATH):
+      """Whether compile-templates output at path matches the template sources and the installed jinja.
+
+      Sources are only hashed when their mtimes or sizes changed since compiling.
+      """
+      import jinja2
+      try:
+            with open(os.path.join(path, TEMPLATE_MODULES_MANIFEST), 'rb') as f:
+                  manifest = _json_load(f)
+      except (OSError, ValueError):
+            return False
+      if manifest.get('jinja2') != jinja2.__version__:
+            return False
+      return manifest.get('stamps') == _template_stamps() or manifest.get('templates') == _template_sources()
+
+def _compile_templates(path=TEMPLATE_MODULES_PATH):
+      """Compile every template to a python module under path, with a manifest of the sources they came from."""
+      import jinja2
+      from jinja2 import Environment, FileSystemLoader
+      os.makedirs(path, exist_ok=True)
+      for name in os.listdir(path):
+            if name.startswith('tmpl_') or name == TEMPLATE_MODULES_MANIFEST:
+                  os.remove(os.path.join(path, name))
+
+      stamps = _template_stamps()
+      sources = _template_sources()
+      env = Environment(loader=FileSystemLoader(FILE_PATH / 'templates'))
+      env.compile_templates(path, zip=None, ignore_errors=False)
+      with open(os.path.join(path, TEMPLATE_MODULES_MANIFEST), 'w') as f:
+            f.write(_json_dumps({'jinja2': jinja2.__version__, 'templates': sources, 'stamps': stamps}, pretty=True))
+      return sources
+
+def _template_env():
+      """Shared jinja environment, so compiled templates stay cached for the life of the process.
+
+      Modules from compile-templates are loaded when they're current, which
+      skips parsing and compiling altogether. Otherwise template bytecode is
+      kept under the user data dir, so later runs skip compiling; jinja drops
+      an entry when its template source changes.
+      """
+      global _TEMPLATE_ENV
+      if _TEMPLATE_ENV is None:
+            from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, ModuleLoader
+            if _template_modules_current():
+                  _TEMPLATE_ENV = Environment(loader=ModuleLoader(TEMPLATE_MODULES_PATH))
+            else:
+                  os.makedirs(TEMPLATE_CACHE_PATH, exist_ok=True)
+                  _TEMPLATE_ENV = Environment(loader=FileSystemLoader(FILE_PATH / 'templates'), bytecode_cache=FileSystemBytecodeCache(TEMPLATE_CACHE_PATH))
+      return _TEMPLATE_ENV
+
+def _staging_path(path):
+      return os.path.join(os.path.dirname(os.path.abspath(path)), f'.{os.path.basename(path)}.{os.getpid()}.tmp')
+
+def _stage_if_changed(path, data):
+      """Write data to a temp file next to path, unless path already holds exactly those bytes.
+
+      Returns the temp path to os.replace over path, or None when unchanged.
+      """
+      try:
+            stat = os.stat(path)
+            if stat.st_size == len(data) and _file_sha256(path) == hashlib.sha256(data).hexdigest():
+                  return None
+            mode = stat.st_mode & 0o777
+      except FileNotFoundError:
+            mode = None
+
+      tmp_path = _staging_path(path)
+      try:
+            with open(tmp_path, 'wb') as f:
+                  f.write(data)
+                  f.flush()
+                  os.fsync(f.fileno())
+            if mode is not None:
+                  os.chmod(tmp_path, mode)
+      except BaseException:
+            if os.path.exists(tmp_path):
+                  os.remove(tmp_path)
+            raise
+      return tmp_path
+
+def _write_if_changed(path, data):
+      """Atomically replace path with data, unless it already holds exactly those bytes.
+
+      Leaving unchanged files alone keeps their mtime, so dfx and the js
+      bundler don't rebuild them. Returns whether the file was written.
+      """
+      tmp_path = _stage_if_changed(path, data)
+      if tmp_path is None:
+            return False
+      os.replace(tmp_path, path)
+      return True
+
 def _render_template(template_file, data, out_file_path):
-      file_loader = FileSystemLoader(FILE_PATH / 'templates')
-      env = Environment(loader=file_loader)
+      """Render template_file to out_file_path if the output changed, returns whether it was written."""
+      env = _template_env()
       template = env.get_template(template_file)
-
-      with open(out_file_path, 'w') as f:
-        output = template.render(data=data)
-        f.write(output)
+      return _write_if_changed(out_file_path, template.render(data=data).encode('utf-8'))
+
+class render_commit_error(Exception):
+      """Raised when _render_plan fails after it started replacing project files.
+
+      :param committed: Paths that were already replaced.
+      :type committed: list
+      :param error: The error that stopped the commit.
+      :type error: OSError
+      """
+      def __init__(self, committed, error):
+            self.committed = committed
+            super().__init__(f"{error}, already replaced: {', '.join(committed) or 'nothing'}")
+
+def _render_plan(jobs, sync_dirs=()):
+      """Render (template, data, out_path) jobs on a thread pool and commit them together.
+
+      sync_dirs are (src, dst) directory copies, made into a staging dir
+      alongside the renders. Nothing in the project is touched until every
+      render and copy has succeeded; then changed outputs are renamed into
+      place and synced dirs swapped in. Returns the paths that changed.
+
+      The renames aren't atomic as a group: if one fails, render_commit_error
+      lists the paths already replaced.
+      """
+      from concurrent.futures import ThreadPoolExecutor
+      env = _template_env()
+
+      def render(job):
+            template, data, out_path = job
+            return env.get_template(template).render(data=data).encode('utf-8')
+
+      def copy(src, dst):
+            staging = _staging_path(dst)
+            shutil.rmtree(staging, ignore_errors=True)
+            shutil.copytree(src, staging)
+            return staging
+
+      staged = []
+      dirs = []
+      try:
+            with ThreadPoolExecutor(max_workers=len(jobs) + len(sync_dirs) or 1) as pool:
+                  copies = [(pool.submit(copy, src, dst), dst) for src, dst in sync_dirs]
+                  renders = [(pool.submit(render, job), job[2]) for job in jobs]
+                  try:
+                        for future, out_path in renders:
+                              tmp_path = _stage_if_changed(out_path, future.result())
+                              if tmp_path is not None:
+                                    staged.append((tmp_path, out_path))
+                  finally:
+                        for future, dst in copies:
+                              if future.exception() is None:
+                                    dirs.append((future.result(), dst))
+                  for future, dst in copies:
+                        future.result()
+      except BaseException:
+            for tmp_path, out_path in staged:
+                  os.remove(tmp_path)
+            for staging, dst in dirs:
+                  shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+      committed = []
+      try:
+            for staging, dst in dirs:
+                  old = staging + '.old'
+                  if os.path.exists(dst):
+                        os.replace(dst, old)
+                  try:
+                        os.replace(staging, dst)
+                  except OSError:
+                        if os.path.exists(old):
+                              os.replace(old, dst)
+                        raise
+                  committed.append(dst)
+                  shutil.rmtree(old, ignore_errors=True)
+            for tmp_path, out_path in staged:
+                  os.replace(tmp_path, out_path)
+                  committed.append(out_path)
+      except OSError as e:
+            for tmp_path, out_path in staged:
+                  if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+            for staging, dst in dirs:
+                  shutil.rmtree(staging, ignore_errors=True)
+            raise render_commit_error(committed, e) from e
+
+      return [out_path for tmp_path, out_path in staged] + [dst for staging, dst in dirs]
+
+def _render_report(changed):
+      """Summary of the outputs an icp-update command actually rewrote."""
+      if not changed:
+            return "Rendered outputs unchanged."
+      return '\n'.join(f"Updated {path}" for path in changed)
 
 def _svg_to_data_url(svgfile):
     tree = ET.parse(svgfile)
@@ -1763,6 +3335,254 @@ def _png_to_data_url(pngfile):
     return f"data:image/png;base64,{encoded_string}"
 
 
+def _load_json_arg(value):
+      """Load a json cli argument given inline, as '@path' to a file, or '-' for stdin."""
+      try:
+            if value == '-':
+                  return _json_load(click.get_binary_stream('stdin'))
+            if value.startswith('@'):
+                  with open(value[1:], 'rb') as f:
+                        return _json_load(f)
+            return _json_loads(value)
+      except ValueError as e:
+            source = 'stdin' if value == '-' else value[1:] if value.startswith('@') else 'argument'
+            raise click.ClickException(f"Invalid json in {source}: {e}")
+
+
+HVYM_SCHEMA_LABELS = ('value_prop_label', 'text_prop_label', 'call_prop_label', 'mesh_prop_label', 'mat_prop_label',
+                      'anim_prop_label', 'mesh_set_label', 'morph_set_label', 'mat_set_label')
+
+def _hvym_schemas():
+      """Build the pydantic validators of the blender payloads and HVYM_nft_data once, they're compiled on first use.
+
+      Entries are TypedDicts rather than models, pydantic-core checks them
+      without building an object per property. Unknown keys are allowed.
+      """
+      global _HVYM_SCHEMAS
+      if _HVYM_SCHEMAS is not None:
+            return _HVYM_SCHEMAS
+
+      from typing import Annotated, Any, Dict, List, Optional, Union
+      from typing_extensions import NotRequired, TypedDict
+      from pydantic import AfterValidator, BaseModel, ConfigDict, Discriminator, Tag, TypeAdapter
+
+      Number = Union[int, float]
+
+      class Ref(TypedDict):
+            name: str
+
+      # Fields parse_val_prop reads for every collection entry, whatever its trait_type.
+      Labels = TypedDict('Labels', {label: str for label in HVYM_SCHEMA_LABELS})
+
+      class ValProp(Labels):
+            type: str
+            trait_type: str
+            show: bool
+            prop_action_type: str
+            prop_slider_type: str
+            prop_value_type: str
+            prop_immutable: bool
+            behavior_set: Optional[List[Any]]
+            int_default: Number
+            int_min: Number
+            int_max: Number
+            int_amount: NotRequired[Optional[Number]]
+            float_default: NotRequired[Optional[Number]]
+            float_min: NotRequired[Optional[Number]]
+            float_max: NotRequired[Optional[Number]]
+            float_amount: NotRequired[Optional[Number]]
+
+      def conditional_fields(prop):
+            cremental = prop['prop_action_type'] not in ('Immutable', 'Static')
+            missing = ['int_amount'] if cremental and prop.get('int_amount') is None else []
+            if prop['prop_value_type'] == 'Float':
+                  missing += [name for name in ('float_default', 'float_min', 'float_max') if prop.get(name) is None]
+                  if cremental and prop.get('float_amount') is None:
+                        missing.append('float_amount')
+            if missing:
+                  raise ValueError(f"{', '.join(missing)} required for a {prop['prop_value_type']} {prop['prop_action_type']} property")
+            return prop
+
+      class TextProp(ValProp):
+            text_value: str
+            prop_text_widget_type: str
+
+      class CallProp(ValProp):
+            call_param: Any
+
+      class MeshProp(ValProp):
+            prop_toggle_type: str
+            model_ref: Optional[Ref]
+            visible: bool
+
+      class MeshSetProp(ValProp):
+            prop_selector_type: str
+            mesh_set: List[Any]
+
+      class MorphSetProp(ValProp):
+            prop_selector_type: str
+            morph_set: List[Any]
+            model_ref: Any
+
+      class AnimProp(ValProp):
+            prop_toggle_type: str
+            prop_anim_slider_type: str
+            anim_loop: str
+            anim_start: Number
+            anim_end: Number
+            anim_blending: str
+            anim_weight: Number
+            anim_play: bool
+            model_ref: Any
+
+      class MatProp(ValProp):
+            prop_multi_widget_type: str
+            mat_ref: Ref
+            mat_type: str
+            mat_reflective: bool
+            mat_iridescent: bool
+            mat_sheen: bool
+            mat_emissive: bool
+
+      class MatSetProp(ValProp):
+            prop_selector_type: str
+            mat_set: List[Any]
+            mesh_set_name: str
+            material_id: Any
+
+      props = {'text': TextProp, 'call': CallProp, 'mesh': MeshProp, 'mesh_set': MeshSetProp, 'morph_set': MorphSetProp,
+               'anim': AnimProp, 'mat_prop': MatProp, 'mat_set': MatSetProp, 'other': ValProp}
+
+      def prop_tag(obj):
+            trait_type = obj.get('trait_type') if isinstance(obj, dict) else None
+            if trait_type == 'mat_prop' and 'mat_ref' not in obj:
+                  return 'other'
+            return trait_type if trait_type in props else 'other'
+
+      class Menu(TypedDict):
+            menu_name: str
+            menu_primary_color: str
+            menu_secondary_color: str
+            menu_text_color: str
+            menu_alignment: str
+            collection_id: str
+
+      # The fields of single_node_data_class, one per node of the collection.
+      class Node(TypedDict):
+            name: str
+            type: str
+
+      class Action(TypedDict):
+            type: str
+            trait_type: str
+            action_set: List[Any]
+            sequence_type: str
+            additive: bool
+
+      class MeshAction(Action):
+            mesh_interaction_type: str
+            model_ref: Any
+
+      class AnimAction(Action):
+            anim_interaction_type: str
+
+      class Child(TypedDict):
+            type: str
+            name: str
+
+      class Object(TypedDict):
+            hvym_interactable: bool
+
+      Interactable = TypedDict('Interactable', {'hvym_interactable': bool, 'name': str, 'children': List[Child], **{name: Any for name in (
+            'hvym_interactable_has_return', 'hvym_mesh_interaction_type', 'hvym_interactable_selector_dir', 'hvym_mesh_interaction_name',
+            'hvym_mesh_interaction_call', 'hvym_mesh_interaction_default_text', 'hvym_mesh_interaction_text_scale',
+            'hvym_mesh_interaction_text_wrap', 'hvym_mesh_interaction_param_type', 'hvym_mesh_interaction_slider_param_type',
+            'hvym_mesh_interaction_toggle_param_type', 'hvym_mesh_interaction_string_param', 'hvym_mesh_interaction_int_param',
+            'hvym_mesh_interaction_float_default', 'hvym_mesh_interaction_float_min', 'hvym_mesh_interaction_float_max',
+            'hvym_mesh_interaction_int_default', 'hvym_mesh_interaction_int_min', 'hvym_mesh_interaction_int_max',
+            'hvym_mesh_interaction_toggle_state', 'hvym_mesh_interaction_toggle_int', 'hvym_interactable_behavior')}})
+
+      class NftValProp(TypedDict):
+            prop_action_type: str
+            immutable: bool
+            default: NotRequired[Optional[Number]]
+            min: NotRequired[Optional[Number]]
+            max: NotRequired[Optional[Number]]
+            amount: NotRequired[Optional[Number]]
+
+      def nft_bounds(prop):
+            if prop['prop_action_type'] != 'Static' and not prop['immutable']:
+                  missing = [name for name in ('default', 'min', 'max') if prop.get(name) is None]
+                  if prop['prop_action_type'] != 'Immutable' and prop.get('amount') is None:
+                        missing.append('amount')
+                  if missing:
+                        raise ValueError(f"{', '.join(missing)} required for a {prop['prop_action_type']} property")
+            bounds = [(name, prop[name]) for name in ('min', 'default', 'max') if prop.get(name) is not None]
+            for (low_name, low), (high_name, high) in zip(bounds, bounds[1:]):
+                  if low > high:
+                        raise ValueError(f"expected {low_name} <= {high_name}, got {low} > {high}")
+            return prop
+
+      class NftCollection(TypedDict):
+            valProps: NotRequired[Dict[str, Annotated[NftValProp, AfterValidator(nft_bounds)]]]
+            callProps: NotRequired[Dict[str, Dict[str, Any]]]
+
+      class NftContract(TypedDict):
+            maxSupply: int
+            minterName: str
+            nftType: str
+
+      # Every key besides project and contract is a collection, so those go in the typed extras.
+      class NftData(BaseModel):
+            model_config = ConfigDict(extra='allow')
+            __pydantic_extra__: Dict[str, NftCollection]
+            project: Ref
+            contract: NftContract
+
+      collection = Union[tuple(Annotated[model, AfterValidator(conditional_fields), Tag(tag)] for tag, model in props.items())]
+      actions = Union[Annotated[MeshAction, Tag('mesh_action')], Annotated[AnimAction, Tag('other')]]
+      interactables = Union[Annotated[Interactable, Tag('interactable')], Annotated[Object, Tag('other')]]
+
+      _HVYM_SCHEMAS = {
+            'collection': TypeAdapter(Dict[str, Annotated[collection, Discriminator(prop_tag)]]),
+            'menu': TypeAdapter(Dict[str, Menu]),
+            'nodes': TypeAdapter(Dict[str, Node]),
+            'actions': TypeAdapter(Dict[str, Annotated[actions, Discriminator(lambda obj: 'mesh_action' if isinstance(obj, dict) and obj.get('trait_type') == 'mesh_action' else 'other')]]),
+            'interactables': TypeAdapter(Dict[str, Annotated[interactables, Discriminator(lambda obj: 'interactable' if isinstance(obj, dict) and obj.get('hvym_interactable') else 'other')]]),
+            'hvym_nft_data': TypeAdapter(NftData),
+      }
+      return _HVYM_SCHEMAS
+
+def _hvym_input_errors(kind, data):
+      """Validate a payload the cli was handed, returns nothing when HVYM_TRUSTED_INPUT is set."""
+      if os.environ.get('HVYM_TRUSTED_INPUT'):
+            return []
+      return _hvym_schema_errors(kind, data)
+
+def _hvym_schema_errors(kind, data):
+      """Validate data against its schema in one pass, returns every problem found as 'path: message' lines.
+
+      Collection, menu and action payloads only have their numbered entries
+      checked, since those are all the parsers read. Nodes are keyed by name.
+      """
+      if kind in ('collection', 'menu', 'actions') and isinstance(data, dict):
+            data = {key: value for key, value in data.items() if key.isdigit()}
+
+      from pydantic import ValidationError
+      try:
+            _hvym_schemas()[kind].validate_python(data)
+      except ValidationError as e:
+            errors = []
+            tagged = kind in ('collection', 'actions', 'interactables')
+            for error in e.errors():
+                  loc = list(error['loc'])
+                  if tagged and len(loc) > 1:
+                        del loc[1]
+                  errors.append(f"{'.'.join(str(part) for part in [kind] + loc)}: {error['msg']}")
+            return errors
+
+      return []
+
 def parse_val_prop(obj):
       result = None
 
@@ -1859,16 +3679,211 @@ def parse_behavior_val_prop(obj):
       return result
 
 
-@click.group()
+class LazyGroup(click.Group):
+      """Click group that registers subcommands by name and resolves them on first use.
+
+      Entries in lazy_subcommands map a command name to either an attribute of
+      this module or a 'module:attribute' import path, so only the command being
+      invoked is looked up (and imported, for the latter form).
+      """
+      def __init__(self, *args, lazy_subcommands=None, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.lazy_subcommands = dict(lazy_subcommands or {})
+
+      def list_commands(self, ctx):
+            return sorted(set(super().list_commands(ctx)) | set(self.lazy_subcommands.keys()))
+
+      def get_command(self, ctx, cmd_name):
+            if cmd_name not in self.commands and cmd_name in self.lazy_subcommands:
+                  self.commands[cmd_name] = self._lazy_load(cmd_name)
+            return super().get_command(ctx, cmd_name)
+
+      def _lazy_load(self, cmd_name):
+            module_name, _, attr = self.lazy_subcommands[cmd_name].rpartition(':')
+            module = importlib.import_module(module_name) if module_name else sys.modules[__name__]
+            cmd = getattr(module, attr)
+            if not isinstance(cmd, click.Command):
+                  raise ValueError(f"Lazy loading of {cmd_name} failed by returning a non-command object")
+            return cmd
+
+
+@click.group(cls=LazyGroup)
 def cli():
       pass
 
 
+def _run_cli_command(args, cwd=None):
+      """Run a registered cli command in this process, returns (exit_code, stdout, stderr)."""
+      out = StringIO()
+      err = StringIO()
+      exit_code = 0
+      prev_cwd = os.getcwd()
+      try:
+            if cwd:
+                  os.chdir(cwd)
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+                  try:
+                        rv = cli.main(args=list(args), prog_name='hvym', standalone_mode=False)
+                        if isinstance(rv, int):
+                              exit_code = rv
+                  except click.ClickException as e:
+                        e.show()
+                        exit_code = e.exit_code
+                  except click.Abort:
+                        err.write('Aborted!\n')
+                        exit_code = 1
+                  except SystemExit as e:
+                        exit_code = e.code if isinstance(e.code, int) else 1
+      finally:
+            os.chdir(prev_cwd)
+
+      return exit_code, out.getvalue(), err.getvalue()
+
+
+def _argv_value(value):
+      """Strings pass through as-is, other JSON values (bools, numbers, objects) are passed as JSON text."""
+      return value if isinstance(value, str) else _json_dumps(value)
+
+
+def _jsonrpc_error(request_id, code, message):
+      return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+
+def _serve_handle_request(line):
+      """Answer one JSON-RPC request, the method is a cli command name and params its arguments."""
+      try:
+            request = _json_loads(line)
+      except ValueError as e:
+            return _jsonrpc_error(None, -32700, f"Parse error: {e}")
+
+      request_id = request.get('id') if isinstance(request, dict) else None
+      if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            return _jsonrpc_error(request_id, -32600, "Invalid request")
+
+      method = request['method']
+      if method == 'shutdown':
+            return {'jsonrpc': '2.0', 'id': request_id, 'result': 'shutdown'}
+
+      params = request.get('params', [])
+      cwd = None
+      if isinstance(params, dict):
+            cwd = params.get('cwd')
+            params = params.get('args', [])
+      if not isinstance(params, list):
+            return _jsonrpc_error(request_id, -32602, "Invalid params")
+
+      if method in SERVE_LOCAL_COMMANDS or cli.get_command(None, method) is None:
+            return _jsonrpc_error(request_id, JSONRPC_METHOD_NOT_FOUND, f"Method not found: {method}")
+
+      try:
+            exit_code, stdout, stderr = _run_cli_command([method] + [_argv_value(p) for p in params], cwd)
+      except Exception as e:
+            return _jsonrpc_error(request_id, -32603, f"{method} failed with: {e}")
+
+      return {'jsonrpc': '2.0', 'id': request_id, 'result': {'exit_code': exit_code, 'stdout': stdout, 'stderr': stderr}}
+
+
+def _batch_run_line(line):
+      """Run one batch request, returns its result along with the wall time taken."""
+      try:
+            request = _json_loads(line)
+      except ValueError as e:
+            return {'cmd': None, 'error': f"Invalid JSON: {e}"}
+
+      if not isinstance(request, dict) or not isinstance(request.get('cmd'), str):
+            return {'cmd': None, 'error': "Each line must be an object with a 'cmd' string"}
+
+      cmd = request['cmd']
+      args = request.get('args', [])
+      result = {'cmd': cmd}
+      if 'id' in request:
+            result['id'] = request['id']
+
+      if not isinstance(args, list):
+            result['error'] = "'args' must be a list"
+      elif cmd in ('batch', 'serve') or cli.get_command(None, cmd) is None:
+            result['error'] = f"Unknown command: {cmd}"
+      else:
+            start = time.perf_counter()
+            try:
+                  exit_code, stdout, stderr = _run_cli_command([cmd] + [_argv_value(a) for a in args])
+                  result.update({'exit_code': exit_code, 'stdout': stdout, 'stderr': stderr})
+            except Exception as e:
+                  result['error'] = f"{cmd} failed with: {e}"
+            result['time'] = time.perf_counter() - start
+
+      return result
+
+
+def _serve_stop(path):
+      sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+      try:
+            sock.connect(path)
+            sock.sendall(json.dumps({'jsonrpc': '2.0', 'id': 0, 'method': 'shutdown'}).encode('utf-8') + b'\n')
+            with sock.makefile('rb') as f:
+                  f.readline()
+            click.echo("hvym serve stopped.")
+      except OSError:
+            click.echo(f"No hvym serve daemon running on: {path}")
+      finally:
+            sock.close()
+
+
+def _serve(path, idle_timeout):
+      """Serve cli commands on a unix socket until no request arrives for idle_timeout seconds."""
+      if os.path.exists(path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                  probe.connect(path)
+                  click.echo(f"hvym serve is already running on: {path}")
+                  return
+            except OSError:
+                  os.remove(path)
+            finally:
+                  probe.close()
+
+      server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+      server.bind(path)
+      server.listen()
+      server.settimeout(idle_timeout)
+      running = True
+      try:
+            while running:
+                  try:
+                        conn, _ = server.accept()
+                  except socket.timeout:
+                        break
+                  with conn:
+                        conn.settimeout(idle_timeout)
+                        with conn.makefile('rwb') as f:
+                              while True:
+                                    try:
+                                          line = f.readline()
+                                    except (socket.timeout, OSError):
+                                          break
+                                    if not line:
+                                          break
+                                    response = _serve_handle_request(line)
+                                    f.write(_json_dumps(response).encode('utf-8') + b'\n')
+                                    f.flush()
+                                    if response.get('result') == 'shutdown':
+                                          running = False
+                                          break
+      finally:
+            server.close()
+            if os.path.exists(path):
+                  os.remove(path)
+
+
 @click.command('parse-blender-hvym-interactables')
 @click.argument('obj_data', type=str)
-def parse_blender_hvym_interactables(obj_data):
+@click.option('--trusted', is_flag=True, help='Skip schema validation of the payload.')
+def parse_blender_hvym_interactables(obj_data, trusted):
       """Return parsed interactables data structure from blender for heavymeta gltf extension"""
-      objs = json.loads(obj_data)
+      objs = _load_json_arg(obj_data)
+      errors = [] if trusted else _hvym_input_errors('interactables', objs)
+      if errors:
+            raise click.ClickException('Invalid interactables payload:\n' + '\n'.join(errors))
       data = {}
       for key in objs:
             obj = objs[key]
@@ -1908,23 +3923,48 @@ def parse_blender_hvym_interactables(obj_data):
                         mesh_set,
                         behavior).dictionary
                   data[obj['name']] = d
-      click.echo( json.dumps(data) )
+      click.echo(_json_text(data))
 
 
 @click.command('parse-blender-hvym-collection')
 @click.argument('collection_name', type=str)
 @click.argument('collection_type', type=str)
 @click.argument('collection_id', type=str)
-@click.argument('collection_json', type=str)
-@click.argument('menu_json', type=str)
-@click.argument('nodes_json', type=str)
-@click.argument('actions_json', type=str)
-def parse_blender_hvym_collection(collection_name, collection_type, collection_id, collection_json, menu_json, nodes_json, actions_json):
-      """Return parsed data structure from blender for heavymeta gltf extension"""
-      col_data = json.loads(collection_json)
-      menu_data = json.loads(menu_json)
-      node_data = json.loads(nodes_json)
-      action_data = json.loads(actions_json)
+@click.argument('collection_json', type=str, required=False)
+@click.argument('menu_json', type=str, required=False)
+@click.argument('nodes_json', type=str, required=False)
+@click.argument('actions_json', type=str, required=False)
+@click.option('--document', '-d', type=str, default=None, help="One json document with 'collection', 'menu', 'nodes' and 'actions' keys, used instead of the positional json.")
+@click.option('--trusted', is_flag=True, help='Skip schema validation of the payloads.')
+def parse_blender_hvym_collection(collection_name, collection_type, collection_id, collection_json, menu_json, nodes_json, actions_json, document, trusted):
+      """Return parsed data structure from blender for heavymeta gltf extension
+
+      Json payloads may be given inline, as @path to read a file, or as - to read stdin.
+      They're validated up front and every problem is reported at once, unless
+      --trusted or HVYM_TRUSTED_INPUT is set.
+      """
+      if document is not None:
+            doc = _load_json_arg(document)
+            if not isinstance(doc, dict):
+                  raise click.ClickException(f"--document must be a json object, got {type(doc).__name__}.")
+            payloads = [doc.get('collection', {}), doc.get('menu', {}), doc.get('nodes', {}), doc.get('actions', {})]
+      else:
+            payloads = [collection_json, menu_json, nodes_json, actions_json]
+            if None in payloads:
+                  raise click.UsageError("COLLECTION_JSON, MENU_JSON, NODES_JSON and ACTIONS_JSON are required without --document.")
+            if payloads.count('-') > 1:
+                  raise click.UsageError("Only one json payload can be read from stdin.")
+            payloads = [_load_json_arg(payload) for payload in payloads]
+
+      if not trusted:
+            errors = [error for kind, payload in zip(('collection', 'menu', 'nodes', 'actions'), payloads) for error in _hvym_input_errors(kind, payload)]
+            if errors:
+                  raise click.ClickException('Invalid collection payloads:\n' + '\n'.join(errors))
+
+      click.echo(_parse_blender_hvym_collection(collection_name, collection_type, collection_id, *payloads))
+
+
+def _parse_blender_hvym_collection(collection_name, collection_type, collection_id, col_data, menu_data, node_data, action_data):
       val_props = {}
       text_props = {}
       call_props = {}
@@ -2059,13 +4099,13 @@ def parse_blender_hvym_collection(collection_name, collection_type, collection_i
                                                                          obj['mesh_interaction_type'],
                                                                          obj['sequence_type'],
                                                                          obj['additive'],
-                                                                         obj['model_ref'])
+                                                                         obj['model_ref']).dictionary
                 else:
                       action_props[obj['type']] = action_data_class(obj['trait_type'],
                                                                     obj['action_set'],
                                                                     obj['anim_interaction_type'],
                                                                     obj['sequence_type'],
-                                                                    obj['additive'])
+                                                                    obj['additive']).dictionary
                 
                   
       data = collection_data_class(collection_name,
@@ -2083,7 +4123,7 @@ def parse_blender_hvym_collection(collection_name, collection_type, collection_i
                                    prop_label_data,
                                    node_data,
                                    action_props).json
-      click.echo(data)
+      return data
 
 
 @click.command('collection-data')
@@ -2332,8 +4372,10 @@ def pbr_material_data(color, roughness, metalness, iridescent=None, sheen=None,
 @click.command('icp-install')
 def icp_install():
       """Install ICP dfx cli."""
-      cmd = "sh -c '$(curl -fsSL https://internetcomputer.org/install.sh)'"
-      subprocess.run(cmd, shell=True, check=True)
+      cmd = ['sh', '-c', '$(curl -fsSL https://internetcomputer.org/install.sh)']
+      result = _run_command(cmd, timeout=BUILD_COMMAND_TIMEOUT, on_stdout=click.echo, on_stderr=click.echo)
+      if not result.ok:
+            raise click.ClickException(result.message)
 
 
 @click.command('didc-install')
@@ -2342,8 +4384,10 @@ def didc_install():
       if os.path.isfile(INSTALL_DIDC_SH):
             # Make executable (cross-platform)
             _make_executable(INSTALL_DIDC_SH)
-            cmd = f"sh -c '{INSTALL_DIDC_SH}'"
-            subprocess.run(cmd, shell=True, check=True)
+            cmd = ['sh', '-c', INSTALL_DIDC_SH]
+            result = _run_command(cmd, timeout=BUILD_COMMAND_TIMEOUT, on_stdout=click.echo, on_stderr=click.echo)
+            if not result.ok:
+                  raise click.ClickException(result.message)
 
 
 @click.command('didc-bind-js')
@@ -2351,9 +4395,10 @@ def didc_install():
 def didc_bind_js(didfile):
       """Create js interface from canister .did file."""
       if os.path.isfile(DIDC):
-           cmd = f"{DIDC} bind {didfile} -t js"
-           output = subprocess.run(cmd, shell=True, check=True)
-           click.echo(output.stdout)
+           result = _run_command([DIDC, 'bind', didfile, '-t', 'js'])
+           if not result.ok:
+                raise click.ClickException(result.message)
+           click.echo(result.stdout)
 
 
 @click.command('didc-bind-js-popup')
@@ -2367,10 +4412,11 @@ def didc_bind_js_popup():
                 return
             
            file = popup.value[0]
-           cmd = f"{DIDC} bind {file} -t js"
-           output = subprocess.run(cmd, capture_output=True, shell=True, check=True)
+           result = _run_command([DIDC, 'bind', file, '-t', 'js'])
+           if not result.ok:
+                raise click.ClickException(result.message)
 
-           _copy_text_popup("Js Interface:", output.stdout.decode("utf-8"), str(ICP_LOGO_IMG))
+           _copy_text_popup("Js Interface:", result.stdout, str(ICP_LOGO_IMG))
 
 
 @click.command('didc-bind-ts')
@@ -2378,8 +4424,10 @@ def didc_bind_js_popup():
 def didc_bind_ts(didfile):
       """Create ts interface from canister .did file."""
       if os.path.isfile(DIDC):
-           cmd = f"{DIDC} {didfile} -t ts"
-           subprocess.run(cmd, shell=True, check=True)
+           result = _run_command([DIDC, 'bind', didfile, '-t', 'ts'])
+           if not result.ok:
+                raise click.ClickException(result.message)
+           click.echo(result.stdout)
 
 
 @click.command('didc-bind-ts-popup')
@@ -2393,60 +4441,63 @@ def didc_bind_ts_popup():
                 return
             
            file = popup.value[0]
-           cmd = f"{DIDC} bind {file} -t ts"
-           output = subprocess.run(cmd, capture_output=True, shell=True, check=True)
+           result = _run_command([DIDC, 'bind', file, '-t', 'ts'])
+           if not result.ok:
+                raise click.ClickException(result.message)
 
-           _copy_text_popup("Ts Interface:", output.stdout.decode("utf-8"), str(ICP_LOGO_IMG))
+           _copy_text_popup("Ts Interface:", result.stdout, str(ICP_LOGO_IMG))
 
 
 @click.command('icp-new-cryptonym')
 @click.argument('cryptonym', type=str)
 def icp_new_cryptonym(cryptonym):
       """Create a new cryptonym, (alias/identity) for the Internet Computer Protocol."""
-      command = f'{DFX} identity new {cryptonym} --storage-mode password-protected'
-      output = subprocess.run(command, shell=True, capture_output=True, text=True)
-      click.echo('Command output:', output.stdout)
+      result = _run_command([DFX, 'identity', 'new', cryptonym, '--storage-mode', 'password-protected'], merge_stderr=True)
+      if not result.ok:
+            raise click.ClickException(result.message)
+      click.echo(f'Command output: {result.stdout}')
 
 
 @click.command('icp-id-list')
 def icp_id_list():
       """Get a list of identitys on this machine."""
-      command = f'{DFX} identity list'
-      output = subprocess.run(command, shell=True, capture_output=True, text=True)
-      click.echo(output.stdout)
+      click.echo(_ic_get_ids())
 
 
 @click.command('icp-use-id')
 @click.argument('cryptonym', type=str)
 def icp_use_id(cryptonym):
       """Set the icp id for this machine."""
-      command = f'{DFX} identity use {cryptonym}'
-      output = subprocess.run(command, shell=True, capture_output=True, text=True)
-      click.echo(output.stdout)
+      result = _run_command([DFX, 'identity', 'use', cryptonym], merge_stderr=True)
+      if not result.ok:
+            raise click.ClickException(result.message)
+      click.echo(result.stdout)
 
 
 @click.command('icp-use-cryptonym')
 @click.argument('cryptonym', type=str)
 def icp_use_cryptonym(cryptonym):
       """Use a cryptonym, (alias/identity) for the Internet Computer Protocol."""
-      command = f'{DFX} identity use {cryptonym}'
-      output = subprocess.run(command, shell=True, capture_output=True, text=True)
-      click.echo('Command output:', output.stdout)
+      result = _run_command([DFX, 'identity', 'use', cryptonym], merge_stderr=True)
+      if not result.ok:
+            raise click.ClickException(result.message)
+      click.echo(f'Command output: {result.stdout}')
 
 
 @click.command('icp-account')
 def icp_account():
       """Get the account number for the current active account."""
-      command = f'{DFX} ledger account-id'
-      output = subprocess.run(command, shell=True, capture_output=True, text=True)
-      click.echo('Command output:', output.stdout)
+      result = _run_command([DFX, 'ledger', 'account-id'])
+      if not result.ok:
+            raise click.ClickException(result.message)
+      click.echo(f'Command output: {result.stdout}')
 
 
 @click.command('icp-principal')
 def icp_principal():
       """Get the current principal id for account."""
-      active = _ic_get_active_id().strip()
-      principal = _ic_get_stored_principal(active.strip())
+      active = _ic_active_id()
+      principal = _ic_get_stored_principal(active)
       click.echo(principal)
 
 
@@ -2454,13 +4505,14 @@ def icp_principal():
 @click.argument('cryptonym', type=str)
 def ic_account_is_encrypted(cryptonym):
       """Get the stored principal for passed account."""
+      _ic_identity_snapshot()
       click.echo(_ic_account_is_encrypted(cryptonym))
 
 
 @click.command('icp-principal-hash')
 def icp_principal_hash():
       """Get the current principal id for account."""
-      active = _ic_get_active_id().strip()
+      active = _ic_active_id()
       principal = _ic_get_stored_principal(active)
       hexdigest = _create_hex(principal.encode('utf-8'))
       click.echo(hexdigest.upper())
@@ -2469,29 +4521,34 @@ def icp_principal_hash():
 @click.command('icp-balance')
 def icp_balance():
       """Get the current balance of ic for current account."""
-      command = f'{DFX} ledger --network ic balance'
-      output = subprocess.run(command, shell=True, capture_output=True, text=True)
-      click.echo('Command output:', output.stdout)
+      result = _run_command([DFX, 'ledger', '--network', 'ic', 'balance'])
+      if not result.ok:
+            raise click.ClickException(result.message)
+      click.echo(f'Command output: {result.stdout}')
 
 
 @click.command('icp-start-assets')
 @click.argument('project_type')
 def icp_start_assets(project_type): 
       """Start dfx in the current assets folder."""
+      from gifanimus import GifAnimation
       loading = loading = GifAnimation(str(LOADING_IMG), 1000, True, 'STARTING DFX DAEMON')
       loading.Play()
       _set_hvym_network()
+      result = None
       if project_type == 'model':
-            _ic_start_daemon(MODEL_DEBUG_TEMPLATE)
+            result = _ic_start_daemon(MODEL_DEBUG_TEMPLATE)
       elif project_type == 'minter':
-            _ic_start_daemon(MINTER_TEMPLATE)
+            result = _ic_start_daemon(MINTER_TEMPLATE)
       elif project_type == 'custom':
-            _ic_start_daemon(CUSTOM_CLIENT_TEMPLATE)
+            result = _ic_start_daemon(CUSTOM_CLIENT_TEMPLATE)
       elif project_type == 'assets':
-            _ic_start_daemon(ASSETS_CLIENT_TEMPLATE)
+            result = _ic_start_daemon(ASSETS_CLIENT_TEMPLATE)
 
-      time.sleep(2)
       loading.Stop()
+      if result is not None and not result.ok:
+            reason = 'did not become healthy in time' if result.timed_out else 'failed to start'
+            raise click.ClickException(f"dfx {reason}, start log:\n{result.message if result.error else result.stdout}")
                 
 
 @click.command('icp-stop-assets')
@@ -2528,14 +4585,16 @@ def icp_template(project_type):
 @click.command('icp-deploy-assets')
 @click.argument('project_type')
 @click.option('--ic', is_flag=True, default=True, )
-def icp_deploy_assets(project_type, ic):
+@click.option('--force', is_flag=True, help='Deploy even if nothing changed since the last deploy.')
+def icp_deploy_assets(project_type, ic, force):
       """deploy the current asset canister."""
-      command = f'{DFX} deploy'
+      command = [DFX, 'deploy']
+      network = 'local'
       pw = None
       if not ic:
         popup = _password_popup('Enter the Account Passphrase.')
         pw = popup.value
-        command += ' ic'
+        network = 'ic'
 
       folders = [MODEL_DEBUG_TEMPLATE]
 
@@ -2545,8 +4604,36 @@ def icp_deploy_assets(project_type, ic):
             folders = [CUSTOM_CLIENT_TEMPLATE]
       elif project_type == 'assets':
             folders = [ASSETS_CLIENT_TEMPLATE]
-        
-      return _subprocess('icp', folders, command, BUILDING_IMG, pw)
+
+      session = _get_session('icp')
+      if session is None:
+            return
+      project_path = os.path.join(session, *folders)
+      previous = _load_deploy_manifest(project_path).get(network)
+      files = _project_file_hashes(project_path, previous['files'] if previous else None)
+
+      commands = [command]
+      if previous and not force:
+            canisters = _changed_canisters(project_path, previous['files'], files)
+            if canisters == []:
+                  click.echo(f"No changes since the last {network} deploy, use --force to deploy anyway.")
+                  return
+            if canisters:
+                  click.echo(f"Deploying changed canisters: {', '.join(canisters)}")
+                  commands = [command + [name] for name in canisters]
+
+      if network == 'ic':
+            commands = [cmd + ['--network', 'ic'] for cmd in commands]
+
+      output = None
+      for cmd in commands:
+            output = _subprocess('icp', folders, cmd, BUILDING_IMG, pw)
+            if output is None:
+                  return
+
+      # Hash again, so anything else the deploy wrote counts as deployed.
+      _save_deploy_manifest(project_path, network, _project_file_hashes(project_path, files))
+      return output
     
 
 @cli.command('icp-backup-keys')
@@ -2640,7 +4727,7 @@ def icp_assets_client_path(quiet):
 @click.command('icp-account-info')
 def icp_account_info():
       """Get active icp account info"""
-      click.echo(_ic_id_info())
+      click.echo(_ic_identity_snapshot())
 
 
 @click.command('icp-set-account')
@@ -2690,6 +4777,7 @@ def img_to_url(msg):
 @click.option('--quiet', '-q', is_flag=True, default=False, help="Don't echo anything.")
 def icp_init(project_type, force, quiet):
       """Intialize project directories"""
+      from gifanimus import GifAnimation
       loading = GifAnimation(LOADING_IMG, 1000, True, '', True)
       
       model_path = _ic_model_debug_path()
@@ -2766,28 +4854,27 @@ def icp_update_model(model):
       if hvym_data == None:
             return
 
-      gltf = GLTF2().load(model_path)
-      if 'HVYM_nft_data' in gltf.extensions.keys():
-        hvym_data = gltf.extensions['HVYM_nft_data']
-      else:
-        click.echo("No Heavymeta Data in model.")
-        return
+      errors = _hvym_input_errors('hvym_nft_data', hvym_data)
+      if errors:
+            raise click.ClickException('Invalid HVYM_nft_data:\n' + '\n'.join(errors))
 
       data = _parse_hvym_data(hvym_data, model)
 
-      out_file_path = os.path.join(front_src_dir,  'index.html')
-      _render_template(TEMPLATE_CUSTOM_CLIENT_INDEX, data, out_file_path)
-
-      out_file_path = os.path.join(front_src_dir,  'index.js')
-      _render_template(TEMPLATE_MODEL_VIEWER_JS, data, out_file_path)
+      outputs = [
+            (TEMPLATE_CUSTOM_CLIENT_INDEX, os.path.join(front_src_dir,  'index.html')),
+            (TEMPLATE_MODEL_VIEWER_JS, os.path.join(front_src_dir,  'index.js')),
+      ]
+      click.echo(_render_report([out_file_path for template, out_file_path in outputs if _render_template(template, data, out_file_path)]))
 
 
 @click.command('icp-update-model-minter')
 @click.argument('model', type=str)
-def icp_update_model_minter(model):
+@click.option('--optimize', is_flag=True, help='Run optimize-glb on the model before rendering.')
+def icp_update_model_minter(model, optimize):
       """Set up nft collection deploy directories"""
       print('icp_update_model_minter')
       print(model)
+      from gifanimus import GifAnimation
       loading = GifAnimation(LOADING_IMG, 1000, True, '', True)
       loading.Play()
 
@@ -2796,35 +4883,40 @@ def icp_update_model_minter(model):
         return
 
       model_path = os.path.join(_ic_minter_model_path(), model)
+      if optimize and os.path.isfile(model_path):
+            try:
+                  click.echo(_optimize_glb_summary(_optimize_glb(model_path)))
+            except (OSError, ValueError) as e:
+                  loading.Stop()
+                  raise click.ClickException(f"Optimizing {model} failed: {e}")
+
       hvym_data = _load_hvym_data(model_path)
 
       if hvym_data == None:
             return
 
-      gltf = GLTF2().load(model_path)
-      if 'HVYM_nft_data' in gltf.extensions.keys():
-        hvym_data = gltf.extensions['HVYM_nft_data']
-      else:
-        click.echo("No Heavymeta Data in model.")
-        return
+      errors = _hvym_input_errors('hvym_nft_data', hvym_data)
+      if errors:
+            loading.Stop()
+            raise click.ClickException('Invalid HVYM_nft_data:\n' + '\n'.join(errors))
 
       data = _parse_hvym_data(hvym_data, model)
       
-      path = os.path.join(_ic_minter_path(), 'src', 'proprium_minter_backend')
-
-      out_file_path = os.path.join(path,  'main.mo')
-      _render_template(TEMPLATE_MODEL_MINTER_MAIN, data, out_file_path)
-
-      out_file_path = os.path.join(path,  'Types.mo')
-      _render_template(TEMPLATE_MODEL_MINTER_TYPES, data, out_file_path)
-
-      path = os.path.join(_ic_minter_path(),  'src', 'proprium_minter_frontend', 'src')
-
-      out_file_path = os.path.join(path,  'index.html')
-      _render_template(TEMPLATE_MODEL_MINTER_INDEX, data, out_file_path)
-
-      out_file_path = os.path.join(path,  'index.js')
-      _render_template(TEMPLATE_MODEL_MINTER_JS, data, out_file_path)
+      back_path = os.path.join(_ic_minter_path(), 'src', 'proprium_minter_backend')
+      front_path = os.path.join(_ic_minter_path(),  'src', 'proprium_minter_frontend', 'src')
+
+      plan = [
+            (TEMPLATE_MODEL_MINTER_MAIN, data, os.path.join(back_path,  'main.mo')),
+            (TEMPLATE_MODEL_MINTER_TYPES, data, os.path.join(back_path,  'Types.mo')),
+            (TEMPLATE_MODEL_MINTER_INDEX, data, os.path.join(front_path,  'index.html')),
+            (TEMPLATE_MODEL_MINTER_JS, data, os.path.join(front_path,  'index.js')),
+      ]
+      try:
+            click.echo(_render_report(_render_plan(plan)))
+      except render_commit_error as e:
+            click.echo(f"Render failed while replacing files, project partly updated: {e}")
+      except Exception as e:
+            click.echo(f"Render failed, project left unchanged: {e}")
 
       loading.Stop()
 
@@ -2832,11 +4924,13 @@ def icp_update_model_minter(model):
 @click.command('icp-update-custom-client')
 @click.argument('model', type=str)
 @click.argument('backend', type=str)
-def icp_update_custom_client(model, backend):
+@click.option('--optimize', is_flag=True, help='Run optimize-glb on the model before rendering.')
+def icp_update_custom_client(model, backend, optimize):
       """ deploy directories & render custom client debug templates."""
       if not os.path.isdir(backend):
             return
             
+      from gifanimus import GifAnimation
       loading = GifAnimation(LOADING_IMG, 1000, True, '', True)
       loading.Play()
       path = _ic_custom_client_path()
@@ -2849,28 +4943,36 @@ def icp_update_custom_client(model, backend):
         return
 
       model_path = os.path.join(front_src_dir, 'assets', model)
+      if optimize and os.path.isfile(model_path):
+            try:
+                  click.echo(_optimize_glb_summary(_optimize_glb(model_path)))
+            except (OSError, ValueError) as e:
+                  loading.Stop()
+                  raise click.ClickException(f"Optimizing {model} failed: {e}")
+
       hvym_data = _load_hvym_data(model_path)
 
       if hvym_data == None:
             return
 
+      errors = _hvym_input_errors('hvym_nft_data', hvym_data)
+      if errors:
+            loading.Stop()
+            raise click.ClickException('Invalid HVYM_nft_data:\n' + '\n'.join(errors))
+
       data = _parse_hvym_data(hvym_data, model)
 
-      #delete old dir first, then copy custom dir
-      shutil.rmtree(back_src_dir, ignore_errors=True)
+      #the custom backend replaces the old one, copied while the frontend renders
+      plan = [
+            (TEMPLATE_CUSTOM_CLIENT_INDEX, data, os.path.join(front_src_dir,  'index.html')),
+            (TEMPLATE_CUSTOM_CLIENT_JS, data, os.path.join(front_src_dir,  'index.js')),
+      ]
       try:
-            shutil.copytree(backend, back_src_dir)
-                
-      except Exception as e:  
-            print("Copy custom backend failed with:", str(e))
-
-      out_file_path = os.path.join(front_src_dir,  'index.html')
-
-      _render_template(TEMPLATE_CUSTOM_CLIENT_INDEX, data, out_file_path)
-
-      out_file_path = os.path.join(front_src_dir,  'index.js')
-
-      _render_template(TEMPLATE_CUSTOM_CLIENT_JS, data, out_file_path)
+            click.echo(_render_report(_render_plan(plan, [(backend, back_src_dir)])))
+      except render_commit_error as e:
+            print("Update custom client failed while replacing files, project partly updated:", str(e))
+      except Exception as e:
+            print("Update custom client failed, project left unchanged:", str(e))
 
       loading.Stop()
 
@@ -3063,6 +5165,32 @@ def update_proprium_js_file():
       """Update the local js file for hvym-proprium module"""
       _update_proprium_js_file()
 
+@click.command('serve')
+@click.option('--socket', 'socket_path', type=click.Path(), default=None, help='Unix socket to listen on, defaults to $HVYM_SOCKET or hvym.sock in the user data dir.')
+@click.option('--idle-timeout', type=float, default=600, show_default=True, help='Seconds without a request before the daemon exits.')
+@click.option('--stop', is_flag=True, default=False, help='Ask the running daemon to shut down.')
+def serve(socket_path, idle_timeout, stop):
+      """Run a daemon serving cli commands as JSON-RPC methods over a unix socket."""
+      if not hasattr(socket, 'AF_UNIX'):
+            click.echo("Unix sockets are not supported on this platform.")
+            return
+      path = socket_path or _serve_socket_path()
+      if stop:
+            _serve_stop(path)
+      else:
+            _serve(path, idle_timeout)
+
+@click.command('batch')
+def batch():
+      """Run commands read as NDJSON from stdin, e.g. {"cmd": "mesh-data", "args": [...]}, one JSON result per line."""
+      stdin = click.get_text_stream('stdin')
+      stdout = click.get_text_stream('stdout')
+      for line in stdin:
+            if not line.strip():
+                  continue
+            stdout.write(_json_dumps(_batch_run_line(line)) + '\n')
+            stdout.flush()
+
 @click.command('check')
 def check():
       """For checking if cli is on the path"""
@@ -3071,6 +5199,7 @@ def check():
 @click.command('up')
 def up():
       """Set up the cli"""
+      from gifanimus import GifAnimation
       loading = GifAnimation(BUILDING_IMG, 1000, True, '', True)
       loading.Play()
       _link_hvym_npm_modules()
@@ -3081,6 +5210,7 @@ def up():
 @click.argument('msg', type=str)
 def custom_loading_msg(msg):
       """ Show custom loading message based on passed msg arg."""
+      from gifanimus import GifAnimation
       loading = GifAnimation(str(LOADING_IMG), 1000, True, msg)
       loading.Play()
       time.sleep(5)
@@ -3132,20 +5262,153 @@ def test():
 
 @click.command('print-hvym-data')
 @click.argument('path', type=str)
-def print_hvym_data(path):
+@click.option('--path', 'json_path', default=None, help='Only print this subtree, ie: collection_0.valProps')
+@click.option('--compact', is_flag=True, help='Print compact json on a single line.')
+def print_hvym_data(path, json_path, compact):
       """Print Heavymeta data embedded in glb file."""
+      if '.glb' not in path and '.gltf' not in path:
+        click.echo(f"Only GLTF files (.glb, .gltf) accepted.")
+        return
+      hvym_data = _model_metadata(path)
+      if hvym_data is None:
+        click.echo(f"No Heavymeta data in file: {path}")
+        return
+
+      if json_path:
+        try:
+              for part in json_path.split('.'):
+                    hvym_data = hvym_data[int(part)] if isinstance(hvym_data, list) else hvym_data[part]
+        except (KeyError, IndexError, ValueError, TypeError):
+              click.echo(f"No Heavymeta data at path: {json_path}", err=True)
+              sys.exit(1)
+
+      for chunk in _json_iterencode(hvym_data, pretty=not compact):
+        sys.stdout.write(chunk)
+      sys.stdout.write('\n')
+
+
+@click.command('set-hvym-data')
+@click.argument('path', type=str)
+@click.argument('hvym_data', type=str)
+@click.option('--output', '-o', default=None, help='Write the updated model here instead of in place.')
+def set_hvym_data(path, hvym_data, output):
+      """Replace the Heavymeta data embedded in glb file, json given inline, as @file or - for stdin."""
       if '.glb' not in path:
         click.echo(f"Only GLTF Binary files (.glb) accepted.")
         return
-      gltf = GLTF2().load(path)
-      if 'HVYM_nft_data' in gltf.extensions.keys():
-        hvym_data = gltf.extensions['HVYM_nft_data']
-        pretty_json = json.dumps(hvym_data, indent=4)
-        print(pretty_json)
+      if not os.path.isfile(path):
+        click.echo(f"No model exists at path {path}.")
+        return
+
+      gltf_json = _read_glb_json(path)
+      if gltf_json is None:
+        click.echo(f"Not a GLTF Binary file: {path}")
+        return
+
+      data = _load_json_arg(hvym_data)
+      errors = _hvym_input_errors('hvym_nft_data', data)
+      if errors:
+            raise click.ClickException('Invalid HVYM_nft_data:\n' + '\n'.join(errors))
+
+      gltf_json.setdefault('extensions', {})['HVYM_nft_data'] = data
+      extensions_used = gltf_json.setdefault('extensionsUsed', [])
+      if 'HVYM_nft_data' not in extensions_used:
+        extensions_used.append('HVYM_nft_data')
+
+      _write_glb_json(path, gltf_json, output)
+      click.echo(f"Heavymeta data updated in: {output or path}")
+
+
+@click.command('optimize-glb')
+@click.argument('path', type=str)
+@click.option('--output', '-o', default=None, help='Write the optimized model here instead of in place.')
+@click.option('--quantize', is_flag=True, help='Store normals as normalized bytes, on meshes the Heavymeta data does not name.')
+@click.option('--max-texture-size', type=int, default=None, help='Downscale embedded textures to fit this many pixels.')
+@click.option('--texture-format', type=click.Choice(TEXTURE_FORMATS), default=None, help='Re-encode embedded textures, webp by default when --max-texture-size is given.')
+@click.option('--quality', type=int, default=85, show_default=True, help='Texture webp/jpeg quality.')
+@click.option('--jobs', '-j', type=int, default=None, help='Threads used for textures.')
+@click.option('--json', 'as_json', is_flag=True, help='Print the report as json.')
+def optimize_glb(path, output, quantize, max_texture_size, texture_format, quality, jobs, as_json):
+      """Drop unused data from a glb file and repack its buffer before deploy."""
+      if '.glb' not in path:
+        click.echo(f"Only GLTF Binary files (.glb) accepted.")
+        return
+      if not os.path.isfile(path):
+        click.echo(f"No model exists at path {path}.")
+        return
+
+      try:
+            report = _optimize_glb(path, output, quantize, max_texture_size, texture_format, quality, jobs)
+      except (OSError, ValueError) as e:
+            raise click.ClickException(str(e))
+      if as_json:
+        click.echo(_json_dumps(report, pretty=True))
       else:
-        click.echo(f"No Heavymeta data in file: {path}")
+        click.echo(_optimize_glb_summary(report))
+
+
+@click.command('index-models')
+@click.argument('path', type=str)
+@click.option('--index', 'index_path', default=MODEL_INDEX_PATH, show_default=True, help='SQLite index file.')
+def index_models(path, index_path):
+      """Index the Heavymeta data of all models under a directory."""
+      if not os.path.isdir(path):
+        click.echo(f"No directory exists at path {path}.")
+        return
+      counts = _index_models(path, index_path)
+      click.echo(f"{counts['indexed']} indexed, {counts['unchanged']} unchanged, {counts['removed']} removed, {counts['failed']} failed.")
+
+
+@click.command('query-models')
+@click.option('--val-action', help='Models with a valProp of this prop_action_type, ie: Bicremental.')
+@click.option('--prop', help='Models with a valProp or callProp of this name.')
+@click.option('--collection', help='Models with this collection key or collectionName.')
+@click.option('--project', help='Models of this project name.')
+@click.option('--contract', multiple=True, help="Contract filter like 'maxSupply>1000' or 'nftType=HVYC', may be repeated.")
+@click.option('--index', 'index_path', default=MODEL_INDEX_PATH, show_default=True, help='SQLite index file.')
+@click.option('--json', 'as_json', is_flag=True, help='Print matches as json records instead of paths.')
+def query_models(val_action, prop, collection, project, contract, index_path, as_json):
+      """Find indexed models by their Heavymeta data."""
+      models = _query_models(index_path, val_action, prop, collection, project, contract)
+      if as_json:
+        click.echo(_json_dumps(models, pretty=True))
+      else:
+        for model in models:
+              click.echo(model['path'])
+
+
+@click.command('validate-models')
+@click.argument('path', type=str)
+@click.option('--jobs', '-j', type=int, default=None, help='Worker processes, defaults to the cpu count.')
+@click.option('--report', 'report_path', default=None, help='Write the json report to this file instead of stdout.')
+def validate_models(path, jobs, report_path):
+      """Validate the Heavymeta data of all models under a directory, exits 1 if any fail."""
+      if not os.path.isdir(path):
+        click.echo(f"No directory exists at path {path}.", err=True)
+        sys.exit(1)
+
+      paths = list(_find_models(os.path.abspath(path)))
+      results = _validate_models(paths, jobs)
+      failed = [result for result in results if not result['ok']]
+      report = _json_dumps({'checked': len(results), 'failed': len(failed), 'models': results}, pretty=True)
+      if report_path:
+        with open(report_path, 'w') as f:
+              f.write(report)
+      else:
+        click.echo(report)
+
+      click.echo(f"{len(failed)} of {len(results)} models failed validation.", err=True)
+      if failed:
+        sys.exit(1)
         
 
+@click.command('compile-templates')
+def compile_templates():
+      """Precompile the render templates to python modules, used by the icp-update commands while they're current."""
+      sources = _compile_templates()
+      click.echo(f"Compiled {len(sources)} templates to {TEMPLATE_MODULES_PATH}.")
+
+
 @click.command('version')
 def version():
       """Print the version number."""
@@ -3159,50 +5422,59 @@ def about():
 
 '''popup creation methods:'''
 def _splash(text):
+      from qthvym import HVYMInteraction
       interaction = HVYMInteraction()
       interaction.splash(text)
 
 def _msg_popup(msg, icon=str(LOGO_IMG)):
+      from qthvym import HVYMInteraction
       interaction = HVYMInteraction()
       interaction.msg_popup(msg, icon)
 
 def _options_popup(msg, options,icon=str(LOGO_IMG)):
+      from qthvym import HVYMInteraction
       interaction = HVYMInteraction()
       interaction.options_popup(msg, options, icon)
       
       return interaction
 
 def _edit_line_popup(msg, defaultText=None, icon=str(LOGO_IMG)):
+      from qthvym import HVYMInteraction
       interaction = HVYMInteraction()
       interaction.edit_line_popup(msg, defaultText, icon)
 
       return interaction
 
 def _user_popup(msg, icon=str(LOGO_IMG)):
+      from qthvym import HVYMInteraction
       interaction = HVYMInteraction()
       interaction.user_popup(msg, icon)
 
       return interaction
 
 def _password_popup(msg, icon=str(LOGO_IMG)):
+      from qthvym import HVYMInteraction
       interaction = HVYMInteraction()
       interaction.password_popup(msg, icon)
 
       return interaction
 
 def _user_password_popup(msg, defaultText=None, icon=str(LOGO_IMG)):
+      from qthvym import HVYMInteraction
       interaction = HVYMInteraction()
       interaction.user_password_popup(msg, defaultText, icon)
 
       return interaction
 
 def _copy_line_popup(msg, defaultText=None, icon=str(LOGO_IMG)):
+      from qthvym import HVYMInteraction
       interaction = HVYMInteraction()
       interaction.copy_line_popup(msg, defaultText, icon)
 
       return interaction
 
 def _copy_text_popup(msg, defaultText=None, icon=str(LOGO_IMG)):
+      from qthvym import HVYMInteraction
       interaction = HVYMInteraction()
       interaction.copy_text_popup(msg, defaultText, icon)
 
@@ -3210,6 +5482,7 @@ def _copy_text_popup(msg, defaultText=None, icon=str(LOGO_IMG)):
 
 def _choice_popup(msg, icon=str(LOGO_IMG)):
       """ Show choice popup, message based on passed msg arg."""
+      from qthvym import HVYMInteraction
       interaction = HVYMInteraction()
       interaction.choice_popup(msg, icon)
 
@@ -3220,12 +5493,14 @@ def _prompt_popup(msg):
       _msg_popup(msg)
 
 def _file_select_popup(msg, filters=None, icon=str(LOGO_CHOICE_IMG)):
+      from qthvym import HVYMInteraction
       interaction = HVYMInteraction()
       interaction.file_select_popup(msg, filters)
 
       return interaction
 
 def _folder_select_popup(msg, icon=str(LOGO_CHOICE_IMG)):
+      from qthvym import HVYMInteraction
       interaction = HVYMInteraction()
       interaction.folder_select_popup(msg)
 
@@ -3267,7 +5542,11 @@ def _ic_account_dropdown_popup(confirmation=True):
       select = popup.value
 
       if select != None and select != data['active_id']:
-            _ic_set_id(select)
+            try:
+                  _ic_set_id(select)
+            except RuntimeError as e:
+                  _msg_popup(f'Could not change account: {e}', str(LOGO_WARN_IMG))
+                  return data['active_id']
             data = _ic_id_info()
             if confirmation:
                   _msg_popup(f'Account has been changed to: {select}', str(ICP_LOGO_IMG))
@@ -3276,8 +5555,7 @@ def _ic_account_dropdown_popup(confirmation=True):
 
 
 def _ic_new_encrypted_account_popup():
-      find = Query()
-      data = IC_IDS.get(find.data_type == 'IC_ID_ACTIVE')
+      data = _ic_identity_snapshot()
       text = 'Enter a name for the new account:'
       popup = _user_password_popup(text, None, str(ICP_LOGO_IMG))
 
@@ -3312,8 +5590,7 @@ def _ic_new_encrypted_account_popup():
 
 
 def _ic_new_test_account_popup():
-      find = Query()
-      data = IC_IDS.get(find.data_type == 'IC_ID_ACTIVE')
+      data = _ic_identity_snapshot()
       text = 'Enter a name for the new test account:'
       popup = _user_popup(text, str(ICP_LOGO_IMG))
 
@@ -3366,8 +5643,12 @@ def _ic_remove_account_dropdown_popup(confirmation=True):
             popup = _choice_popup(f'Are you sure you want to delete {select}', str(LOGO_CHOICE_IMG))
             choice = popup.value
             if choice == 'OK':
-                  _ic_set_id('default')
-                  _ic_remove_id(select.strip())
+                  try:
+                        _ic_set_id('default')
+                        _ic_remove_id(select.strip())
+                  except RuntimeError as e:
+                        _msg_popup(f'Could not remove {select}: {e}', str(LOGO_WARN_IMG))
+                        return _ic_id_info()['active_id']
                   data = _ic_id_info()
                   _ic_update_data()
                   if confirmation:
@@ -3409,6 +5690,7 @@ def _pinggy_install():
             print(f"Downloading Pinggy from: {download_url}")
             
             # Download Pinggy
+            import requests
             response = requests.get(download_url)
             
             if not response.ok:
@@ -3459,7 +5741,8 @@ def _pintheon_tunnel_open():
       
       if pinggy_token and pinggy_token.strip():
             port = data.get('pintheon_port', 9999)
-            pinggy_command = f'{PINGGY} -p 443 -R0:localhost:{port} -L4300:localhost:4300 -o StrictHostKeyChecking=no -o ServerAliveInterval=30 -t {pinggy_token}@pro.pinggy.io x:https x:localServerTls:localhost x:passpreflight'
+            pinggy_argv = [PINGGY, '-p', '443', f'-R0:localhost:{port}', '-L4300:localhost:4300', '-o', 'StrictHostKeyChecking=no', '-o', 'ServerAliveInterval=30',
+                           '-t', f'{pinggy_token}@pro.pinggy.io', 'x:https', 'x:localServerTls:localhost', 'x:passpreflight']
             
             print(f"Starting tunnel in new terminal window...")
             
@@ -3468,29 +5751,32 @@ def _pintheon_tunnel_open():
                   import os
                   
                   system = platform.system().lower()
+                  pinggy_command = subprocess.list2cmdline(pinggy_argv) if system == "windows" else shlex.join(pinggy_argv)
+                  keep_open = f'{pinggy_command}; echo "Tunnel closed. Press Enter to close this window."; read'
                   
                   if system == "linux":
                         # Linux terminal emulators
                         terminal_commands = [
-                              f'gnome-terminal --title="Pintheon Tunnel" -- bash -c "{pinggy_command}; echo \\"Tunnel closed. Press Enter to close this window.\\"; read"',
-                              f'xterm -title "Pintheon Tunnel" -e bash -c "{pinggy_command}; echo \\"Tunnel closed. Press Enter to close this window.\\"; read"',
-                              f'konsole --title "Pintheon Tunnel" -e bash -c "{pinggy_command}; echo \\"Tunnel closed. Press Enter to close this window.\\"; read"',
-                              f'xfce4-terminal --title="Pintheon Tunnel" -e bash -c "{pinggy_command}; echo \\"Tunnel closed. Press Enter to close this window.\\"; read"',
-                              f'terminator --title="Pintheon Tunnel" -e "{pinggy_command}"'
+                              ['gnome-terminal', '--title=Pintheon Tunnel', '--', 'bash', '-c', keep_open],
+                              ['xterm', '-title', 'Pintheon Tunnel', '-e', 'bash', '-c', keep_open],
+                              ['konsole', '--title', 'Pintheon Tunnel', '-e', 'bash', '-c', keep_open],
+                              ['xfce4-terminal', '--title=Pintheon Tunnel', '-e', f'bash -c {shlex.quote(keep_open)}'],
+                              ['terminator', '--title=Pintheon Tunnel', '-e', pinggy_command]
                         ]
                   elif system == "darwin":  # macOS
                         # macOS terminal options
+                        script = pinggy_command.replace('\\', '\\\\').replace('"', '\\"')
                         terminal_commands = [
-                              f'osascript -e \'tell app "Terminal" to do script "{pinggy_command}"\'',
-                              f'osascript -e \'tell app "iTerm" to create window with default profile command "{pinggy_command}"\'',
-                              f'open -a Terminal "{pinggy_command}"'
+                              ['osascript', '-e', f'tell app "Terminal" to do script "{script}"'],
+                              ['osascript', '-e', f'tell app "iTerm" to create window with default profile command "{script}"'],
+                              ['open', '-a', 'Terminal', pinggy_command]
                         ]
                   elif system == "windows":
-                        # Windows terminal options
+                        # Windows terminal options, start is a cmd builtin
                         terminal_commands = [
-                              f'start "Pintheon Tunnel" cmd /k "{pinggy_command}"',
-                              f'start "Pintheon Tunnel" powershell -Command "& {{{pinggy_command}}}"',
-                              f'wt -d . "{pinggy_command}"'  # Windows Terminal
+                              ['cmd', '/c', 'start', 'Pintheon Tunnel', 'cmd', '/k', pinggy_command],
+                              ['cmd', '/c', 'start', 'Pintheon Tunnel', 'powershell', '-Command', f'& {{{pinggy_command}}}'],
+                              ['wt', '-d', '.', *pinggy_argv]  # Windows Terminal
                         ]
                   else:
                         # Fallback for unknown systems
@@ -3499,18 +5785,14 @@ def _pintheon_tunnel_open():
                   success = False
                   for terminal_cmd in terminal_commands:
                         try:
-                              # Try to launch terminal (non-blocking)
-                              if system == "windows":
-                                    # Windows needs different handling
-                                    subprocess.Popen(terminal_cmd, shell=True)
-                              else:
-                                    subprocess.Popen(terminal_cmd, shell=True)
+                              # Launch the terminal detached, it outlives this command
+                              subprocess.Popen(terminal_cmd, start_new_session=True)
                               
                               success = True
                               break
-                        except Exception as e:
+                        except OSError as e:
                               # Try next terminal emulator
-                              print(f"Failed to launch terminal with: {terminal_cmd}")
+                              print(f"Failed to launch terminal with: {terminal_cmd[0]}")
                               continue
                   
                   if success:
@@ -3520,7 +5802,7 @@ def _pintheon_tunnel_open():
                   else:
                         # Fallback to direct execution if no terminal emulator works
                         print("No terminal emulator found, running tunnel directly...")
-                        result = subprocess.run(pinggy_command, shell=True, check=False)
+                        result = _run_command(pinggy_argv, timeout=None, on_stdout=print, on_stderr=print)
                         _tunnel_status = "stopped"
                         _update_tunnel_status("stopped")
                         return f"Tunnel process completed with return code: {result.returncode}"
@@ -3556,37 +5838,15 @@ def _update_tunnel_status(status):
 
 
 def _docker_image_exists(name):
-    import subprocess
-    try:
-        output = subprocess.check_output(
-            [
-                'docker', 'images', '--format', '{{.Repository}}:{{.Tag}}'
-            ],
-            stderr=subprocess.DEVNULL
-        ).decode('utf-8').strip().split('\n')
-        return name in output
-    except Exception:
-        return False
+    result = _run_command(['docker', 'images', '--format', '{{.Repository}}:{{.Tag}}'])
+    return result.ok and name in result.stdout.strip().split('\n')
 
 def _docker_container_exists(name):
-    try:
-        output = subprocess.check_output(
-            [
-                'docker', 'ps', '-a', '--filter', f'name=^{name}$', '--format', '{{.Names}}'
-            ],
-            stderr=subprocess.DEVNULL
-        ).decode('utf-8').strip()
-        return output == name
-    except Exception:
-        return False
+    result = _run_command(['docker', 'ps', '-a', '--filter', f'name=^{name}$', '--format', '{{.Names}}'])
+    return result.ok and result.stdout.strip() == name
 
 def _check_docker_installed():
-      result = True
-      output = subprocess.run(["docker", "--version"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-      if not 'Docker version' in output.stdout.decode('utf-8'):
-            result = False
-
-      return result
+      return 'Docker version' in _run_command(['docker', '--version']).stdout
         
 def _pintheon_port():
       data = APP_DATA.get(Query().data_type == 'APP_DATA')
@@ -3611,8 +5871,11 @@ def _pintheon_create_container():
             current_dir = Path.cwd()
             volume_path = _get_docker_volume_path(current_dir / "pintheon_data")
             
-            command = f'docker create --name pintheon --pid=host --dns=8.8.8.8 --network bridge -p {port}:443/tcp -v "{volume_path}:/home/pintheon/data" metavinci/{dapp}:{PINTHEON_VERSION}'
-            output = subprocess.check_output(command, cwd=HOME, shell=True, stderr=subprocess.STDOUT)
+            command = ['docker', 'create', '--name', 'pintheon', '--pid=host', '--dns=8.8.8.8', '--network', 'bridge', '-p', f'{port}:443/tcp',
+                       '-v', f'{volume_path}:/home/pintheon/data', f'metavinci/{dapp}:{PINTHEON_VERSION}']
+            output = _run_command(command, cwd=HOME, merge_stderr=True)
+            if not output.ok:
+                  print(output.message)
       except:
             print(output)
 
@@ -3621,16 +5884,19 @@ def _pintheon_pull_popup():
       return popup
 
 def _pintheon_pull(procImg=LOADING_IMG,):
+    from gifanimus import GifAnimation
     loading = GifAnimation(procImg, 1000, True, '', True)
     loading.Play()
     dapp = _pintheon_dapp()
-    command = f'docker pull metavinci/{dapp}:{PINTHEON_VERSION}'
-    output = subprocess.check_output(command, cwd=HOME, shell=True, stderr=subprocess.STDOUT)
+    command = ['docker', 'pull', f'metavinci/{dapp}:{PINTHEON_VERSION}']
+    output = _run_command(command, cwd=HOME, timeout=BUILD_COMMAND_TIMEOUT, merge_stderr=True)
     loading.Stop()
+    if not output.ok:
+      raise RuntimeError(output.message)
 
 def _pintheon_start():
     if _docker_container_exists('pintheon'):
-      command = 'docker start pintheon'
+      command = ['docker', 'start', 'pintheon']
       return _call(command)
     else:
       port = _pintheon_port()
@@ -3640,12 +5906,13 @@ def _pintheon_start():
       current_dir = Path.cwd()
       volume_path = _get_docker_volume_path(current_dir / "pintheon_data")
       
-      command = f'docker run -d --name pintheon --pid=host --dns=8.8.8.8 --network bridge -p {port}:443/tcp -v "{volume_path}:/home/pintheon/data" metavinci/{dapp}:{PINTHEON_VERSION}'
-      output = subprocess.check_output(command, cwd=HOME, shell=True, stderr=subprocess.STDOUT)
-      print(output)
+      command = ['docker', 'run', '-d', '--name', 'pintheon', '--pid=host', '--dns=8.8.8.8', '--network', 'bridge', '-p', f'{port}:443/tcp',
+                 '-v', f'{volume_path}:/home/pintheon/data', f'metavinci/{dapp}:{PINTHEON_VERSION}']
+      output = _run_command(command, cwd=HOME, timeout=BUILD_COMMAND_TIMEOUT, merge_stderr=True)
+      print(output.stdout if output.ok else output.message)
 
 def _pintheon_stop():
-      command = 'docker stop pintheon'
+      command = ['docker', 'stop', 'pintheon']
       return _call(command)
 
 def _stellar_load_shared_pub():
@@ -3725,6 +5992,7 @@ def _stellar_load_keys():
             data = accounts.get(find.name == user)
 
             if data != None:
+                  from stellar_sdk import Keypair
                   keys = Keypair.from_secret(data['secret'])
             else:
                   _msg_popup('No keys found', str(STELLAR_LOGO_IMG))
@@ -3751,6 +6019,7 @@ def _stellar_select_keys():
             data = accounts.get(find.name == user)
 
             if data != None:
+                  from stellar_sdk import Keypair
                   keys = Keypair.from_secret(data['secret'])
             else:
                   _msg_popup('No keys found', str(STELLAR_LOGO_IMG))
@@ -3802,6 +6071,8 @@ def _stellar_new_account_popup():
             data = accounts.get(find.name == user)
 
             if data is None:
+                  from stellar_sdk import Keypair
+                  from hvym_stellar import Stellar25519KeyPair
                   keypair = Keypair.random()
                   keypair_25519 = Stellar25519KeyPair(keypair)
                   seed = keypair.generate_mnemonic_phrase(strength=256)
@@ -3930,113 +6201,123 @@ def _is_pinggy_tunnel_open():
     """
     try:
         # Pinggy web debugger runs on localhost:4300
+        import requests
         response = requests.get("http://localhost:4300", timeout=5)
         return response.status_code == 200
     except:
         return False
 
-cli.add_command(parse_blender_hvym_interactables)
-cli.add_command(parse_blender_hvym_collection)
-cli.add_command(contract_data)
-cli.add_command(collection_data)
-cli.add_command(contract_data)
-cli.add_command(mat_prop_data)
-cli.add_command(anim_prop_data)
-cli.add_command(mesh_set_data)
-cli.add_command(single_node_data)
-cli.add_command(single_mesh_data)
-cli.add_command(mesh_data)
-cli.add_command(single_float_data)
-cli.add_command(slider_float_data)
-cli.add_command(single_int_data)
-cli.add_command(slider_int_data)
-cli.add_command(slider_data)
-cli.add_command(menu_data)
-cli.add_command(basic_material_data)
-cli.add_command(lambert_material_data)
-cli.add_command(phong_material_data)
-cli.add_command(standard_material_data)
-cli.add_command(pbr_material_data)
-cli.add_command(icp_install)
-cli.add_command(didc_install)
-cli.add_command(didc_bind_js)
-cli.add_command(didc_bind_js_popup)
-cli.add_command(didc_bind_ts)
-cli.add_command(didc_bind_ts_popup)
-cli.add_command(icp_new_cryptonym)
-cli.add_command(icp_id_list)
-cli.add_command(icp_use_id)
-cli.add_command(icp_use_cryptonym)
-cli.add_command(icp_account)
-cli.add_command(icp_principal)
-cli.add_command(ic_account_is_encrypted)
-cli.add_command(icp_principal_hash)
-cli.add_command(icp_balance)
-cli.add_command(icp_start_assets)
-cli.add_command(icp_stop_assets)
-cli.add_command(icp_template)
-cli.add_command(icp_deploy_assets)
-cli.add_command(icp_backup_keys)
-cli.add_command(icp_project)
-cli.add_command(icp_export_project)
-cli.add_command(icp_project_path)
-cli.add_command(icp_minter_path)
-cli.add_command(icp_minter_model_path)
-cli.add_command(icp_custom_client_path)
-cli.add_command(icp_model_path)
-cli.add_command(icp_account_info)
-cli.add_command(icp_set_account)
-cli.add_command(icp_new_account)
-cli.add_command(icp_new_test_account)
-cli.add_command(icp_remove_account)
-cli.add_command(icp_active_principal)
-cli.add_command(stellar_update_db_pw)
-cli.add_command(stellar_load_shared_pub)
-cli.add_command(stellar_select_shared_pub)
-cli.add_command(stellar_load_keys)
-cli.add_command(stellar_select_keys)
-cli.add_command(stellar_set_account)
-cli.add_command(stellar_new_account)
-cli.add_command(stellar_remove_account)
-cli.add_command(pinggy_set_token)
-cli.add_command(pinggy_token)
-cli.add_command(pintheon_port)
-cli.add_command(pintheon_dapp)
-cli.add_command(pintheon_network)
-cli.add_command(pintheon_image_exists)
-cli.add_command(pintheon_set_port)
-cli.add_command(pintheon_set_network)
-cli.add_command(pintheon_setup)
-cli.add_command(pintheon_start)
-cli.add_command(pintheon_stop)
-cli.add_command(pintheon_tunnel_open)
-cli.add_command(is_pintheon_tunnel_open)
-
-cli.add_command(img_to_url)
-cli.add_command(icp_init)
-cli.add_command(icp_update_model)
-cli.add_command(icp_update_model_minter)
-cli.add_command(icp_update_custom_client)
-cli.add_command(icp_assign_canister_id)
-cli.add_command(svg_to_data_url)
-cli.add_command(png_to_data_url)
-cli.add_command(update_npm_modules)
-cli.add_command(update_proprium_js_file)
-cli.add_command(check)
-cli.add_command(up)
-cli.add_command(custom_loading_msg)
-cli.add_command(custom_prompt)
-cli.add_command(custom_choice_prompt)
-cli.add_command(custom_copy_line_prompt)
-cli.add_command(custom_copy_text_prompt)
-cli.add_command(splash)
-cli.add_command(test)
-cli.add_command(print_hvym_data)
-cli.add_command(version)
-cli.add_command(about)
-# cli.add_command(pintheon_pull_popup)
-
-_ic_update_data(None, True)
+_LAZY_COMMANDS = {
+      'parse-blender-hvym-interactables': 'parse_blender_hvym_interactables',
+      'parse-blender-hvym-collection': 'parse_blender_hvym_collection',
+      'contract-data': 'contract_data',
+      'collection-data': 'collection_data',
+      'mat-prop-data': 'mat_prop_data',
+      'anim-prop-data': 'anim_prop_data',
+      'mesh-set-data': 'mesh_set_data',
+      'single-node-data': 'single_node_data',
+      'single-mesh-data': 'single_mesh_data',
+      'mesh-data': 'mesh_data',
+      'single-float-data': 'single_float_data',
+      'slider-float-data': 'slider_float_data',
+      'single-int-data': 'single_int_data',
+      'slider-int-data': 'slider_int_data',
+      'slider-data': 'slider_data',
+      'menu-data': 'menu_data',
+      'basic-material-data': 'basic_material_data',
+      'lambert-material-data': 'lambert_material_data',
+      'phong-material-data': 'phong_material_data',
+      'standard-material-data': 'standard_material_data',
+      'pbr-material-data': 'pbr_material_data',
+      'icp-install': 'icp_install',
+      'didc-install': 'didc_install',
+      'didc-bind-js': 'didc_bind_js',
+      'didc-bind-js-popup': 'didc_bind_js_popup',
+      'didc-bind-ts': 'didc_bind_ts',
+      'didc-bind-ts-popup': 'didc_bind_ts_popup',
+      'icp-new-cryptonym': 'icp_new_cryptonym',
+      'icp-id-list': 'icp_id_list',
+      'icp-use-id': 'icp_use_id',
+      'icp-use-cryptonym': 'icp_use_cryptonym',
+      'icp-account': 'icp_account',
+      'icp-principal': 'icp_principal',
+      'icp-account-is-encrypted': 'ic_account_is_encrypted',
+      'icp-principal-hash': 'icp_principal_hash',
+      'icp-balance': 'icp_balance',
+      'icp-start-assets': 'icp_start_assets',
+      'icp-stop-assets': 'icp_stop_assets',
+      'icp-template': 'icp_template',
+      'icp-deploy-assets': 'icp_deploy_assets',
+      'icp-backup-keys': 'icp_backup_keys',
+      'icp-project': 'icp_project',
+      'icp-export-project': 'icp_export_project',
+      'icp-project-path': 'icp_project_path',
+      'icp-minter-path': 'icp_minter_path',
+      'icp-minter-model-path': 'icp_minter_model_path',
+      'icp-custom-client-path': 'icp_custom_client_path',
+      'icp-model-path': 'icp_model_path',
+      'icp-account-info': 'icp_account_info',
+      'icp-set-account': 'icp_set_account',
+      'icp-new-account': 'icp_new_account',
+      'icp-new-test-account': 'icp_new_test_account',
+      'icp-remove-account': 'icp_remove_account',
+      'icp-active-principal': 'icp_active_principal',
+      'stellar-update-db-pw': 'stellar_update_db_pw',
+      'stellar-load-shared-pub': 'stellar_load_shared_pub',
+      'stellar-select-shared-pub': 'stellar_select_shared_pub',
+      'stellar-load-keys': 'stellar_load_keys',
+      'stellar-select-keys': 'stellar_select_keys',
+      'stellar-set-account': 'stellar_set_account',
+      'stellar-new-account': 'stellar_new_account',
+      'stellar-remove-account': 'stellar_remove_account',
+      'pinggy-set-token': 'pinggy_set_token',
+      'pinggy-token': 'pinggy_token',
+      'pintheon-port': 'pintheon_port',
+      'pintheon-dapp': 'pintheon_dapp',
+      'pintheon-network': 'pintheon_network',
+      'pintheon-image-exists': 'pintheon_image_exists',
+      'pintheon-set-port': 'pintheon_set_port',
+      'pintheon-set-network': 'pintheon_set_network',
+      'pintheon-setup': 'pintheon_setup',
+      'pintheon-start': 'pintheon_start',
+      'pintheon-stop': 'pintheon_stop',
+      'pintheon-tunnel-open': 'pintheon_tunnel_open',
+      'is-pintheon-tunnel-open': 'is_pintheon_tunnel_open',
+      'img-to-url': 'img_to_url',
+      'icp-init': 'icp_init',
+      'icp-update-model': 'icp_update_model',
+      'icp-update-model-minter': 'icp_update_model_minter',
+      'icp-update-custom-client': 'icp_update_custom_client',
+      'icp-assign-canister-id': 'icp_assign_canister_id',
+      'svg-to-data-url': 'svg_to_data_url',
+      'png-to-data-url': 'png_to_data_url',
+      'update-npm-modules': 'update_npm_modules',
+      'update-proprium-js-file': 'update_proprium_js_file',
+      'serve': 'serve',
+      'batch': 'batch',
+      'check': 'check',
+      'up': 'up',
+      'custom-loading-msg': 'custom_loading_msg',
+      'custom-prompt': 'custom_prompt',
+      'custom-choice-prompt': 'custom_choice_prompt',
+      'custom-copy-line-prompt': 'custom_copy_line_prompt',
+      'custom-copy-text-prompt': 'custom_copy_text_prompt',
+      'splash': 'splash',
+      'test': 'test',
+      'print-hvym-data': 'print_hvym_data',
+      'set-hvym-data': 'set_hvym_data',
+      'optimize-glb': 'optimize_glb',
+      'index-models': 'index_models',
+      'query-models': 'query_models',
+      'validate-models': 'validate_models',
+      'compile-templates': 'compile_templates',
+      'version': 'version',
+      'about': 'about',
+      # 'pintheon-pull-popup': 'pintheon_pull_popup',
+}
+
+cli.lazy_subcommands.update(_LAZY_COMMANDS)
+
 _init_app_data()
 
 def _cleanup_tunnel():
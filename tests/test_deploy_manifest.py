@@ -0,0 +1,71 @@
+import json
+import os
+
+import pytest
+
+import hvym
+
+DFX_JSON = {
+      'canisters': {
+            'backend': {'main': 'src/backend/main.mo', 'type': 'motoko'},
+            'frontend': {'source': ['src/frontend/dist'], 'type': 'assets', 'dependencies': ['backend']},
+            'assets': {'source': ['src/assets'], 'type': 'assets'},
+      }
+}
+
+
+@pytest.fixture
+def project(icp_session, monkeypatch, identities):
+      path = icp_session / hvym.ASSETS_CLIENT_TEMPLATE
+      for rel, text in {'dfx.json': json.dumps(DFX_JSON), 'src/backend/main.mo': 'actor {}', 'src/frontend/dist/index.html': '<html/>', 'src/assets/logo.svg': '<svg/>'}.items():
+            os.makedirs(os.path.dirname(path / rel), exist_ok=True)
+            (path / rel).write_text(text)
+
+      # The loading window of _subprocess_output needs a display, run deploys straight through the stub dfx.
+      monkeypatch.setattr(hvym, '_subprocess', lambda chain, folders, command, procImg=None, pw=None: hvym._run_command(command, cwd=str(path)).stdout)
+      # Files dfx writes into the project on every deploy.
+      writes = {'.env': f'CANISTER_ID_BACKEND={os.getpid()}', 'src/declarations/backend/index.js': 'export const backend = 1;'}
+      monkeypatch.setenv('DFX_STUB_DEPLOY_WRITES', json.dumps(writes))
+      return path
+
+
+def _deploy(identities, *args):
+      calls = len(identities.dfx_calls())
+      exit_code, stdout, stderr = hvym._run_cli_command(['icp-deploy-assets', 'assets', *args])
+      assert exit_code == 0, stderr
+      return stdout, [call for call in identities.dfx_calls()[calls:] if call.startswith('deploy')]
+
+
+def test_generated_files_do_not_trigger_a_redeploy(project, identities):
+      assert _deploy(identities)[1] == ['deploy']
+      assert 'src/declarations/backend/index.js' not in hvym._load_deploy_manifest(project)['local']['files']
+
+      (project / '.env').write_text('CANISTER_ID_BACKEND=changed')
+      stdout, deploys = _deploy(identities)
+      assert deploys == []
+      assert 'No changes since the last local deploy' in stdout
+
+
+def test_only_changed_canisters_and_their_dependents_deploy(project, identities):
+      _deploy(identities)
+
+      (project / 'src' / 'assets' / 'logo.svg').write_text('<svg></svg>')
+      assert _deploy(identities)[1] == ['deploy assets']
+
+      (project / 'src' / 'backend' / 'main.mo').write_text('actor { }')
+      assert _deploy(identities)[1] == ['deploy backend', 'deploy frontend']
+
+      (project / 'README.md').write_text('top level files belong to no canister')
+      assert _deploy(identities)[1] == ['deploy']
+
+      assert _deploy(identities, '--force')[1] == ['deploy']
+
+
+def test_clean_start_forgets_local_deploys(project, identities):
+      assert _deploy(identities)[1] == ['deploy']
+      assert _deploy(identities)[1] == []
+
+      # The stub can't start a replica, the manifest is dropped before dfx start --clean runs.
+      assert not hvym._ic_start_daemon(hvym.ASSETS_CLIENT_TEMPLATE, timeout=1).ok
+      assert 'local' not in hvym._load_deploy_manifest(project)
+      assert _deploy(identities)[1] == ['deploy']
@@ -0,0 +1,34 @@
+import pytest
+
+import hvym
+
+
+def test_use_id_reports_dfx_errors(identities):
+      exit_code, stdout, stderr = hvym._run_cli_command(['icp-use-id', 'missing'])
+      assert exit_code == 1
+      assert 'failed in the test stub' in stderr
+
+      exit_code, stdout, stderr = hvym._run_cli_command(['icp-use-cryptonym', 'anonymous'])
+      assert exit_code == 0
+      assert 'Using identity: "anonymous".' in stdout
+
+
+@pytest.mark.parametrize('command', ['icp-account', 'icp-balance'])
+def test_ledger_commands_fail_with_the_dfx_message(identities, command):
+      exit_code, stdout, stderr = hvym._run_cli_command([command])
+      assert exit_code == 1
+      assert stdout == ''
+      assert 'failed in the test stub' in stderr
+
+
+def test_identity_helpers_raise_before_refreshing(identities):
+      with pytest.raises(RuntimeError, match='failed in the test stub'):
+            hvym._ic_set_id('missing')
+      with pytest.raises(RuntimeError, match='failed in the test stub'):
+            hvym._ic_remove_id('missing')
+      assert hvym._ic_active_id() == 'default'
+
+
+def test_call_surfaces_the_error_message(identities):
+      assert hvym._call([hvym.DFX, 'identity', 'whoami']) == b'default\n'
+      assert b'failed in the test stub' in hvym._call([hvym.DFX, 'ledger', 'balance'])
@@ -0,0 +1,195 @@
+import os
+import struct
+
+import pytest
+
+import fixtures
+import hvym
+from conftest import LoadingWindow
+
+POSITIONS = struct.pack('<9f', 0, 0, 0, 1, 0, 0, 0, 1, 0)
+NORMALS = struct.pack('<9f', 0, 0, 1, 0, 0, 1, 0, 0.6, 0.8)
+
+
+def _accessor(view, count=3):
+      return {'bufferView': view, 'componentType': hvym.GLB_FLOAT, 'count': count, 'type': 'VEC3'}
+
+
+def _write_model(path, png=None, hvym_data=None, body_name='body'):
+      """A glb with an unused accessor, bufferView and material, and two bufferViews holding the same positions."""
+      views = [POSITIONS, NORMALS, b'\x01' * 16, POSITIONS]
+      gltf = {
+            'asset': {'version': '2.0'},
+            'meshes': [
+                  {'name': body_name, 'primitives': [{'attributes': {'POSITION': 0, 'NORMAL': 1}, 'material': 1}]},
+                  {'name': 'other', 'primitives': [{'attributes': {'POSITION': 3}}]},
+            ],
+            'accessors': [_accessor(0), _accessor(1), _accessor(2, count=1), _accessor(3)],
+            'materials': [{'name': 'unused'}, {'name': 'used'}, {'name': 'swap'}],
+            'bufferViews': [],
+            'buffers': [{}],
+      }
+      if png is not None:
+            views.append(png)
+            gltf['materials'][1]['pbrMetallicRoughness'] = {'baseColorTexture': {'index': 0}}
+            gltf['textures'] = [{'source': 0}]
+            gltf['images'] = [{'bufferView': 4, 'mimeType': 'image/png'}]
+      if hvym_data is not None:
+            gltf['extensions'] = {'HVYM_nft_data': hvym_data}
+            gltf['extensionsUsed'] = ['HVYM_nft_data']
+      gltf['bufferViews'] = [{'buffer': 0, 'byteLength': len(view)} for view in views]
+      hvym._write_glb(path, gltf, hvym._glb_repack(gltf, [memoryview(view) for view in views]))
+      return path
+
+
+def _view_bytes(gltf, bin_chunk, accessor):
+      view = gltf['bufferViews'][gltf['accessors'][accessor]['bufferView']]
+      return bytes(bin_chunk[view['byteOffset']:view['byteOffset'] + view['byteLength']])
+
+
+def test_set_hvym_data_rewrites_only_the_json_chunk(tmp_path):
+      model = fixtures.write_glb(tmp_path / 'model.glb', fixtures.hvym_nft_data(n_props=2), bin_size=4096)
+      original = model.read_bytes()
+      hvym_data = fixtures.hvym_nft_data(n_props=20, seed=3)
+      (tmp_path / 'data.json').write_text(hvym._json_dumps(hvym_data))
+      out = tmp_path / 'out.glb'
+
+      exit_code, stdout, stderr = hvym._run_cli_command(['set-hvym-data', str(model), f'@{tmp_path / "data.json"}', '-o', str(out)])
+      assert exit_code == 0, stderr
+      assert model.read_bytes() == original
+      assert hvym._read_glb_json(out)['extensions']['HVYM_nft_data'] == hvym_data
+      assert hvym._read_glb_json(out)['extensionsUsed'] == ['HVYM_nft_data']
+
+      data = out.read_bytes()
+      assert struct.unpack_from('<I', data, 8)[0] == len(data)
+      assert data.endswith(original[hvym.GLB_HEADER.size + hvym.GLB_CHUNK_HEADER.size + len(hvym._read_glb_json_chunk(model)):])
+      assert bytes(hvym._read_glb(out)[1]) == bytes(hvym._read_glb(model)[1])
+
+
+def test_set_hvym_data_in_place_leaves_no_temp_files(tmp_path):
+      model = fixtures.write_glb(tmp_path / 'model.glb', bin_size=100)
+      hvym_data = fixtures.hvym_nft_data(n_props=1)
+      exit_code, stdout, stderr = hvym._run_cli_command(['set-hvym-data', str(model), hvym._json_dumps(hvym_data)])
+      assert exit_code == 0, stderr
+      assert hvym._read_glb_json(model)['extensions']['HVYM_nft_data'] == hvym_data
+      assert os.listdir(tmp_path) == ['model.glb']
+
+
+@pytest.mark.parametrize('payload, message', [
+      ('[1, 2]', 'Invalid HVYM_nft_data:'),
+      ('{"contract": {"maxSupply": 5}}', 'hvym_nft_data.project: Field required'),
+      ('{"contract": ', 'Invalid json in argument:'),
+])
+def test_set_hvym_data_rejects_invalid_payloads(tmp_path, payload, message):
+      model = fixtures.write_glb(tmp_path / 'model.glb', fixtures.hvym_nft_data(n_props=1), bin_size=100)
+      original = model.read_bytes()
+      exit_code, stdout, stderr = hvym._run_cli_command(['set-hvym-data', str(model), payload])
+      assert exit_code == 1
+      assert message in stderr
+      assert 'Traceback' not in stderr
+      assert model.read_bytes() == original
+
+
+def test_optimize_prunes_and_remaps_references(tmp_path):
+      model = _write_model(tmp_path / 'model.glb', hvym_data={'mat_set': {'materials': [{'name': 'swap'}]}})
+      report = hvym._optimize_glb(str(model))
+      assert report['removed'] == {'materials': 1, 'textures': 0, 'images': 0, 'samplers': 0, 'accessors': 1, 'bufferViews': 1}
+      assert report['deduplicated'] == 1
+      assert report['saved'] > 0
+
+      gltf, bin_chunk = hvym._read_glb(model)
+      assert [material['name'] for material in gltf['materials']] == ['used', 'swap']
+      assert gltf['meshes'][0]['primitives'][0] == {'attributes': {'POSITION': 0, 'NORMAL': 1}, 'material': 0}
+      assert gltf['meshes'][1]['primitives'][0] == {'attributes': {'POSITION': 2}}
+      assert len(gltf['bufferViews']) == 2
+      assert gltf['accessors'][0]['bufferView'] == gltf['accessors'][2]['bufferView']
+      assert _view_bytes(gltf, bin_chunk, 0) == POSITIONS
+      assert _view_bytes(gltf, bin_chunk, 1) == NORMALS
+      assert gltf['buffers'][0]['byteLength'] == len(bin_chunk)
+
+
+def test_optimize_quantizes_normals_of_unnamed_meshes(tmp_path):
+      model = _write_model(tmp_path / 'model.glb')
+      report = hvym._optimize_glb(str(model), str(tmp_path / 'out.glb'), quantize=True)
+      assert report['quantized'] == 1
+
+      gltf, bin_chunk = hvym._read_glb(tmp_path / 'out.glb')
+      normal = gltf['accessors'][1]
+      assert (normal['componentType'], normal['normalized']) == (hvym.GLB_BYTE, True)
+      assert struct.unpack('<3bx3bx3bx', _view_bytes(gltf, bin_chunk, 1)) == (0, 0, 127, 0, 0, 127, 0, 76, 102)
+      assert 'KHR_mesh_quantization' in gltf['extensionsRequired']
+
+      named = _write_model(tmp_path / 'named.glb', hvym_data={'mesh_set': [{'name': 'body'}]})
+      assert hvym._optimize_glb(str(named), quantize=True)['quantized'] == 0
+
+
+def test_optimize_recompresses_textures(tmp_path, monkeypatch):
+      monkeypatch.setattr(hvym, 'TEXTURE_CACHE_PATH', str(tmp_path / 'cache'))
+      png = fixtures.write_png(tmp_path / 'texture.png', width=64, height=64).read_bytes()
+      model = _write_model(tmp_path / 'model.glb', png=png)
+
+      report = hvym._optimize_glb(str(model), str(tmp_path / 'out.glb'), max_texture_size=16)
+      assert [(texture['images'], texture['cached']) for texture in report['textures']] == [([0], False)]
+      assert report['textures'][0]['after'] < report['textures'][0]['before']
+
+      gltf, bin_chunk = hvym._read_glb(tmp_path / 'out.glb')
+      assert gltf['images'] == [{'bufferView': gltf['images'][0]['bufferView'], 'mimeType': 'image/webp'}]
+      assert gltf['textures'] == [{'extensions': {'EXT_texture_webp': {'source': 0}}}]
+      assert 'EXT_texture_webp' in gltf['extensionsRequired']
+
+      from PIL import Image
+      view = gltf['bufferViews'][gltf['images'][0]['bufferView']]
+      image = Image.open(hvym.BytesIO(bytes(bin_chunk[view['byteOffset']:view['byteOffset'] + view['byteLength']])))
+      assert (image.format, image.size) == ('WEBP', (16, 16))
+
+      report = hvym._optimize_glb(str(model), str(tmp_path / 'out.glb'), max_texture_size=16)
+      assert report['textures'][0]['cached'] is True
+
+
+def test_optimize_replaces_data_when_unknown_extensions_disable_pruning(tmp_path, monkeypatch):
+      monkeypatch.setattr(hvym, 'TEXTURE_CACHE_PATH', str(tmp_path / 'cache'))
+      png = fixtures.write_png(tmp_path / 'texture.png', width=64, height=64).read_bytes()
+      model = _write_model(tmp_path / 'model.glb', png=png)
+      gltf, bin_chunk = hvym._read_glb(model)
+      gltf['extensionsUsed'] = ['EXT_mesh_gpu_instancing']
+      hvym._write_glb(model, gltf, bin_chunk)
+
+      report = hvym._optimize_glb(str(model), quantize=True, max_texture_size=16)
+      assert report['removed'] == {}
+      assert report['quantized'] == 1
+      assert report['saved'] > 0
+
+      gltf, bin_chunk = hvym._read_glb(model)
+      assert len(gltf['bufferViews']) == 4
+      assert NORMALS not in bytes(bin_chunk)
+      assert png not in bytes(bin_chunk)
+      assert _view_bytes(gltf, bin_chunk, 0) == POSITIONS
+
+
+def test_optimize_refuses_external_buffers(tmp_path):
+      model = fixtures.write_glb(tmp_path / 'model.glb', gltf={'asset': {'version': '2.0'}, 'buffers': [{'uri': 'data.bin', 'byteLength': 4}]})
+      with pytest.raises(ValueError, match='single embedded buffer'):
+            hvym._optimize_glb(str(model))
+
+
+def test_oversized_textures_are_skipped(tmp_path, monkeypatch):
+      from PIL import Image
+      monkeypatch.setattr(hvym, 'TEXTURE_CACHE_PATH', str(tmp_path / 'cache'))
+      monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 100)
+      png = fixtures.write_png(tmp_path / 'texture.png', width=64, height=64).read_bytes()
+      model = _write_model(tmp_path / 'model.glb', png=png)
+
+      report = hvym._optimize_glb(str(model), max_texture_size=16)
+      assert 'decompression bomb' in report['textures'][0]['error']
+      assert png in bytes(hvym._read_glb(model)[1])
+
+
+def test_update_command_reports_optimize_errors(icp_session):
+      assets = icp_session / hvym.MINTER_TEMPLATE / 'src' / 'proprium_minter_frontend' / 'assets'
+      assets.mkdir(parents=True)
+      fixtures.write_glb(assets / 'model.glb', fixtures.hvym_nft_data(n_props=1), gltf={'asset': {'version': '2.0'}, 'buffers': [{'uri': 'data.bin', 'byteLength': 4}]})
+
+      exit_code, stdout, stderr = hvym._run_cli_command(['icp-update-model-minter', 'model.glb', '--optimize'])
+      assert exit_code == 1
+      assert 'Optimizing model.glb failed: Only GLB files with a single embedded buffer can be optimized' in stderr
+      assert [window.playing for window in LoadingWindow.instances] == [False]
@@ -0,0 +1,56 @@
+import hvym
+from conftest import ALICE_PEM, ALICE_PRINCIPAL, DEFAULT_PRINCIPAL
+
+
+def _principal_commands():
+      principal = hvym._run_cli_command(['icp-principal'])
+      principal_hash = hvym._run_cli_command(['icp-principal-hash'])
+      creator_hash = hvym._parse_hvym_data({'project': {'name': 'test'}, 'contract': {}}, 'model.glb')['creatorHash']
+      return principal[1].strip(), principal_hash[1].strip(), creator_hash
+
+
+def _hashes(principal):
+      digest = hvym._create_hex(principal.encode('utf-8')).upper()
+      return principal, digest, digest
+
+
+def test_principal_follows_identity_switch(identities):
+      identities.add('alice', ALICE_PEM)
+      assert _principal_commands() == _hashes(DEFAULT_PRINCIPAL)
+
+      identities.use('alice')
+      assert hvym._ic_active_id() == 'alice'
+      assert _principal_commands() == _hashes(ALICE_PRINCIPAL)
+      assert hvym._ic_id_info()['list'][0] == 'alice'
+
+      identities.use('default')
+      assert _principal_commands() == _hashes(DEFAULT_PRINCIPAL)
+
+
+def test_snapshot_is_reused_until_the_store_changes(identities):
+      hvym._ic_identity_snapshot()
+      calls = len(identities.dfx_calls())
+      hvym._ic_identity_snapshot()
+      assert len(identities.dfx_calls()) == calls
+
+      identities.use('anonymous')
+      assert hvym._ic_identity_snapshot()['active_id'] == 'anonymous'
+      assert len(identities.dfx_calls()) > calls
+
+
+def _stored_principals():
+      return {row['id']: row['principal'] for row in hvym.IC_IDS.search(hvym.Query().data_type == 'IC_ID_DATA')}
+
+
+def test_ids_without_a_pem_never_take_the_active_principal(identities):
+      identities.add('alice', ALICE_PEM)
+      identities.add('vault')
+      hvym._ic_update_data()
+      assert _stored_principals() == {'default': DEFAULT_PRINCIPAL, 'alice': ALICE_PRINCIPAL, 'vault': None, 'anonymous': '2vxsx-fae'}
+
+      # A principal stored while vault was active survives refreshes from other ids.
+      hvym.IC_IDS.update({'principal': 'vault-principal'}, hvym.Query().id == 'vault')
+      identities.use('alice')
+      hvym._ic_update_data()
+      assert _stored_principals()['vault'] == 'vault-principal'
+      assert _stored_principals()['alice'] == ALICE_PRINCIPAL
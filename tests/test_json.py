@@ -0,0 +1,45 @@
+import json
+import math
+
+import pytest
+
+import fixtures
+import hvym
+
+BACKENDS = ['json'] + (['orjson'] if hvym._orjson is not None else [])
+DOCUMENT = {'project': {'name': 'tëst', 'version': '0.01'}, 'values': [1, 1.5e-07, None, True, {}, []], 'nested': {'a': {'b': {'c': [1, {'d': 'e'}]}}}}
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, monkeypatch):
+      if request.param == 'json':
+            monkeypatch.setattr(hvym, '_orjson', None)
+      return request.param
+
+
+def test_stdlib_output_matches_the_json_module(monkeypatch):
+      monkeypatch.setattr(hvym, '_orjson', None)
+      assert hvym._json_dumps(DOCUMENT) == json.dumps(DOCUMENT)
+      assert hvym._json_dumps(DOCUMENT, pretty=True) == json.dumps(DOCUMENT, indent=4)
+
+
+@pytest.mark.parametrize('pretty', [False, True])
+def test_printed_output_is_the_same_on_both_backends(backend, pretty):
+      expected = json.dumps(DOCUMENT, indent=4 if pretty else None)
+      assert hvym._json_text(DOCUMENT, pretty) == expected
+      assert ''.join(hvym._json_iterencode(DOCUMENT, pretty=pretty)) == expected
+      assert hvym._json_loads(hvym._json_dumps(DOCUMENT, pretty)) == DOCUMENT
+
+
+def test_data_class_json_matches_the_json_module(backend):
+      collection, menu, nodes, actions = fixtures.collection_payloads(20)
+      output = hvym._parse_blender_hvym_collection('bench', 'multi', '0', collection, menu, nodes, actions)
+      assert output == json.dumps(json.loads(output))
+
+
+@pytest.mark.parametrize('value', [math.nan, math.inf, -math.inf])
+def test_non_finite_floats_are_rejected(backend, value):
+      with pytest.raises(ValueError):
+            hvym._json_dumps({'values': [None, {'x': value}]})
+      with pytest.raises(ValueError):
+            hvym._json_text({'values': [None, {'x': value}]})
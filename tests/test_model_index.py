@@ -0,0 +1,46 @@
+import os
+
+import fixtures
+import hvym
+
+
+def _models(directory):
+      models = directory / 'models'
+      models.mkdir()
+      fixtures.write_glb(models / 'a.glb', fixtures.hvym_nft_data(n_props=10, seed=1))
+      fixtures.write_glb(models / 'b.glb', fixtures.hvym_nft_data(n_props=10, seed=2), bin_size=1024)
+      fixtures.write_glb(models / 'plain.glb')
+      return models
+
+
+def test_index_skips_unchanged_and_prunes_removed_models(tmp_path):
+      models = _models(tmp_path)
+      index = str(tmp_path / 'models.db')
+      assert hvym._index_models(models, index) == {'indexed': 3, 'unchanged': 0, 'removed': 0, 'failed': 0}
+      assert hvym._index_models(models, index) == {'indexed': 0, 'unchanged': 3, 'removed': 0, 'failed': 0}
+
+      os.remove(models / 'b.glb')
+      assert hvym._index_models(models, index) == {'indexed': 0, 'unchanged': 2, 'removed': 1, 'failed': 0}
+      assert [row['path'] for row in hvym._query_models(index)] == [str(models / 'a.glb')]
+
+
+def test_index_reports_broken_files_and_keeps_going(tmp_path):
+      models = _models(tmp_path)
+      (models / 'truncated.glb').write_bytes(b'glTF\x02\x00\x00\x00')
+      os.symlink(models / 'missing.glb', models / 'broken.glb')
+      index = str(tmp_path / 'models.db')
+
+      counts = hvym._index_models(models, index)
+      assert counts == {'indexed': 3, 'unchanged': 0, 'removed': 0, 'failed': 2}
+
+
+def test_query_filters_on_contract_expressions(tmp_path):
+      models = _models(tmp_path)
+      index = str(tmp_path / 'models.db')
+      hvym._index_models(models, index)
+
+      supplies = {row['path']: row['contract']['maxSupply'] for row in hvym._query_models(index)}
+      threshold = min(supplies.values())
+      expected = sorted(path for path, supply in supplies.items() if supply > threshold)
+      assert [row['path'] for row in hvym._query_models(index, contract=[f'maxSupply>{threshold}'])] == expected
+      assert hvym._query_models(index, project='missing') == []
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+from jinja2 import DictLoader, Environment
+
+import hvym
+
+
+@pytest.fixture(autouse=True)
+def templates(monkeypatch):
+      env = Environment(loader=DictLoader({'a.txt': 'a={{ data.value }}', 'b.txt': 'b={{ data.value }}', 'fail.txt': '{{ data.fail() }}'}))
+      monkeypatch.setattr(hvym, '_TEMPLATE_ENV', env)
+
+
+def _fail():
+      raise RuntimeError('template failed')
+
+
+def _plan(tmp_path, value):
+      return [('a.txt', {'value': value}, str(tmp_path / 'a.txt')), ('b.txt', {'value': value}, str(tmp_path / 'b.txt'))]
+
+
+def _leftovers(tmp_path):
+      return sorted(name for name in os.listdir(tmp_path) if name.startswith('.'))
+
+
+def test_only_changed_outputs_are_replaced(tmp_path):
+      assert hvym._render_plan(_plan(tmp_path, 1)) == [str(tmp_path / 'a.txt'), str(tmp_path / 'b.txt')]
+      mtime = os.stat(tmp_path / 'a.txt').st_mtime_ns
+
+      assert hvym._render_plan(_plan(tmp_path, 1)) == []
+      assert os.stat(tmp_path / 'a.txt').st_mtime_ns == mtime
+      (tmp_path / 'b.txt').write_text('edited')
+      assert hvym._render_plan(_plan(tmp_path, 1)) == [str(tmp_path / 'b.txt')]
+      assert _leftovers(tmp_path) == []
+
+
+def test_render_errors_leave_the_project_unchanged(tmp_path):
+      hvym._render_plan(_plan(tmp_path, 1))
+      plan = _plan(tmp_path, 2) + [('fail.txt', {'fail': _fail}, str(tmp_path / 'c.txt'))]
+
+      with pytest.raises(RuntimeError, match='template failed'):
+            hvym._render_plan(plan)
+      assert (tmp_path / 'a.txt').read_text() == 'a=1'
+      assert not (tmp_path / 'c.txt').exists()
+      assert _leftovers(tmp_path) == []
+
+
+def test_synced_dirs_are_swapped_in(tmp_path):
+      src = tmp_path / 'backend'
+      src.mkdir()
+      (src / 'main.mo').write_text('actor {}')
+      dst = tmp_path / 'project' / 'backend'
+      dst.mkdir(parents=True)
+      (dst / 'stale.mo').write_text('old')
+
+      changed = hvym._render_plan(_plan(tmp_path, 1), [(str(src), str(dst))])
+      assert str(dst) in changed
+      assert os.listdir(dst) == ['main.mo']
+      assert _leftovers(dst.parent) == []
+
+
+def test_commit_failures_report_what_was_replaced(tmp_path, monkeypatch):
+      hvym._render_plan(_plan(tmp_path, 1))
+      replace = os.replace
+
+      def failing_replace(src, dst):
+            if str(dst).endswith('b.txt'):
+                  raise PermissionError('read-only')
+            replace(src, dst)
+
+      monkeypatch.setattr(hvym.os, 'replace', failing_replace)
+      with pytest.raises(hvym.render_commit_error) as error:
+            hvym._render_plan(_plan(tmp_path, 2))
+      assert error.value.committed == [str(tmp_path / 'a.txt')]
+      assert str(tmp_path / 'a.txt') in str(error.value)
+      assert (tmp_path / 'a.txt').read_text() == 'a=2'
+      assert (tmp_path / 'b.txt').read_text() == 'b=1'
+      assert _leftovers(tmp_path) == []
@@ -0,0 +1,69 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+import hvym
+
+
+class _StatusHandler(BaseHTTPRequestHandler):
+      body = b''
+      length = None
+
+      def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/cbor')
+            if self.length is not None:
+                  self.send_header('Content-Length', str(self.length))
+            self.end_headers()
+            self.wfile.write(self.body)
+
+      def log_message(self, *args):
+            pass
+
+
+@pytest.fixture
+def status_server():
+      server = HTTPServer(('127.0.0.1', 0), _StatusHandler)
+      thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True)
+      thread.start()
+      yield server
+      server.shutdown()
+      server.server_close()
+
+
+def _status(**fields):
+      body = bytes([0xa0 + len(fields)])
+      for key, value in fields.items():
+            body += hvym._cbor_text(key) + hvym._cbor_text(value)
+      return body
+
+
+@pytest.mark.parametrize('body, ready', [
+      (_status(replica_health_status='healthy'), True),
+      (_status(ic_api_version='0.18.0', replica_health_status='healthy'), True),
+      (_status(replica_health_status='starting'), False),
+      (_status(replica_health_status='unhealthy'), False),
+      (_status(ic_api_version='0.18.0'), False),
+      (b'<html>ok</html>', False),
+])
+def test_ready_only_once_the_replica_reports_healthy(status_server, monkeypatch, body, ready):
+      monkeypatch.setattr(_StatusHandler, 'body', body)
+      assert hvym._http_ready(f'http://127.0.0.1:{status_server.server_port}/api/v2/status') is ready
+
+
+def test_truncated_responses_are_not_ready(status_server, monkeypatch):
+      body = _status(replica_health_status='healthy')
+      monkeypatch.setattr(_StatusHandler, 'body', body)
+      monkeypatch.setattr(_StatusHandler, 'length', len(body) + 10)
+      assert hvym._http_ready(f'http://127.0.0.1:{status_server.server_port}/api/v2/status') is False
+
+
+def test_unreachable_replica_is_not_ready():
+      assert hvym._wait_until_ready('http://127.0.0.1:9/api/v2/status', timeout=0.1) is False
+
+
+def test_long_cbor_text_values():
+      body = _status(replica_health_status='healthy', note='x' * 300)
+      assert hvym._cbor_text_field(body, 'note') == 'x' * 300
+      assert hvym._cbor_text_field(body[:-1], 'note') is None
@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+
+import hvym
+
+
+def _python(code):
+      return [sys.executable, '-c', code]
+
+
+def test_output_and_exit_code():
+      result = hvym._run_command(_python('import sys; print("out"); print("err", file=sys.stderr); sys.exit(3)'))
+      assert (result.returncode, result.stdout, result.stderr) == (3, 'out\n', 'err\n')
+      assert not result.ok
+      assert result.message == 'err'
+
+
+def test_timeout_kills_the_command():
+      start = time.monotonic()
+      result = hvym._run_command(_python('import time; print("started", flush=True); time.sleep(30)'), timeout=0.5)
+      assert time.monotonic() - start < 10
+      assert result.timed_out
+      assert result.returncode is None
+      assert result.stdout == 'started\n'
+      assert not result.ok
+      assert 'timed out' in result.message
+
+
+def _gone(pid):
+      try:
+            with open(f'/proc/{pid}/stat') as f:
+                  return f.read().split(') ')[1].startswith('Z')
+      except FileNotFoundError:
+            return True
+
+
+def test_timeout_kills_what_the_command_started():
+      code = 'import subprocess, sys, time; p = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"]); print(p.pid, flush=True); time.sleep(30)'
+      start = time.monotonic()
+      result = hvym._run_command(_python(code), timeout=1)
+      assert time.monotonic() - start < 10
+      assert result.timed_out
+      pid = int(result.stdout)
+      deadline = time.monotonic() + 5
+      while not _gone(pid) and time.monotonic() < deadline:
+            time.sleep(0.05)
+      assert _gone(pid)
+
+
+def test_overlong_lines_are_reported(monkeypatch):
+      monkeypatch.setattr(hvym, 'COMMAND_LINE_LIMIT', 1024)
+      result = hvym._run_command(_python('print("ok"); print("x" * 5000); import time; time.sleep(30)'), timeout=10)
+      assert not result.ok
+      assert not result.timed_out
+      assert result.stdout == 'ok\n'
+      assert 'output line longer than 1024 bytes' in result.message
+
+
+def test_commands_run_concurrently():
+      start = time.monotonic()
+      results = hvym._run_commands([_python('import time; time.sleep(1); print(1)'), _python('import time; time.sleep(1); print(2)')])
+      assert time.monotonic() - start < 1.8
+      assert [result.stdout for result in results] == ['1\n', '2\n']
+
+
+def test_missing_commands_report_an_error():
+      result = hvym._run_command(['hvym-no-such-command'])
+      assert not result.ok
+      assert result.error
+      assert 'hvym-no-such-command' in result.message
+
+
+def test_input_and_merged_stderr():
+      result = hvym._run_command(_python('import sys; print(sys.stdin.read().upper()); print("err", file=sys.stderr)'), input='hello', merge_stderr=True)
+      assert result.ok
+      assert result.stdout == 'HELLO\nerr\n'
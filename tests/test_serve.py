@@ -0,0 +1,21 @@
+import json
+
+import pytest
+
+import hvym
+
+
+def _request(method, *args):
+      return hvym._serve_handle_request(json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': list(args)}))
+
+
+def test_daemon_runs_commands_in_process():
+      response = _request('check')
+      assert response['result']['exit_code'] == 0
+      assert response['result']['stdout'].strip()
+
+
+@pytest.mark.parametrize('command', hvym.SERVE_POPUP_COMMANDS)
+def test_popup_commands_are_left_to_the_caller(command):
+      assert command in hvym._LAZY_COMMANDS
+      assert _request(command)['error']['code'] == hvym.JSONRPC_METHOD_NOT_FOUND
@@ -0,0 +1,39 @@
+import os
+import shutil
+
+import pytest
+
+import hvym
+
+
+@pytest.fixture
+def templates(tmp_path, monkeypatch):
+      shutil.copytree(hvym.FILE_PATH / 'templates', tmp_path / 'templates')
+      monkeypatch.setattr(hvym, 'FILE_PATH', tmp_path)
+      return tmp_path / 'templates'
+
+
+def test_compiled_modules_are_checked_by_stamp_first(tmp_path, templates, monkeypatch):
+      modules = str(tmp_path / 'compiled')
+      hvym._compile_templates(modules)
+      assert hvym._template_modules_current(modules)
+
+      def no_hashing():
+            raise AssertionError('templates hashed although nothing changed')
+
+      monkeypatch.setattr(hvym, '_template_sources', no_hashing)
+      assert hvym._template_modules_current(modules)
+
+
+def test_touched_templates_are_hashed_and_edited_ones_are_stale(tmp_path, templates):
+      modules = str(tmp_path / 'compiled')
+      hvym._compile_templates(modules)
+      name = sorted(os.listdir(templates))[0]
+      stat = os.stat(templates / name)
+      os.utime(templates / name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+      assert hvym._template_modules_current(modules)
+
+      with open(templates / name, 'a') as f:
+            f.write('\n')
+      assert not hvym._template_modules_current(modules)
+
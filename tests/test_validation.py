@@ -0,0 +1,102 @@
+import pytest
+
+import fixtures
+import hvym
+
+
+def _invalid_hvym_data():
+      """A Bicremental prop without an amount and a contract without a maxSupply."""
+      hvym_data = fixtures.hvym_nft_data(n_props=3)
+      prop = hvym_data['collection_0']['valProps']['prop_0']
+      prop.update({'prop_action_type': 'Bicremental', 'immutable': False})
+      del prop['amount']
+      del hvym_data['contract']['maxSupply']
+      return hvym_data
+
+
+def test_blender_payloads_pass():
+      collection, menu, nodes, actions = fixtures.collection_payloads(50)
+      assert hvym._hvym_input_errors('collection', collection) == []
+      assert hvym._hvym_input_errors('menu', menu) == []
+      assert hvym._hvym_input_errors('actions', actions) == []
+
+
+def test_blender_payload_errors_name_the_entry():
+      collection, menu, nodes, actions = fixtures.collection_payloads(5)
+      del collection['3']['int_min']
+      collection['4']['prop_value_type'] = 'Float'
+      collection['4']['float_min'] = None
+      errors = hvym._hvym_input_errors('collection', collection)
+      assert errors == ['collection.3.int_min: Field required', 'collection.4: Value error, float_min required for a Float ' + collection['4']['prop_action_type'] + ' property']
+
+
+def test_parse_command_rejects_invalid_payloads_unless_trusted():
+      collection, menu, nodes, actions = fixtures.collection_payloads(5)
+      del collection['3']['int_min']
+      args = ['parse-blender-hvym-collection', 'bench', 'multi', '0', hvym._json_dumps(collection), hvym._json_dumps(menu), hvym._json_dumps(nodes), hvym._json_dumps(actions)]
+      exit_code, stdout, stderr = hvym._run_cli_command(args)
+      assert exit_code == 1
+      assert 'collection.3.int_min: Field required' in stderr
+
+
+def test_node_payload_errors_name_the_node():
+      collection, menu, nodes, actions = fixtures.collection_payloads(3)
+      assert hvym._hvym_input_errors('nodes', nodes) == []
+      del nodes['node_1']['type']
+      nodes['node_2'] = 'node_2'
+      assert hvym._hvym_input_errors('nodes', nodes) == ['nodes.node_1.type: Field required', 'nodes.node_2: Input should be a valid dictionary']
+
+
+@pytest.mark.parametrize('document, message', [
+      ('[]', '--document must be a json object, got list.'),
+      ('"x"', '--document must be a json object, got str.'),
+      ('{"nodes": {"node_0": {"name": "node_0"}}}', 'nodes.node_0.type: Field required'),
+])
+def test_parse_command_rejects_invalid_documents(document, message):
+      exit_code, stdout, stderr = hvym._run_cli_command(['parse-blender-hvym-collection', 'bench', 'multi', '0', '--document', document])
+      assert exit_code == 1
+      assert message in stderr
+
+
+def test_validate_models_and_update_commands_share_one_validator(tmp_path):
+      hvym_data = _invalid_hvym_data()
+      model = str(fixtures.write_glb(tmp_path / 'model.glb', hvym_data))
+      errors = hvym._hvym_input_errors('hvym_nft_data', hvym_data)
+      assert errors == [
+            'hvym_nft_data.contract.maxSupply: Field required',
+            'hvym_nft_data.collection_0.valProps.prop_0: Value error, amount required for a Bicremental property',
+      ]
+      assert hvym._validate_model(model) == {'path': model, 'ok': False, 'errors': errors}
+
+
+def test_static_props_still_need_ordered_bounds():
+      hvym_data = fixtures.hvym_nft_data(n_props=1)
+      hvym_data['collection_0']['valProps']['prop_0'].update({'prop_action_type': 'Static', 'min': 5, 'max': 1})
+      assert hvym._hvym_input_errors('hvym_nft_data', hvym_data) == ['hvym_nft_data.collection_0.valProps.prop_0: Value error, expected default <= max, got 5 > 1']
+
+
+def test_validate_models_across_processes(tmp_path):
+      valid = fixtures.hvym_nft_data(n_props=5)
+      paths = [str(fixtures.write_glb(tmp_path / f'{i}.glb', valid if i % 2 else _invalid_hvym_data())) for i in range(4)]
+      (tmp_path / 'broken.glb').write_bytes(b'glTF')
+      paths.append(str(tmp_path / 'broken.glb'))
+
+      results = hvym._validate_models(paths, jobs=2)
+      assert [result['ok'] for result in results] == [False, True, False, True, False]
+      assert results == [hvym._validate_model(path) for path in paths]
+
+
+def test_update_command_fails_on_invalid_data(icp_session):
+      assets = icp_session / hvym.MODEL_DEBUG_TEMPLATE / 'src' / 'frontend' / 'assets'
+      assets.mkdir(parents=True)
+      fixtures.write_glb(assets / 'model.glb', _invalid_hvym_data())
+
+      exit_code, stdout, stderr = hvym._run_cli_command(['icp-update-model', 'model.glb'])
+      assert exit_code == 1
+      assert 'hvym_nft_data.contract.maxSupply: Field required' in stderr
+
+
+def test_trusted_input_skips_validation(monkeypatch):
+      monkeypatch.setenv('HVYM_TRUSTED_INPUT', '1')
+      assert hvym._hvym_input_errors('hvym_nft_data', _invalid_hvym_data()) == []
+      assert hvym._hvym_schema_errors('hvym_nft_data', _invalid_hvym_data()) != []